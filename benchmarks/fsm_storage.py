@@ -0,0 +1,111 @@
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+
+from telecopter.fsm_storage import BoundedMemoryStorage, SQLiteStorage  # noqa: E402
+
+
+BOT_ID = 42
+OPERATIONS = ["get_state", "set_state", "get_data", "update_data", "clear"]
+
+
+SCENARIOS = ["memory", "bounded-memory", "sqlite-coalesced", "sqlite-write-through"]
+
+
+def make_storage(name: str, db_path: str) -> BaseStorage:
+    if name == "memory":
+        return MemoryStorage()
+    if name == "bounded-memory":
+        return BoundedMemoryStorage(max_entries=10000, ttl_seconds=86400)
+    flush_interval = 0.5 if name == "sqlite-coalesced" else 0.0
+    return SQLiteStorage(db_path, ttl_seconds=86400, flush_interval_seconds=flush_interval)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def media_details(rng: random.Random) -> Dict[str, Any]:
+    tmdb_id = rng.randint(1, 500000)
+    return {
+        "tmdb_id": tmdb_id,
+        "media_type": rng.choice(["movie", "tv"]),
+        "title": f"Title {tmdb_id}",
+        "year": 1950 + tmdb_id % 75,
+        "overview": "Synthetic overview text. " * 20,
+        "poster_path": f"/poster_{tmdb_id}.jpg",
+        "imdb_id": f"tt{tmdb_id:07d}",
+        "genres": ["Drama", "Comedy"],
+    }
+
+
+async def timed(latencies: Dict[str, List[float]], operation: str, call):
+    started_at = time.perf_counter()
+    result = await call
+    latencies[operation].append((time.perf_counter() - started_at) * 1000)
+    return result
+
+
+async def user_flow(storage: BaseStorage, user_id: int, latencies: Dict[str, List[float]], deadline: float):
+    rng = random.Random(user_id)
+    key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+    while time.monotonic() < deadline:
+        await timed(latencies, "get_state", storage.get_state(key))
+        await timed(latencies, "set_state", storage.set_state(key, "RequestMediaStates:typing_media_name"))
+        await timed(latencies, "update_data", storage.update_data(key, {"request_query": f"query {user_id}"}))
+        await timed(latencies, "get_state", storage.get_state(key))
+        await timed(latencies, "set_state", storage.set_state(key, "RequestMediaStates:confirm_media"))
+        await timed(latencies, "update_data", storage.update_data(key, {"selected_media_details": media_details(rng)}))
+        await timed(latencies, "get_data", storage.get_data(key))
+        started_at = time.perf_counter()
+        await storage.set_state(key, None)
+        await storage.set_data(key, {})
+        latencies["clear"].append((time.perf_counter() - started_at) * 1000)
+
+
+async def run_scenario(name: str, users: int, duration: float):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "fsm_state.db")
+        storage = make_storage(name, db_path)
+        latencies: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(user_flow(storage, user_id, latencies, deadline) for user_id in range(1, users + 1)))
+        await storage.close()
+
+    for operation in OPERATIONS:
+        samples = latencies[operation]
+        print(
+            f"{name:<22} {operation:<12} {len(samples) / duration:>9.1f} {statistics.fmean(samples or [0]):>8.3f}"
+            f" {percentile(samples, 50):>8.3f} {percentile(samples, 95):>8.3f} {percentile(samples, 99):>8.3f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="benchmark fsm storage get/set latency")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<22} {'operation':<12} {'ops/s':>9} {'mean ms':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name in args.scenario or SCENARIOS:
+        await run_scenario(name, args.users, args.duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from pathlib import Path
+from collections import Counter
+from typing import Any, Dict, List, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BENCH_PORT = 8190
+BENCH_TOKEN = "123456:benchmark"
+os.environ["TELEGRAM_API_BASE_URL"] = f"http://127.0.0.1:{BENCH_PORT}"
+
+from aiohttp import web  # noqa: E402
+from aiogram import Bot  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+
+from telecopter.telegram_session import TunedAiohttpSession, create_bot_session  # noqa: E402
+
+
+API_SERVER = TelegramAPIServer.from_base(f"http://127.0.0.1:{BENCH_PORT}")
+
+SCENARIOS: Dict[str, Callable[[], AiohttpSession]] = {
+    "aiogram-default": lambda: AiohttpSession(api=API_SERVER),
+    "small-pool": lambda: TunedAiohttpSession(
+        limit=10, limit_per_host=0, keepalive_timeout=60, dns_cache_ttl=3600, api=API_SERVER
+    ),
+    "no-keepalive": lambda: TunedAiohttpSession(
+        limit=100, limit_per_host=0, keepalive_timeout=0, dns_cache_ttl=3600, api=API_SERVER
+    ),
+    "tuned": create_bot_session,
+}
+
+
+def create_fake_bot_api(latency_ms: float, jitter_ms: float) -> web.Application:
+    async def handle_method(request: web.Request) -> web.Response:
+        await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+        form = await request.post()
+        request.app["stats"][request.match_info["method"]] += 1
+        message: Dict[str, Any] = {
+            "message_id": request.app["stats"][request.match_info["method"]],
+            "date": int(time.time()),
+            "chat": {"id": int(form.get("chat_id", 0)), "type": "private"},
+            "text": form.get("text", ""),
+        }
+        return web.json_response({"ok": True, "result": message})
+
+    app = web.Application()
+    app["stats"] = Counter()
+    app.router.add_post("/bot{token}/{method}", handle_method)
+    return app
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def sender(bot: Bot, chat_ids: List[int], latencies: List[float]):
+    while chat_ids:
+        chat_id = chat_ids.pop()
+        started_at = time.perf_counter()
+        await bot.send_message(chat_id=chat_id, text="benchmark broadcast")
+        latencies.append((time.perf_counter() - started_at) * 1000)
+
+
+async def run_scenario(name: str, messages: int, concurrency: int):
+    bot = Bot(token=BENCH_TOKEN, session=SCENARIOS[name]())
+    chat_ids = list(range(1, messages + 1))
+    latencies: List[float] = []
+    started_at = time.perf_counter()
+    await asyncio.gather(*(sender(bot, chat_ids, latencies) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    await bot.session.close()
+    print(
+        f"{name:<18} {messages / elapsed:>9.1f} {statistics.fmean(latencies):>8.1f}"
+        f" {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="benchmark bot api send throughput against a local fake bot api")
+    parser.add_argument("--messages", type=int, default=2000, help="messages sent per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent senders")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    args = parser.parse_args()
+
+    runner = web.AppRunner(create_fake_bot_api(args.latency_ms, args.jitter_ms), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", BENCH_PORT).start()
+
+    print(f"{'session':<18} {'msg/s':>9} {'mean ms':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            await run_scenario(name, args.messages, args.concurrency)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
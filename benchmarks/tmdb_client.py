@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BENCH_PORT = 8189
+os.environ["TMDB_API_KEY"] = "benchmark"
+os.environ["TMDB_BASE_URL"] = f"http://127.0.0.1:{BENCH_PORT}"
+os.environ["TMDB_CIRCUIT_FAILURE_THRESHOLD"] = "1000000"
+os.environ["TMDB_SEARCH_MODE"] = "api"
+os.environ["TITLE_INDEX_FILE_PATH"] = "/nonexistent/title_index.db"
+
+from aiohttp import web  # noqa: E402
+
+import telecopter.tmdb as tmdb_api  # noqa: E402
+from telecopter.cache import TTLCache  # noqa: E402
+from telecopter.fake_tmdb import create_app  # noqa: E402
+
+
+SCENARIOS = {
+    "baseline": {"cache": False, "pool": False, "coalesce": False},
+    "pooling": {"cache": False, "pool": True, "coalesce": False},
+    "pooling+coalescing": {"cache": False, "pool": True, "coalesce": True},
+    "pooling+coalescing+cache": {"cache": True, "pool": True, "coalesce": True},
+}
+QUERIES = ["matrix", "thrones", "alien", "office", "dune", "batman", "friends", "heat", "lost", "up"]
+
+
+def configure(scenario: Dict[str, bool]):
+    tmdb_api._details_cache = TTLCache(max_size=10000 if scenario["cache"] else 0, ttl=3600)
+    tmdb_api.TMDB_CONNECTION_POOL_SIZE = 50 if scenario["pool"] else 0
+    tmdb_api.TMDB_COALESCE_REQUESTS = scenario["coalesce"]
+    tmdb_api.tmdb_circuit.record_success()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def user_session(rng: random.Random, latencies: Dict[str, List[float]], deadline: float):
+    while time.monotonic() < deadline:
+        started_at = time.perf_counter()
+        results = await tmdb_api.search_media(rng.choice(QUERIES))
+        latencies["search_media"].append((time.perf_counter() - started_at) * 1000)
+        if not results:
+            continue
+        pick = results[min(int(rng.expovariate(1.5)), len(results) - 1)]
+        started_at = time.perf_counter()
+        await tmdb_api.get_media_details(pick["tmdb_id"], pick["media_type"])
+        latencies["get_media_details"].append((time.perf_counter() - started_at) * 1000)
+
+
+async def run_scenario(name: str, scenario: Dict[str, bool], app: web.Application, users: int, duration: float):
+    configure(scenario)
+    app["stats"].clear()
+    latencies: Dict[str, List[float]] = {"search_media": [], "get_media_details": []}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(user_session(random.Random(i), latencies, deadline) for i in range(users)))
+    await tmdb_api.close_session()
+
+    upstream_calls = sum(count for path, count in app["stats"].items() if not path.startswith("error_"))
+    for operation, samples in latencies.items():
+        print(
+            f"{name:<26} {operation:<18} {len(samples) / duration:>9.1f} {statistics.fmean(samples or [0]):>8.1f}"
+            f" {percentile(samples, 50):>8.1f} {percentile(samples, 95):>8.1f} {percentile(samples, 99):>8.1f}"
+        )
+    print(f"{name:<26} {'upstream requests':<18} {upstream_calls / duration:>9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="benchmark the telecopter tmdb client against a local fake tmdb")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=15.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    args = parser.parse_args()
+
+    fixtures_dir = Path(__file__).resolve().parent / "fixtures" / "tmdb"
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, str(fixtures_dir))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", BENCH_PORT).start()
+
+    print(f"{'scenario':<26} {'operation':<18} {'ops/s':>9} {'mean ms':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            await run_scenario(name, SCENARIOS[name], app, args.users, args.duration)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+import asyncio
+
+from typing import Set, List, Tuple, Optional, NamedTuple
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.formatting import Text, Bold, as_list
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.exceptions import TelegramAPIError
+
+from telecopter.logger import setup_logger
+from telecopter.outbound import OutboundPriority, set_outbound_priority
+from telecopter.constants import TITLE_ADMIN_DIGEST
+from telecopter.config import (
+    BOT_WORKERS,
+    ADMIN_CHAT_IDS,
+    ADMIN_DIGEST_WINDOW_SECONDS,
+    ADMIN_DIGEST_MAX_ITEMS,
+)
+
+
+logger = setup_logger(__name__)
+
+
+class AdminDigestEntry(NamedTuple):
+    summary: Text
+    button: InlineKeyboardButton
+    full_text_markdown: str
+    keyboard: Optional[InlineKeyboardMarkup]
+
+
+_pending_fan_outs: Set[asyncio.Task] = set()
+_digest_entries: List[AdminDigestEntry] = []
+_digest_timer: Optional[asyncio.Task] = None
+_digest_bot: Optional[Bot] = None
+
+
+async def _send_to_admin(bot: Bot, admin_id: int, text_markdown: str, keyboard: Optional[InlineKeyboardMarkup]) -> bool:
+    try:
+        await bot.send_message(
+            chat_id=admin_id,
+            text=text_markdown,
+            parse_mode="MarkdownV2",
+            reply_markup=keyboard,
+        )
+        logger.info("sent notification to admin_id %s.", admin_id)
+        return True
+    except TelegramAPIError as e:
+        logger.error("failed to send notification to admin_id %s: %s", admin_id, e)
+        return False
+    except Exception as e:
+        logger.error("unexpected error sending notification to admin_id %s: %s", admin_id, e)
+        return False
+
+
+async def _fan_out(bot: Bot, text_markdown: str, keyboard: Optional[InlineKeyboardMarkup]):
+    set_outbound_priority(OutboundPriority.NOTIFICATION)
+    results = await asyncio.gather(
+        *(_send_to_admin(bot, admin_id, text_markdown, keyboard) for admin_id in ADMIN_CHAT_IDS),
+        return_exceptions=True,
+    )
+    failure_count = sum(1 for result in results if result is not True)
+    if failure_count > 0:
+        logger.warning("admin notifications: %s sent, %s failed.", len(results) - failure_count, failure_count)
+
+
+def schedule_admin_notification(
+    bot: Bot, text_markdown: str, keyboard: Optional[InlineKeyboardMarkup] = None
+) -> Optional[asyncio.Task]:
+    if not ADMIN_CHAT_IDS:
+        logger.warning("ADMIN_CHAT_IDS not configured. Cannot send admin notification.")
+        return None
+    task = asyncio.create_task(_fan_out(bot, text_markdown, keyboard))
+    _pending_fan_outs.add(task)
+    task.add_done_callback(_pending_fan_outs.discard)
+    return task
+
+
+def digest_enabled() -> bool:
+    return ADMIN_DIGEST_WINDOW_SECONDS > 0 and BOT_WORKERS <= 1
+
+
+def _build_digest(entries: List[AdminDigestEntry]) -> Tuple[str, InlineKeyboardMarkup]:
+    digest_text_obj = as_list(
+        Bold(TITLE_ADMIN_DIGEST.format(count=len(entries))),
+        *(entry.summary for entry in entries),
+        sep="\n",
+    )
+    builder = InlineKeyboardBuilder()
+    seen_callbacks: Set[str] = set()
+    for entry in entries:
+        if entry.button.callback_data in seen_callbacks:
+            continue
+        seen_callbacks.add(entry.button.callback_data)
+        builder.add(entry.button)
+    builder.adjust(2)
+    return digest_text_obj.as_markdown(), builder.as_markup()
+
+
+def flush_admin_digest():
+    global _digest_timer
+    if _digest_timer and _digest_timer is not asyncio.current_task():
+        _digest_timer.cancel()
+    _digest_timer = None
+
+    entries = _digest_entries.copy()
+    _digest_entries.clear()
+    if not entries or not _digest_bot:
+        return
+
+    if len(entries) == 1:
+        schedule_admin_notification(_digest_bot, entries[0].full_text_markdown, entries[0].keyboard)
+    else:
+        digest_markdown, digest_keyboard = _build_digest(entries)
+        schedule_admin_notification(_digest_bot, digest_markdown, digest_keyboard)
+    logger.info("flushed admin digest with %s items.", len(entries))
+
+
+async def _flush_digest_after(delay: float):
+    await asyncio.sleep(delay)
+    flush_admin_digest()
+
+
+def queue_admin_digest_entry(bot: Bot, entry: AdminDigestEntry):
+    global _digest_timer, _digest_bot
+    _digest_bot = bot
+    _digest_entries.append(entry)
+    if len(_digest_entries) >= ADMIN_DIGEST_MAX_ITEMS:
+        flush_admin_digest()
+    elif _digest_timer is None:
+        _digest_timer = asyncio.create_task(_flush_digest_after(ADMIN_DIGEST_WINDOW_SECONDS))
+
+
+async def drain_admin_notifications(timeout: float = 10.0) -> int:
+    flush_admin_digest()
+    if not _pending_fan_outs:
+        return 0
+    pending_count = len(_pending_fan_outs)
+    _, still_pending = await asyncio.wait(set(_pending_fan_outs), timeout=timeout)
+    for task in still_pending:
+        task.cancel()
+    logger.info(
+        "drained %s pending admin notifications (%s cancelled).", pending_count - len(still_pending), len(still_pending)
+    )
+    return pending_count - len(still_pending)
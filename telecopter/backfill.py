@@ -0,0 +1,90 @@
+import re
+import time
+import asyncio
+
+from typing import Dict, Any, Optional
+
+import telecopter.tmdb as tmdb_api
+import telecopter.database as db
+from telecopter.logger import setup_logger
+from telecopter.rate_limit import TokenBucket
+
+
+logger = setup_logger(__name__)
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+
+def _matches_description(result: Dict[str, Any], description: str) -> bool:
+    normalized_description = _normalize_title(description)
+    candidates = {_normalize_title(result["title"])}
+    if result.get("year"):
+        candidates.add(_normalize_title(f"{result['title']} {result['year']}"))
+    return normalized_description in candidates
+
+
+async def _resolve_request(
+    row: Dict[str, Any], semaphore: asyncio.Semaphore, limiter: TokenBucket
+) -> Optional[Dict[str, Any]]:
+    async with semaphore:
+        tmdb_id = row["tmdb_id"]
+        media_type = row["request_type"]
+        if tmdb_id is None:
+            await limiter.acquire()
+            search_results = await tmdb_api.search_media(row["title"])
+            match = next((result for result in search_results if _matches_description(result, row["title"])), None)
+            if not match:
+                return None
+            tmdb_id, media_type = match["tmdb_id"], match["media_type"]
+
+        await limiter.acquire()
+        media_details = await tmdb_api.get_media_details(tmdb_id, media_type, fallback=False)
+
+    if not media_details:
+        return None
+    return {**media_details, "request_id": row["request_id"]}
+
+
+async def backfill_request_metadata(
+    concurrency: int, requests_per_second: float, chunk_size: int, dry_run: bool = False
+):
+    await db.initialize_database()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = TokenBucket(rate=requests_per_second, capacity=max(1.0, float(concurrency)))
+
+    started_at = time.monotonic()
+    processed_count = updated_count = unresolved_count = 0
+
+    async for rows in db.iter_backfill_candidates(chunk_size):
+        if not tmdb_api.is_available():
+            logger.error("tmdb is unavailable. stopping backfill after %s rows.", processed_count)
+            break
+
+        results = await asyncio.gather(*(_resolve_request(dict(row), semaphore, limiter) for row in rows))
+        updates = [result for result in results if result]
+        if not dry_run:
+            await db.apply_request_backfill(updates)
+
+        processed_count += len(rows)
+        updated_count += len(updates)
+        unresolved_count += len(rows) - len(updates)
+        elapsed = time.monotonic() - started_at
+        logger.info(
+            "backfill progress: %s processed, %s updated, %s unresolved (%.1f rows/s).",
+            processed_count,
+            updated_count,
+            unresolved_count,
+            processed_count / elapsed if elapsed else 0.0,
+        )
+
+    elapsed = time.monotonic() - started_at
+    logger.info(
+        "backfill %s: %s processed, %s updated, %s unresolved in %.1fs.",
+        "dry run finished" if dry_run else "finished",
+        processed_count,
+        updated_count,
+        unresolved_count,
+        elapsed,
+    )
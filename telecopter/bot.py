@@ -1,17 +1,54 @@
+import signal
 import asyncio
+import secrets
+import argparse
+import datetime
+
+from typing import Any, Coroutine, Optional
 
 from aiogram import Bot, Dispatcher, types
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.client.default import DefaultBotProperties
 
 from telecopter.logger import setup_logger
+from telecopter.tmdb import close_session as close_tmdb_session
+from telecopter.fake_tmdb import serve_fake_tmdb
+from telecopter.backfill import backfill_request_metadata
+from telecopter.admin_notifications import drain_admin_notifications
+from telecopter.lifecycle import Lifecycle
+from telecopter.outbox import flush_outbox, run_outbox_worker
+from telecopter.webhook import run_webhook
+from telecopter.middlewares import ConcurrencyLimitMiddleware, ThrottlingMiddleware, UserSerialIsolation
+from telecopter.outbound import install_outbound_scheduler
+from telecopter.telegram_session import create_bot_session
+from telecopter.fsm_storage import BoundedMemoryStorage, create_fsm_storage
+from telecopter.sharding import WORKER_STOP_TIMEOUT_SECONDS, UpdateForwarder, WorkerPool, serve_worker_updates
+from telecopter.broadcast import resume_broadcast_jobs, shutdown_broadcasts
+from telecopter.title_index import ingest_exports
+from telecopter.tmdb_sync import run_sync_loop, sync_tracked_titles
 from telecopter.database import initialize_database
-from telecopter.config import TELEGRAM_BOT_TOKEN, ADMIN_CHAT_IDS
+from telecopter.config import (
+    TELEGRAM_BOT_TOKEN,
+    BOT_MODE,
+    BOT_WORKERS,
+    HANDLER_CONCURRENCY,
+    HANDLER_SHED_QUEUE_DEPTH,
+    HANDLER_SERIALIZE_PER_USER,
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS,
+    ADMIN_CHAT_IDS,
+    ADMIN_DIGEST_WINDOW_SECONDS,
+    FSM_STORAGE,
+    FSM_MEMORY_MAX_ENTRIES,
+    FSM_STATE_TTL_SECONDS,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_REQUESTS_PER_SECOND,
+    BACKFILL_CHUNK_SIZE,
+)
 from telecopter.constants import CMD_START_DESCRIPTION, CMD_CANCEL_DESCRIPTION
 
 from telecopter.handlers.main_handlers import main_router
 from telecopter.handlers.admin_handlers import admin_router
-from telecopter.handlers.request_handlers import request_router
+from telecopter.handlers.request_handlers import request_router, media_search_tasks
 
 
 logger = setup_logger(__name__)
@@ -41,43 +78,210 @@ async def set_bot_commands(bot: Bot):
                 logger.error(f"failed to set commands for admin_id {admin_id}: %s", e)
 
 
+def create_bot(processes: int = 1) -> Bot:
+    default_props = DefaultBotProperties(parse_mode="MarkdownV2")
+    bot = Bot(token=TELEGRAM_BOT_TOKEN, session=create_bot_session(), default=default_props)
+    install_outbound_scheduler(bot, processes)
+    return bot
+
+
+def create_dispatcher(
+    storage: BaseStorage, lifecycle: Lifecycle, forwarder: Optional[UpdateForwarder] = None
+) -> Dispatcher:
+    isolation = None
+    if not forwarder and HANDLER_SERIALIZE_PER_USER:
+        isolation = UserSerialIsolation(on_queued=media_search_tasks.cancel)
+    dp = Dispatcher(storage=storage, events_isolation=isolation) if isolation else Dispatcher(storage=storage)
+    dp.update.outer_middleware.unregister(dp.fsm)
+    if forwarder:
+        dp.update.outer_middleware(forwarder)
+    dp.update.outer_middleware(lifecycle.track_update)
+    if not forwarder:
+        dp.update.outer_middleware(ThrottlingMiddleware(dp.fsm))
+    dp.update.outer_middleware(dp.fsm)
+    if not forwarder and HANDLER_CONCURRENCY > 0:
+        dp.update.outer_middleware(ConcurrencyLimitMiddleware(HANDLER_CONCURRENCY, HANDLER_SHED_QUEUE_DEPTH, isolation))
+    dp.include_router(admin_router)
+    dp.include_router(request_router)
+    dp.include_router(main_router)
+    return dp
+
+
+async def start_delivery_jobs(bot: Bot) -> asyncio.Task:
+    outbox_task = asyncio.create_task(run_outbox_worker(bot))
+    await resume_broadcast_jobs(bot)
+    return outbox_task
+
+
+async def stop_bot(
+    lifecycle: Lifecycle,
+    bot: Bot,
+    storage: BaseStorage,
+    outbox_task: Optional[asyncio.Task],
+    forwarder: Optional[UpdateForwarder] = None,
+    worker_pool: Optional[WorkerPool] = None,
+):
+    await lifecycle.drain_handlers()
+    if forwarder:
+        await lifecycle.step("forwarded_updates", forwarder.close())
+    if worker_pool:
+        worker_stop_timeout = SHUTDOWN_DRAIN_TIMEOUT_SECONDS + WORKER_STOP_TIMEOUT_SECONDS
+        await lifecycle.step(
+            "workers", worker_pool.stop(worker_stop_timeout), timeout=worker_stop_timeout + WORKER_STOP_TIMEOUT_SECONDS
+        )
+    await lifecycle.step("broadcasts_paused", shutdown_broadcasts())
+    if outbox_task:
+        outbox_task.cancel()
+        await asyncio.gather(outbox_task, return_exceptions=True)
+        await lifecycle.step("outbox_flushed", flush_outbox(bot))
+    await lifecycle.step("admin_notifications_drained", drain_admin_notifications())
+    await lifecycle.step("fsm_storage", storage.close())
+    await lifecycle.step("tmdb_session", close_tmdb_session())
+    await lifecycle.step("bot_session", bot.session.close())
+    lifecycle.finish()
+
+
 async def main_async():
     if not TELEGRAM_BOT_TOKEN:
         logger.critical("telegram_bot_token is not set. bot cannot start.")
         return
 
+    lifecycle = Lifecycle(SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    lifecycle.install_signal_handlers()
+
     logger.info("initializing database...")
     await initialize_database()
     logger.info("database initialized.")
 
-    storage = MemoryStorage()
-    default_props = DefaultBotProperties(parse_mode="MarkdownV2")
-    bot = Bot(token=TELEGRAM_BOT_TOKEN, default=default_props)
-
-    dp = Dispatcher(storage=storage)
-    dp.include_router(admin_router)
-    dp.include_router(request_router)
-    dp.include_router(main_router)
+    sharded = BOT_WORKERS > 1
+    if sharded:
+        if FSM_STORAGE != "sqlite":
+            logger.warning("fsm state is kept in worker memory and will be lost when a worker restarts.")
+        if ADMIN_DIGEST_WINDOW_SECONDS > 0:
+            logger.warning("admin digests are not supported with multiple workers, sending notifications individually.")
+        storage: BaseStorage = BoundedMemoryStorage(FSM_MEMORY_MAX_ENTRIES, FSM_STATE_TTL_SECONDS)
+    else:
+        storage = create_fsm_storage()
+    bot = create_bot()
+    secret_token = secrets.token_urlsafe(32)
+    forwarder = UpdateForwarder(BOT_WORKERS, secret_token) if sharded else None
+    dp = create_dispatcher(storage, lifecycle, forwarder)
 
     await set_bot_commands(bot)
 
-    logger.info("bot starting polling...")
+    sync_task = asyncio.create_task(run_sync_loop())
+    outbox_task: Optional[asyncio.Task] = None
+    worker_pool: Optional[WorkerPool] = None
+    if forwarder:
+        forwarder.start()
+        worker_pool = WorkerPool(run_worker_process, BOT_WORKERS, secret_token)
+        worker_pool.start()
+        await worker_pool.wait_ready()
+    else:
+        outbox_task = await start_delivery_jobs(bot)
+
+    logger.info("bot starting in %s mode with %s worker processes...", BOT_MODE, BOT_WORKERS if sharded else 0)
     try:
         allowed_updates = dp.resolve_used_update_types()
         logger.info(f"bot will listen for updates: {allowed_updates}")
-        await dp.start_polling(bot, allowed_updates=allowed_updates)
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot, allowed_updates, lifecycle.stop_requested)
+        else:
+            await bot.delete_webhook()
+            polling_task = asyncio.create_task(
+                dp.start_polling(bot, allowed_updates=allowed_updates, handle_signals=False, close_bot_session=False)
+            )
+            await lifecycle.wait_until_stopped(polling_task)
+            if not polling_task.done():
+                await dp.stop_polling()
+            await polling_task
     except Exception as e:
-        logger.critical("an error occurred while running the bot polling: %s", e, exc_info=True)
+        logger.critical("an error occurred while receiving bot updates: %s", e, exc_info=True)
     finally:
-        logger.info("bot polling stopped. closing bot session...")
-        if bot.session and not bot.session.closed:
-            await bot.session.close()
-        logger.info("bot session closed.")
+        logger.info("bot stopped receiving updates.")
+        sync_task.cancel()
+        await stop_bot(lifecycle, bot, storage, outbox_task, forwarder, worker_pool)
+
+
+async def worker_async(index: int, workers: int, secret_token: str):
+    lifecycle = Lifecycle(SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    lifecycle.install_signal_handlers((signal.SIGTERM,))
+    storage = create_fsm_storage()
+    bot = create_bot(workers)
+    dp = create_dispatcher(storage, lifecycle)
+    outbox_task = await start_delivery_jobs(bot) if index == 0 else None
+    try:
+        await serve_worker_updates(dp, bot, index, secret_token, lifecycle.stop_requested)
+    finally:
+        await stop_bot(lifecycle, bot, storage, outbox_task)
+
+
+def run_worker_process(index: int, workers: int, secret_token: str):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(worker_async(index, workers, secret_token))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="telecopter", description="Telecopter media request manager")
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest_parser = subparsers.add_parser("ingest-titles", help="build the local title index from tmdb daily exports")
+    ingest_parser.add_argument(
+        "--date",
+        type=datetime.date.fromisoformat,
+        default=None,
+        help="export date as YYYY-MM-DD (defaults to yesterday, utc)",
+    )
+
+    subparsers.add_parser("sync-titles", help="refresh tracked titles from the tmdb change feeds once")
+
+    backfill_parser = subparsers.add_parser("backfill", help="fill in missing tmdb metadata for existing requests")
+    backfill_parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    backfill_parser.add_argument(
+        "--rate", type=float, default=BACKFILL_REQUESTS_PER_SECOND, help="tmdb requests per second"
+    )
+    backfill_parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    backfill_parser.add_argument("--dry-run", action="store_true", help="resolve rows without writing updates")
+
+    fake_tmdb_parser = subparsers.add_parser("fake-tmdb", help="serve a local stand-in for the tmdb api")
+    fake_tmdb_parser.add_argument("--host", default="127.0.0.1")
+    fake_tmdb_parser.add_argument("--port", type=int, default=8089)
+    fake_tmdb_parser.add_argument("--latency-ms", type=float, default=50.0)
+    fake_tmdb_parser.add_argument("--jitter-ms", type=float, default=10.0)
+    fake_tmdb_parser.add_argument("--error-rate", type=float, default=0.0)
+    fake_tmdb_parser.add_argument("--fixtures", default=None, help="directory of recorded json responses")
+    return parser.parse_args()
+
+
+async def run_tmdb_command(command: Coroutine[Any, Any, Any]):
+    try:
+        await command
+    finally:
+        await close_tmdb_session()
+
+
+async def sync_titles_once():
+    await initialize_database()
+    await sync_tracked_titles()
 
 
 def main():
+    args = parse_args()
+    if args.command == "ingest-titles":
+        command = ingest_exports(args.date)
+    elif args.command == "sync-titles":
+        command = run_tmdb_command(sync_titles_once())
+    elif args.command == "backfill":
+        command = run_tmdb_command(
+            backfill_request_metadata(args.concurrency, args.rate, args.chunk_size, args.dry_run)
+        )
+    elif args.command == "fake-tmdb":
+        command = serve_fake_tmdb(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.fixtures)
+    else:
+        command = main_async()
+
     try:
-        asyncio.run(main_async())
+        asyncio.run(command)
     except KeyboardInterrupt:
         logger.info("bot process interrupted by user (ctrl+c). shutting down.")
     except Exception as e:
@@ -0,0 +1,398 @@
+import time
+import asyncio
+
+from collections import deque
+from typing import Dict, List, Tuple, Optional
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.formatting import Text
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramForbiddenError
+
+import telecopter.database as db
+from telecopter.logger import setup_logger
+from telecopter.outbound import OutboundPriority, set_outbound_priority
+from telecopter.config import (
+    BROADCAST_CONCURRENCY,
+    BROADCAST_STATE_BATCH_SIZE,
+    BROADCAST_PROGRESS_INTERVAL_SECONDS,
+)
+from telecopter.constants import (
+    BroadcastJobStatus,
+    BroadcastJobCallback,
+    BroadcastRecipientStatus,
+    BTN_BROADCAST_JOB_PAUSE,
+    BTN_BROADCAST_JOB_RESUME,
+    BTN_BROADCAST_JOB_CANCEL,
+    MSG_ADMIN_BROADCAST_PROGRESS,
+    MSG_ADMIN_BROADCAST_SENT_CONFIRM,
+    MSG_ADMIN_BROADCAST_FAILURES_SUFFIX,
+    MSG_ADMIN_BROADCAST_JOB_PAUSED,
+    MSG_ADMIN_BROADCAST_JOB_CANCELLED,
+)
+
+
+logger = setup_logger(__name__)
+
+
+def get_unreachable_reason(error: TelegramAPIError) -> Optional[str]:
+    if isinstance(error, TelegramForbiddenError):
+        return "forbidden"
+    if isinstance(error, TelegramBadRequest) and "chat not found" in error.message.lower():
+        return "chat_not_found"
+    return None
+
+
+def get_broadcast_job_keyboard(job_id: int, status: str) -> Optional[InlineKeyboardMarkup]:
+    builder = InlineKeyboardBuilder()
+    if status == BroadcastJobStatus.RUNNING.value:
+        builder.button(
+            text=BTN_BROADCAST_JOB_PAUSE,
+            callback_data=f"{BroadcastJobCallback.PREFIX.value}:{BroadcastJobCallback.PAUSE.value}:{job_id}",
+        )
+    elif status == BroadcastJobStatus.PAUSED.value:
+        builder.button(
+            text=BTN_BROADCAST_JOB_RESUME,
+            callback_data=f"{BroadcastJobCallback.PREFIX.value}:{BroadcastJobCallback.RESUME.value}:{job_id}",
+        )
+    else:
+        return None
+    builder.button(
+        text=BTN_BROADCAST_JOB_CANCEL,
+        callback_data=f"{BroadcastJobCallback.PREFIX.value}:{BroadcastJobCallback.CANCEL.value}:{job_id}",
+    )
+    return builder.adjust(2).as_markup()
+
+
+async def _edit_status_message(
+    bot: Bot,
+    chat_id: Optional[int],
+    message_id: Optional[int],
+    status_text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+):
+    if not chat_id or not message_id:
+        return
+    try:
+        await bot.edit_message_text(
+            chat_id=chat_id,
+            message_id=message_id,
+            text=Text(status_text).as_markdown(),
+            parse_mode="MarkdownV2",
+            reply_markup=reply_markup,
+        )
+    except TelegramBadRequest as e:
+        logger.debug("could not edit broadcast status message: %s", e)
+    except Exception as e:
+        logger.warning("failed to update broadcast status message: %s", e)
+
+
+class BroadcastRun:
+    def __init__(self, bot: Bot, job: aiosqlite.Row, pending_chat_ids: List[int]):
+        self.bot = bot
+        self.job_id: int = job["job_id"]
+        self.message_markdown: str = job["message_text"]
+        self.is_muted = bool(job["is_muted"])
+        self.admin_user_id: int = job["admin_user_id"]
+        self.admin_text: str = job["admin_text"]
+        self.status_chat_id: Optional[int] = job["status_chat_id"]
+        self.status_message_id: Optional[int] = job["status_message_id"]
+        self.total_count: int = job["total_count"]
+        self.sent_count: int = job["sent_count"]
+        self.failed_count: int = job["failed_count"]
+        self.task: Optional[asyncio.Task] = None
+        self._pending_chat_ids = deque(pending_chat_ids)
+        self._deliveries: List[Tuple[int, str]] = []
+        self._unreachable_chats: List[Tuple[int, str]] = []
+        self._flush_lock = asyncio.Lock()
+        self._stop_status: Optional[BroadcastJobStatus] = None
+        self._processed_count = 0
+        self._started_at = time.monotonic()
+
+    @property
+    def remaining_count(self) -> int:
+        return max(0, self.total_count - self.sent_count - self.failed_count)
+
+    @property
+    def send_rate(self) -> float:
+        elapsed = time.monotonic() - self._started_at
+        return self._processed_count / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def stop_status(self) -> Optional[BroadcastJobStatus]:
+        return self._stop_status
+
+    def request_stop(self, stop_status: BroadcastJobStatus):
+        self._stop_status = stop_status
+
+    async def run(self):
+        set_outbound_priority(OutboundPriority.BROADCAST)
+        logger.info(
+            "broadcast job %s by admin %s running for %s of %s chats (%s senders).",
+            self.job_id,
+            self.admin_user_id,
+            len(self._pending_chat_ids),
+            self.total_count,
+            BROADCAST_CONCURRENCY,
+        )
+        progress_task = asyncio.create_task(self._report_progress())
+        try:
+            await asyncio.gather(*(self._sender() for _ in range(max(1, BROADCAST_CONCURRENCY))))
+        finally:
+            progress_task.cancel()
+            await self._flush_deliveries()
+        await self._finish()
+
+    async def _sender(self):
+        while self._pending_chat_ids and self._stop_status is None:
+            chat_id = self._pending_chat_ids.popleft()
+            if await self._send(chat_id):
+                self.sent_count += 1
+                self._deliveries.append((chat_id, BroadcastRecipientStatus.SENT.value))
+            else:
+                self.failed_count += 1
+                self._deliveries.append((chat_id, BroadcastRecipientStatus.FAILED.value))
+            self._processed_count += 1
+            if len(self._deliveries) >= BROADCAST_STATE_BATCH_SIZE:
+                await self._flush_deliveries()
+
+    async def _send(self, chat_id: int) -> bool:
+        try:
+            await self.bot.send_message(
+                chat_id=chat_id,
+                text=self.message_markdown,
+                parse_mode="MarkdownV2",
+                disable_notification=self.is_muted,
+            )
+            return True
+        except TelegramAPIError as e:
+            unreachable_reason = get_unreachable_reason(e)
+            if unreachable_reason:
+                logger.info("chat_id %s is unreachable (%s), excluding it from future broadcasts.", chat_id, e)
+                self._unreachable_chats.append((chat_id, unreachable_reason))
+            else:
+                logger.error("failed to send broadcast to chat_id %s: %s", chat_id, e)
+            return False
+        except Exception as e:
+            logger.error("unexpected error sending broadcast to chat_id %s: %s", chat_id, e)
+            return False
+
+    async def _flush_deliveries(self):
+        async with self._flush_lock:
+            deliveries, self._deliveries = self._deliveries, []
+            unreachable_chats, self._unreachable_chats = self._unreachable_chats, []
+            await db.record_broadcast_deliveries(self.job_id, deliveries)
+            await db.mark_chats_unreachable(unreachable_chats)
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(BROADCAST_PROGRESS_INTERVAL_SECONDS)
+            await self._flush_deliveries()
+            if self._stop_status is not None:
+                continue
+            progress_text = MSG_ADMIN_BROADCAST_PROGRESS.format(
+                sent_count=self.sent_count,
+                failed_count=self.failed_count,
+                remaining_count=self.remaining_count,
+                rate=f"{self.send_rate:.1f}",
+            )
+            await _edit_status_message(
+                self.bot,
+                self.status_chat_id,
+                self.status_message_id,
+                progress_text,
+                get_broadcast_job_keyboard(self.job_id, BroadcastJobStatus.RUNNING.value),
+            )
+
+    async def _finish(self):
+        if self._stop_status == BroadcastJobStatus.CANCELLED:
+            await _edit_status_message(
+                self.bot,
+                self.status_chat_id,
+                self.status_message_id,
+                MSG_ADMIN_BROADCAST_JOB_CANCELLED.format(
+                    job_id=self.job_id,
+                    sent_count=self.sent_count,
+                    failed_count=self.failed_count,
+                    remaining_count=self.remaining_count,
+                ),
+            )
+            logger.info("broadcast job %s cancelled with %s chats not sent.", self.job_id, self.remaining_count)
+            return
+
+        if self._pending_chat_ids:
+            await _edit_status_message(
+                self.bot,
+                self.status_chat_id,
+                self.status_message_id,
+                MSG_ADMIN_BROADCAST_JOB_PAUSED.format(
+                    job_id=self.job_id,
+                    sent_count=self.sent_count,
+                    failed_count=self.failed_count,
+                    remaining_count=self.remaining_count,
+                ),
+                get_broadcast_job_keyboard(self.job_id, BroadcastJobStatus.PAUSED.value),
+            )
+            logger.info("broadcast job %s paused with %s chats remaining.", self.job_id, self.remaining_count)
+            return
+
+        await db.update_broadcast_job_status(
+            self.job_id,
+            BroadcastJobStatus.COMPLETED.value,
+            [BroadcastJobStatus.RUNNING.value, BroadcastJobStatus.PAUSED.value],
+        )
+        summary_text = MSG_ADMIN_BROADCAST_SENT_CONFIRM.format(sent_count=self.sent_count)
+        if self.failed_count > 0:
+            summary_text += MSG_ADMIN_BROADCAST_FAILURES_SUFFIX.format(failed_count=self.failed_count)
+        await _edit_status_message(self.bot, self.status_chat_id, self.status_message_id, summary_text)
+        await db.log_admin_action(
+            admin_user_id=self.admin_user_id,
+            action="broadcast_muted" if self.is_muted else "broadcast",
+            details=(
+                f"Job: {self.job_id}, Sent: {self.sent_count}, Failed: {self.failed_count}."
+                f" Msg: {self.admin_text[:100]}..."
+            ),
+        )
+        logger.info(
+            "broadcast job %s finished: %s sent, %s failed in %.1fs.",
+            self.job_id,
+            self.sent_count,
+            self.failed_count,
+            time.monotonic() - self._started_at,
+        )
+
+
+_active_runs: Dict[int, BroadcastRun] = {}
+
+
+def _on_run_done(job_id: int, task: asyncio.Task):
+    _active_runs.pop(job_id, None)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error("broadcast job %s stopped unexpectedly: %s", job_id, exc, exc_info=exc)
+
+
+def _start_run(bot: Bot, job: aiosqlite.Row, pending_chat_ids: List[int]) -> BroadcastRun:
+    broadcast_run = BroadcastRun(bot, job, pending_chat_ids)
+    broadcast_run.task = asyncio.create_task(broadcast_run.run(), name=f"broadcast:{broadcast_run.job_id}")
+    _active_runs[broadcast_run.job_id] = broadcast_run
+    broadcast_run.task.add_done_callback(lambda task: _on_run_done(broadcast_run.job_id, task))
+    return broadcast_run
+
+
+async def start_broadcast(
+    bot: Bot,
+    admin_user_id: int,
+    message_markdown: str,
+    admin_text: str,
+    is_muted: bool,
+    chat_ids: List[int],
+    status_chat_id: int,
+    status_message_id: int,
+) -> int:
+    job_id = await db.create_broadcast_job(
+        admin_user_id=admin_user_id,
+        message_text=message_markdown,
+        admin_text=admin_text,
+        is_muted=is_muted,
+        chat_ids=chat_ids,
+        status_chat_id=status_chat_id,
+        status_message_id=status_message_id,
+    )
+    job = await db.get_broadcast_job(job_id)
+    _start_run(bot, job, await db.get_pending_broadcast_chat_ids(job_id))
+    return job_id
+
+
+async def pause_broadcast(bot: Bot, job_id: int) -> bool:
+    if not await db.update_broadcast_job_status(
+        job_id, BroadcastJobStatus.PAUSED.value, [BroadcastJobStatus.RUNNING.value]
+    ):
+        return False
+    broadcast_run = _active_runs.get(job_id)
+    if broadcast_run:
+        broadcast_run.request_stop(BroadcastJobStatus.PAUSED)
+        return True
+
+    job = await db.get_broadcast_job(job_id)
+    await _edit_status_message(
+        bot,
+        job["status_chat_id"],
+        job["status_message_id"],
+        MSG_ADMIN_BROADCAST_JOB_PAUSED.format(
+            job_id=job_id,
+            sent_count=job["sent_count"],
+            failed_count=job["failed_count"],
+            remaining_count=job["total_count"] - job["sent_count"] - job["failed_count"],
+        ),
+        get_broadcast_job_keyboard(job_id, BroadcastJobStatus.PAUSED.value),
+    )
+    return True
+
+
+async def resume_broadcast(bot: Bot, job_id: int) -> bool:
+    broadcast_run = _active_runs.get(job_id)
+    if broadcast_run:
+        if broadcast_run.stop_status != BroadcastJobStatus.PAUSED or not broadcast_run.task:
+            return False
+        await asyncio.wait([broadcast_run.task])
+    if not await db.update_broadcast_job_status(
+        job_id, BroadcastJobStatus.RUNNING.value, [BroadcastJobStatus.PAUSED.value]
+    ):
+        return False
+    job = await db.get_broadcast_job(job_id)
+    _start_run(bot, job, await db.get_pending_broadcast_chat_ids(job_id))
+    return True
+
+
+async def cancel_broadcast(bot: Bot, job_id: int) -> bool:
+    if not await db.update_broadcast_job_status(
+        job_id,
+        BroadcastJobStatus.CANCELLED.value,
+        [BroadcastJobStatus.RUNNING.value, BroadcastJobStatus.PAUSED.value],
+    ):
+        return False
+    broadcast_run = _active_runs.get(job_id)
+    if broadcast_run:
+        broadcast_run.request_stop(BroadcastJobStatus.CANCELLED)
+        return True
+
+    job = await db.get_broadcast_job(job_id)
+    await _edit_status_message(
+        bot,
+        job["status_chat_id"],
+        job["status_message_id"],
+        MSG_ADMIN_BROADCAST_JOB_CANCELLED.format(
+            job_id=job_id,
+            sent_count=job["sent_count"],
+            failed_count=job["failed_count"],
+            remaining_count=job["total_count"] - job["sent_count"] - job["failed_count"],
+        ),
+    )
+    return True
+
+
+async def resume_broadcast_jobs(bot: Bot) -> int:
+    resumed_count = 0
+    for job in await db.get_broadcast_jobs_by_status([BroadcastJobStatus.RUNNING.value]):
+        if job["job_id"] in _active_runs:
+            continue
+        _start_run(bot, job, await db.get_pending_broadcast_chat_ids(job["job_id"]))
+        resumed_count += 1
+    if resumed_count:
+        logger.info("resumed %s interrupted broadcast jobs.", resumed_count)
+    return resumed_count
+
+
+async def shutdown_broadcasts() -> int:
+    tasks = [broadcast_run.task for broadcast_run in _active_runs.values() if broadcast_run.task]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("stopped %s running broadcasts; they will resume on next start.", len(tasks))
+    return len(tasks)
@@ -0,0 +1,83 @@
+import time
+
+from enum import Enum
+
+from telecopter.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._state = CircuitState.CLOSED
+        self._failure_count = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("circuit '%s' half-open, allowing trial requests.", self.name)
+        return self._state
+
+    def is_available(self) -> bool:
+        state = self.state
+        if state == CircuitState.OPEN:
+            return False
+        if state == CircuitState.HALF_OPEN:
+            return self._half_open_calls < self.half_open_max_calls
+        return True
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        return False
+
+    def release_trial(self):
+        if self._state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self):
+        if self._state != CircuitState.CLOSED:
+            logger.info("circuit '%s' closed after successful trial request.", self.name)
+        self._state = CircuitState.CLOSED
+        self._failure_count = 0
+        self._half_open_calls = 0
+
+    def record_failure(self):
+        if self._state == CircuitState.HALF_OPEN:
+            logger.warning("circuit '%s' trial request failed.", self.name)
+            self._failure_count = 1
+            self._open()
+            return
+        self._failure_count += 1
+        if self._state == CircuitState.CLOSED and self._failure_count >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        logger.warning(
+            "circuit '%s' opened after %s consecutive failure(s). retrying in %ss.",
+            self.name,
+            self._failure_count,
+            self.recovery_timeout,
+        )
@@ -6,15 +6,69 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN: str = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_API_BASE_URL: str = os.environ.get("TELEGRAM_API_BASE_URL", "").rstrip("/")
+TELEGRAM_CONNECTION_LIMIT: int = int(os.environ.get("TELEGRAM_CONNECTION_LIMIT", "100"))
+TELEGRAM_CONNECTION_LIMIT_PER_HOST: int = int(os.environ.get("TELEGRAM_CONNECTION_LIMIT_PER_HOST", "0"))
+TELEGRAM_KEEPALIVE_TIMEOUT_SECONDS: float = float(os.environ.get("TELEGRAM_KEEPALIVE_TIMEOUT_SECONDS", "60"))
+TELEGRAM_DNS_CACHE_TTL_SECONDS: int = int(os.environ.get("TELEGRAM_DNS_CACHE_TTL_SECONDS", "3600"))
+TELEGRAM_REQUEST_TIMEOUT_SECONDS: float = float(os.environ.get("TELEGRAM_REQUEST_TIMEOUT_SECONDS", "60"))
+TELEGRAM_METHOD_TIMEOUTS: str = os.environ.get(
+    "TELEGRAM_METHOD_TIMEOUTS", "sendMessage=15,editMessageText=15,answerCallbackQuery=5,sendPhoto=30"
+)
+
+BOT_MODE: str = os.environ.get("BOT_MODE", "polling").lower()
+WEBHOOK_BASE_URL: str = os.environ.get("WEBHOOK_BASE_URL", "").rstrip("/")
+WEBHOOK_PATH: str = "/" + os.environ.get("WEBHOOK_PATH", "/telegram/webhook").lstrip("/")
+WEBHOOK_HOST: str = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT: int = int(os.environ.get("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET_TOKEN: str = os.environ.get("WEBHOOK_SECRET_TOKEN", "")
+WEBHOOK_MAX_CONNECTIONS: int = int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40"))
+BOT_WORKERS: int = int(os.environ.get("BOT_WORKERS", "0"))
+BOT_WORKER_HOST: str = os.environ.get("BOT_WORKER_HOST", "127.0.0.1")
+BOT_WORKER_BASE_PORT: int = int(os.environ.get("BOT_WORKER_BASE_PORT", "8091"))
 
 ADMIN_CHAT_IDS = [
     int(admin_id.strip()) for admin_id in (os.environ.get("ADMIN_CHAT_IDS", "")).split(",") if admin_id.strip()
 ]
+ADMIN_CHAT_ID_SET: frozenset = frozenset(ADMIN_CHAT_IDS)
+USER_STATUS_CACHE_TTL_SECONDS: float = float(os.environ.get("USER_STATUS_CACHE_TTL_SECONDS", "300"))
+USER_STATUS_CACHE_MAX_ENTRIES: int = int(os.environ.get("USER_STATUS_CACHE_MAX_ENTRIES", "10000"))
+ADMIN_DIGEST_WINDOW_SECONDS: float = float(os.environ.get("ADMIN_DIGEST_WINDOW_SECONDS", "0"))
+ADMIN_DIGEST_MAX_ITEMS: int = int(os.environ.get("ADMIN_DIGEST_MAX_ITEMS", "10"))
+
+OUTBOUND_GLOBAL_MESSAGES_PER_SECOND: float = float(os.environ.get("OUTBOUND_GLOBAL_MESSAGES_PER_SECOND", "30"))
+OUTBOUND_PER_CHAT_MESSAGES_PER_SECOND: float = float(os.environ.get("OUTBOUND_PER_CHAT_MESSAGES_PER_SECOND", "1"))
+OUTBOUND_PER_CHAT_BURST: float = float(os.environ.get("OUTBOUND_PER_CHAT_BURST", "5"))
+OUTBOUND_RETRY_AFTER_MAX_RETRIES: int = int(os.environ.get("OUTBOUND_RETRY_AFTER_MAX_RETRIES", "2"))
+OUTBOUND_METRICS_LOG_INTERVAL_SECONDS: float = float(os.environ.get("OUTBOUND_METRICS_LOG_INTERVAL_SECONDS", "60"))
+
+HANDLER_CONCURRENCY: int = int(os.environ.get("HANDLER_CONCURRENCY", "32"))
+HANDLER_SHED_QUEUE_DEPTH: int = int(os.environ.get("HANDLER_SHED_QUEUE_DEPTH", "50"))
+HANDLER_SERIALIZE_PER_USER: bool = os.environ.get("HANDLER_SERIALIZE_PER_USER", "true").lower() in ("1", "true", "yes")
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT_SECONDS", "20"))
+
+THROTTLE_MESSAGES_PER_SECOND: float = float(os.environ.get("THROTTLE_MESSAGES_PER_SECOND", "1"))
+THROTTLE_MESSAGE_BURST: float = float(os.environ.get("THROTTLE_MESSAGE_BURST", "5"))
+THROTTLE_CALLBACKS_PER_SECOND: float = float(os.environ.get("THROTTLE_CALLBACKS_PER_SECOND", "2"))
+THROTTLE_CALLBACK_BURST: float = float(os.environ.get("THROTTLE_CALLBACK_BURST", "10"))
+THROTTLE_SEARCHES_PER_SECOND: float = float(os.environ.get("THROTTLE_SEARCHES_PER_SECOND", "0.2"))
+THROTTLE_SEARCH_BURST: float = float(os.environ.get("THROTTLE_SEARCH_BURST", "3"))
 
-TMDB_BASE_URL: str = "https://api.themoviedb.org/3"
+TMDB_BASE_URL: str = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3").rstrip("/")
 TMDB_IMAGE_BASE_URL: str = "https://image.tmdb.org/t/p/w500"
 TMDB_API_KEY: str = os.environ.get("TMDB_API_KEY", "")
 TMDB_REQUEST_DISAMBIGUATION_LIMIT: int = int(os.environ.get("TMDB_REQUEST_DISAMBIGUATION_LIMIT", "3"))
+TMDB_REQUEST_TIMEOUT_SECONDS: float = float(os.environ.get("TMDB_REQUEST_TIMEOUT_SECONDS", "10"))
+TMDB_CONNECTION_POOL_SIZE: int = int(os.environ.get("TMDB_CONNECTION_POOL_SIZE", "20"))
+TMDB_KEEPALIVE_TIMEOUT_SECONDS: float = float(os.environ.get("TMDB_KEEPALIVE_TIMEOUT_SECONDS", "30"))
+TMDB_COALESCE_REQUESTS: bool = os.environ.get("TMDB_COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+TMDB_CIRCUIT_FAILURE_THRESHOLD: int = int(os.environ.get("TMDB_CIRCUIT_FAILURE_THRESHOLD", "5"))
+TMDB_CIRCUIT_RECOVERY_SECONDS: float = float(os.environ.get("TMDB_CIRCUIT_RECOVERY_SECONDS", "30"))
+TMDB_CIRCUIT_HALF_OPEN_MAX_CALLS: int = int(os.environ.get("TMDB_CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+TMDB_DETAILS_CACHE_TTL_SECONDS: float = float(os.environ.get("TMDB_DETAILS_CACHE_TTL_SECONDS", "3600"))
+TMDB_DETAILS_CACHE_MAX_ENTRIES: int = int(os.environ.get("TMDB_DETAILS_CACHE_MAX_ENTRIES", "2000"))
+TMDB_SEARCH_DEBOUNCE_SECONDS: float = float(os.environ.get("TMDB_SEARCH_DEBOUNCE_SECONDS", "0"))
+TMDB_PREFETCH_CONCURRENCY: int = int(os.environ.get("TMDB_PREFETCH_CONCURRENCY", "4"))
 
 TMDB_TV_URL_BASE = "https://www.themoviedb.org/tv/"
 IMDB_TITLE_URL_BASE = "https://www.imdb.com/title/"
@@ -27,3 +81,32 @@ MAX_NOTE_LENGTH: int = int(os.environ.get("MAX_NOTE_LENGTH", "1000"))
 MAX_REPORT_LENGTH: int = int(os.environ.get("MAX_REPORT_LENGTH", "2000"))
 
 DATA_DIR = Path(DATABASE_FILE_PATH).parent
+
+TMDB_SYNC_INTERVAL_SECONDS: float = float(os.environ.get("TMDB_SYNC_INTERVAL_SECONDS", "21600"))
+TMDB_SYNC_CONCURRENCY: int = int(os.environ.get("TMDB_SYNC_CONCURRENCY", "4"))
+BACKFILL_CONCURRENCY: int = int(os.environ.get("BACKFILL_CONCURRENCY", "4"))
+BACKFILL_REQUESTS_PER_SECOND: float = float(os.environ.get("BACKFILL_REQUESTS_PER_SECOND", "20"))
+BACKFILL_CHUNK_SIZE: int = int(os.environ.get("BACKFILL_CHUNK_SIZE", "200"))
+TMDB_SEARCH_MODE: str = os.environ.get("TMDB_SEARCH_MODE", "api").lower()
+TMDB_SEARCH_MAX_PAGES: int = int(os.environ.get("TMDB_SEARCH_MAX_PAGES", "5"))
+TMDB_LOCAL_SEARCH_PAGE_SIZE: int = int(os.environ.get("TMDB_LOCAL_SEARCH_PAGE_SIZE", "20"))
+TMDB_SEARCH_SESSION_TTL_SECONDS: float = float(os.environ.get("TMDB_SEARCH_SESSION_TTL_SECONDS", "900"))
+TMDB_SEARCH_SESSION_MAX_ENTRIES: int = int(os.environ.get("TMDB_SEARCH_SESSION_MAX_ENTRIES", "10000"))
+TMDB_EXPORTS_BASE_URL: str = os.environ.get("TMDB_EXPORTS_BASE_URL", "http://files.tmdb.org/p/exports")
+TITLE_INDEX_FILE_PATH: str = os.environ.get("TITLE_INDEX_FILE_PATH", str(DATA_DIR / "title_index.db"))
+
+FSM_STORAGE: str = os.environ.get("FSM_STORAGE", "sqlite").lower()
+FSM_STORAGE_FILE_PATH: str = os.environ.get("FSM_STORAGE_FILE_PATH", str(DATA_DIR / "fsm_state.db"))
+FSM_STATE_TTL_SECONDS: float = float(os.environ.get("FSM_STATE_TTL_SECONDS", "86400"))
+FSM_STORAGE_FLUSH_INTERVAL_SECONDS: float = float(os.environ.get("FSM_STORAGE_FLUSH_INTERVAL_SECONDS", "0.5"))
+FSM_MEMORY_MAX_ENTRIES: int = int(os.environ.get("FSM_MEMORY_MAX_ENTRIES", "10000"))
+
+OUTBOX_POLL_INTERVAL_SECONDS: float = float(os.environ.get("OUTBOX_POLL_INTERVAL_SECONDS", "30"))
+OUTBOX_BATCH_SIZE: int = int(os.environ.get("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS: int = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE_SECONDS: float = float(os.environ.get("OUTBOX_BACKOFF_BASE_SECONDS", "5"))
+OUTBOX_BACKOFF_MAX_SECONDS: float = float(os.environ.get("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+
+BROADCAST_CONCURRENCY: int = int(os.environ.get("BROADCAST_CONCURRENCY", "8"))
+BROADCAST_STATE_BATCH_SIZE: int = int(os.environ.get("BROADCAST_STATE_BATCH_SIZE", "50"))
+BROADCAST_PROGRESS_INTERVAL_SECONDS: float = float(os.environ.get("BROADCAST_PROGRESS_INTERVAL_SECONDS", "5"))
@@ -35,6 +35,7 @@ class AdminPanelCallback(Enum):
     VIEW_TASKS = "view_tasks"
     MANAGE_USERS = "manage_users"
     SEND_BROADCASTMENT = "send_broadcast"
+    BROADCAST_JOBS = "broadcast_jobs"
 
 
 class AdminTasksCallback(Enum):
@@ -60,6 +61,39 @@ class AdminBroadcastAction(Enum):
     CANCEL = "cancel_to_panel"
 
 
+class AdminBroadcastAudience(Enum):
+    APPROVED = "approved"
+    ACTIVE_7D = "active_7d"
+    ACTIVE_30D = "active_30d"
+    PENDING_APPROVAL = "pending_approval"
+
+
+class BroadcastJobStatus(Enum):
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+
+class BroadcastRecipientStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class BroadcastJobCallback(Enum):
+    PREFIX = "broadcast_job"
+    PAUSE = "pause"
+    RESUME = "resume"
+    CANCEL = "cancel"
+
+
+class OutboxStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class UserManageCallback(Enum):
     PREFIX = "user_manage"
     APPROVE = "approve"
@@ -101,9 +135,18 @@ TMDB_TV_URL_BASE = "https://www.themoviedb.org/tv/"
 IMDB_TITLE_URL_BASE = "https://www.imdb.com/title/"
 TMDB_MOVIE_URL_BASE = "https://www.themoviedb.org/movie/"
 
+BTN_BROADCAST_AUDIENCE_ACTIVE_30D = "🗓️ Active in last 30 days"
+BTN_BROADCAST_AUDIENCE_ACTIVE_7D = "🟢 Active in last 7 days"
+BTN_BROADCAST_AUDIENCE_APPROVED = "👥 All approved users"
+BTN_BROADCAST_AUDIENCE_PENDING = "⏳ Awaiting approval"
 BTN_BROADCAST_CANCEL = "❌ Cancel"
+BTN_BROADCAST_JOB_CANCEL = "⏹️ Stop"
+BTN_BROADCAST_JOB_PAUSE = "⏸️ Pause"
+BTN_BROADCAST_JOB_RESUME = "▶️ Resume"
+BTN_BROADCAST_JOBS = "📋 Broadcast Jobs"
 BTN_BROADCAST_MUTED = "🤫 Muted"
 BTN_BROADCAST_UNMUTED = "🔊 Unmuted"
+BTN_ADMIN_DIGEST_REVIEW = "🔍 Review #{request_id}"
 BTN_APPROVE_USER = "✅ Approve"
 BTN_REJECT_USER = "❌ Reject"
 BTN_BACK_TO_ADMIN_PANEL = "⬅️ Back to Admin Panel"
@@ -113,6 +156,7 @@ BTN_CONFIRM_REQUEST = "✅ Yes, request it"
 BTN_CONFIRM_WITH_NOTE = "📝 Yes, with a note"
 BTN_MAYBE_LATER = "⏱️ Maybe Later"
 BTN_MEDIA_MANUAL_REQUEST = "📝 Other"
+BTN_MEDIA_MORE_RESULTS = "🔎 More results"
 BTN_MOD_ACKNOWLEDGE = "👀 Acknowledge"
 BTN_MOD_APPROVE = "✅ Approve"
 BTN_MOD_APPROVE_W_NOTE = "📝 Approve w/ Note"
@@ -134,6 +178,7 @@ BTN_MANAGE_PENDING_USERS = "👤 Manage Pending Users"
 CMD_CANCEL_DESCRIPTION = "❌ Cancel Current Operation (if stuck)"
 CMD_START_DESCRIPTION = "🏁 Start"
 
+ERR_BUSY_CALLBACK = "⏳ The bot is busy right now. Please try again in a moment."
 ERR_CALLBACK_INVALID_MEDIA_SELECTION = "❗ Oops! An error occurred. Please try searching again."
 ERR_MANUAL_REQUEST_TOO_SHORT = "✍️ Your description is a bit short. Please provide more details."
 ERR_MEDIA_DETAILS_FETCH_FAILED = "🔎❗ Sorry, I couldn't fetch details. Please try another selection or search again."
@@ -143,6 +188,9 @@ ERR_PROBLEM_DESCRIPTION_TOO_SHORT = (
     " cancel button in the menu."
 )
 ERR_REQUEST_EXPIRED = "⏳ Error: Your selection seems to have expired. Please start over."
+ERR_THROTTLED_CALLBACK = "⏳ Too many taps. Please wait a moment."
+ERR_THROTTLED_MESSAGE = "⏳ You're sending messages too quickly. Please wait a few seconds and try again."
+ERR_THROTTLED_SEARCH = "⏳ You're searching too quickly. Please wait a few seconds before searching again."
 
 MSG_ACCESS_DENIED = "Access denied."
 MSG_NOT_AUTHORIZED_ALERT = "Not authorized"
@@ -158,7 +206,7 @@ MSG_ADMIN_NEW_MEDIA_REQUEST_NOTIFICATION = (
     "🔔 New media request (ID: {request_id}) submitted for '{title}'. Please review in the admin panel."
 )
 MSG_ADMIN_ACTION_ERROR = "❗ Unexpected error processing request {request_id}"
-MSG_ADMIN_ACTION_NOTIFICATION_FAILED = " (User notification failed)"
+MSG_ADMIN_ACTION_NOTIFICATION_QUEUED = ". User notification queued."
 MSG_ADMIN_ACTION_SUCCESS = "Request ID {request_id} status set to {new_status}"
 MSG_ADMIN_ACTION_SUCCESS_WITH_NOTE = "Request ID {request_id} status set to {new_status} with note"
 MSG_ADMIN_ACTION_TAKEN_BY = "Action taken by "
@@ -167,9 +215,30 @@ MSG_ADMIN_ACTION_UNKNOWN = "❗ Unknown action '{action_full_key}' for request I
 MSG_ADMIN_ACTION_UNKNOWN_STATUS = "❗ Unknown new_status '{new_status}' or missing template for request ID {request_id}"
 MSG_ADMIN_ACTION_USER_NOT_FOUND = " (User chat_id not found)"
 MSG_ADMIN_BROADCAST_CANCELLED = "Broadcast cancelled."
+MSG_ADMIN_BROADCAST_DUPLICATE = (
+    "⚠️ An identical broadcast (#{job_id}) is still in progress or paused. Manage it from Broadcast Jobs in the admin"
+    " panel instead of sending it again."
+)
 MSG_ADMIN_BROADCAST_FAILURES_SUFFIX = " {failed_count} failures."
-MSG_ADMIN_BROADCAST_NO_USERS = "👥 No registered users found to send broadcast to."
+MSG_ADMIN_BROADCAST_JOB_CANCELLED = (
+    "⏹️ Broadcast #{job_id} stopped: {sent_count} sent, {failed_count} failed, {remaining_count} not sent."
+)
+MSG_ADMIN_BROADCAST_JOB_ITEM = "#{job_id} {status}: {sent_count}/{total_count} sent, {failed_count} failed"
+MSG_ADMIN_BROADCAST_JOB_NOT_FOUND = "Broadcast not found or already finished."
+MSG_ADMIN_BROADCAST_JOB_PAUSED = (
+    "⏸️ Broadcast #{job_id} paused: {sent_count} sent, {failed_count} failed, {remaining_count} remaining."
+)
+MSG_ADMIN_BROADCAST_JOB_RESUMED = "▶️ Broadcast #{job_id} resumed."
+MSG_ADMIN_BROADCAST_JOBS_EMPTY = "📋 No broadcasts are running or paused."
+MSG_ADMIN_BROADCAST_NO_USERS = "👥 No reachable users match this audience."
+MSG_ADMIN_BROADCAST_STARTED = "📢 Broadcast started for {total_count} users. Progress will be shown here."
+MSG_ADMIN_BROADCAST_PROGRESS = (
+    "📢 Broadcast in progress: {sent_count} sent, {failed_count} failed, {remaining_count} remaining ({rate} msg/s)."
+)
 MSG_ADMIN_BROADCAST_SENT_CONFIRM = "✅ Broadcast sent to {sent_count} users."
+MSG_ADMIN_DIGEST_NEW_USER = "👤 New user waiting for approval: {user_name}"
+MSG_ADMIN_DIGEST_REQUEST_ITEM = "{icon} #{request_id} {title} from {user_name}"
+MSG_ADMIN_NEW_USER_PENDING = "👤 New user waiting for approval: {user_name} (ID: {user_id})"
 MSG_ADMIN_CONTEXT_ERROR_FOR_NOTE = "❗Error: Could not retrieve context for adding note. Please try the action again."
 MSG_ITEM_MESSAGE_DIVIDER = "~~~~~"
 MSG_ADMIN_MODERATE_UPDATE_FALLBACK = "Update for request ID {request_id}: {log_message} (Note: {admin_note})"
@@ -215,6 +284,9 @@ MSG_MEDIA_NO_RESULTS = (
     "😕 Sorry, I couldn't find any results for \"{query_text}\". You can try a different name, or choose 'Other / Not"
     " Found'."
 )
+MSG_MEDIA_SEARCH_UNAVAILABLE = (
+    "⚠️ Media search is temporarily unavailable. You can still submit a manual request with 'Other', or try again later."
+)
 MSG_MEDIA_RESULTS_FOUND = '🔍 Here\'s what I found for "{query_text}". Please select one:'
 MSG_MEDIA_SEARCHING = '🔎 Searching for "{query_text}"...'
 
@@ -283,6 +355,7 @@ MSG_USER_UNKNOWN_STATUS_INFO = (
     "⚠️ An issue occurred with your account status. Please contact support or try /start again."
 )
 
+PROMPT_ADMIN_BROADCAST_AUDIENCE = "👥 Who should receive this broadcast?"
 PROMPT_ADMIN_BROADCAST_TYPE = "📢 Choose broadcast type:"
 PROMPT_ADMIN_BROADCAST_TYPING_MESSAGE = (
     "✍️ Please type your {muted_status} broadcast message below. You can cancel from the admin panel if you return"
@@ -308,6 +381,8 @@ PROMPT_PROBLEM_DESCRIPTION_RETRY = "✍️ Please type your problem description,
 
 PROMPT_REQUEST_NOTE = "📝 Please send a short note for your request."
 
+TITLE_ADMIN_BROADCAST_JOBS = "📋 Broadcast Jobs"
+TITLE_ADMIN_DIGEST = "🗂️ {count} new items need your attention"
 TITLE_ADMIN_PANEL = "🧑‍💼 Admin Panel"
 TITLE_ADMIN_TASKS_LIST = "📋 Admin Tasks (Page {page} of {total_pages})"
 TITLE_MANAGE_USERS_LIST = "👤 Pending Users (Page {page} of {total_pages})"
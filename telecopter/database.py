@@ -2,15 +2,42 @@ import datetime
 import aiosqlite
 
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Set, Dict, Any, Tuple, AsyncIterator
 
+from telecopter.cache import TTLCache
 from telecopter.logger import setup_logger
-from telecopter.constants import UserStatus, RequestStatus
-from telecopter.config import DATABASE_FILE_PATH, DEFAULT_PAGE_SIZE
+from telecopter.constants import (
+    UserStatus,
+    RequestStatus,
+    MediaType,
+    BroadcastJobStatus,
+    BroadcastRecipientStatus,
+    OutboxStatus,
+)
+from telecopter.config import (
+    DATABASE_FILE_PATH,
+    DEFAULT_PAGE_SIZE,
+    USER_STATUS_CACHE_TTL_SECONDS,
+    USER_STATUS_CACHE_MAX_ENTRIES,
+)
 
 
 logger = setup_logger(__name__)
 
+TRACKED_REQUEST_STATUSES = (RequestStatus.PENDING_ADMIN.value, RequestStatus.APPROVED.value)
+
+_approval_status_cache: TTLCache[str] = TTLCache(
+    max_size=USER_STATUS_CACHE_MAX_ENTRIES, ttl=USER_STATUS_CACHE_TTL_SECONDS
+)
+
+
+async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, definition: str):
+    async with db.execute(f"pragma table_info({table})") as cursor:
+        existing_columns = {row[1] for row in await cursor.fetchall()}
+    if column not in existing_columns:
+        await db.execute(f"alter table {table} add column {column} {definition}")
+        logger.info("added column %s to %s table.", column, table)
+
 
 async def initialize_database():
     db_path = Path(DATABASE_FILE_PATH)
@@ -27,6 +54,11 @@ async def initialize_database():
                 last_active_at text not null default current_timestamp
             )
         """)
+        await _ensure_column(db, "users", "unreachable_at", "text")
+        await _ensure_column(db, "users", "unreachable_reason", "text")
+        await db.execute(
+            "create index if not exists idx_users_broadcast on users (approval_status, unreachable_at, last_active_at)"
+        )
         logger.info("users table initialized.")
 
         await db.execute("""
@@ -48,6 +80,8 @@ async def initialize_database():
                                 foreign key (user_id) references users (user_id)
                             )
                             """)
+        await _ensure_column(db, "requests", "tmdb_status", "text")
+        await db.execute("create index if not exists idx_requests_tmdb_id on requests (tmdb_id, request_type)")
         logger.info("requests table initialized.")
 
         await db.execute("""
@@ -75,6 +109,99 @@ async def initialize_database():
                             )
                             """)
         logger.info("admin_logs table initialized.")
+
+        await db.execute("""
+                            create table if not exists poster_files
+                            (
+                                poster_url  text primary key,
+                                file_id     text not null,
+                                created_at  text not null default current_timestamp
+                            )
+                            """)
+        logger.info("poster_files table initialized.")
+
+        await db.execute("""
+                            create table if not exists sync_state
+                            (
+                                key         text primary key,
+                                value       text not null,
+                                updated_at  text not null default current_timestamp
+                            )
+                            """)
+        logger.info("sync_state table initialized.")
+
+        await db.execute("""
+                            create table if not exists media_status_events
+                            (
+                                event_id    integer primary key autoincrement,
+                                tmdb_id     integer not null,
+                                media_type  text   not null,
+                                old_status  text,
+                                new_status  text,
+                                created_at  text   not null default current_timestamp
+                            )
+                            """)
+        logger.info("media_status_events table initialized.")
+
+        await db.execute(f"""
+                            create table if not exists broadcast_jobs
+                            (
+                                job_id            integer primary key autoincrement,
+                                admin_user_id     integer not null,
+                                message_text      text    not null,
+                                admin_text        text    not null,
+                                is_muted          boolean not null default 0,
+                                status            text    not null default '{BroadcastJobStatus.RUNNING.value}',
+                                total_count       integer not null default 0,
+                                sent_count        integer not null default 0,
+                                failed_count      integer not null default 0,
+                                status_chat_id    integer,
+                                status_message_id integer,
+                                created_at        text    not null default current_timestamp,
+                                updated_at        text    not null default current_timestamp,
+                                finished_at       text,
+                                foreign key (admin_user_id) references users (user_id)
+                            )
+                            """)
+        await db.execute("create index if not exists idx_broadcast_jobs_status on broadcast_jobs (status)")
+        logger.info("broadcast_jobs table initialized.")
+
+        await db.execute(f"""
+                            create table if not exists broadcast_recipients
+                            (
+                                job_id      integer not null,
+                                chat_id     integer not null,
+                                status      text    not null default '{BroadcastRecipientStatus.PENDING.value}',
+                                updated_at  text,
+                                primary key (job_id, chat_id),
+                                foreign key (job_id) references broadcast_jobs (job_id)
+                            )
+                            """)
+        await db.execute(
+            "create index if not exists idx_broadcast_recipients_status on broadcast_recipients (job_id, status)"
+        )
+        logger.info("broadcast_recipients table initialized.")
+
+        await db.execute(f"""
+                            create table if not exists notification_outbox
+                            (
+                                outbox_id       integer primary key autoincrement,
+                                chat_id         integer not null,
+                                message_text    text    not null,
+                                request_id      integer,
+                                status          text    not null default '{OutboxStatus.PENDING.value}',
+                                attempts        integer not null default 0,
+                                next_attempt_at text    not null default current_timestamp,
+                                last_error      text,
+                                created_at      text    not null default current_timestamp,
+                                sent_at         text,
+                                foreign key (request_id) references requests (request_id)
+                            )
+                            """)
+        await db.execute(
+            "create index if not exists idx_notification_outbox_due on notification_outbox (status, next_attempt_at)"
+        )
+        logger.info("notification_outbox table initialized.")
         await db.commit()
     logger.info("database initialization complete.")
 
@@ -91,10 +218,12 @@ async def add_or_update_user(
             await db.execute(
                 """
                 update users
-                set chat_id        = ?,
-                    username       = ?,
-                    first_name     = ?,
-                    last_active_at = ?
+                set chat_id            = ?,
+                    username           = ?,
+                    first_name         = ?,
+                    last_active_at     = ?,
+                    unreachable_at     = null,
+                    unreachable_reason = null
                 where user_id = ?
                 """,
                 (chat_id, username, first_name, now, user_id),
@@ -109,6 +238,7 @@ async def add_or_update_user(
                 (user_id, chat_id, username, first_name, initial_approval_status, now, now),
             )
         await db.commit()
+        _approval_status_cache.pop(user_id)
         logger.debug(
             "user %s (chat_id: %s) added or updated. admin_flag: %s, new_user: %s",
             user_id,
@@ -126,10 +256,16 @@ async def get_user(user_id: int) -> aiosqlite.Row | None:
 
 
 async def get_user_approval_status(user_id: int) -> Optional[str]:
+    cached_status = _approval_status_cache.get(user_id)
+    if cached_status is not None:
+        return cached_status
     async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
         async with db.execute("select approval_status from users where user_id = ?", (user_id,)) as cursor:
             row = await cursor.fetchone()
-            return row[0] if row else None
+    approval_status = row[0] if row else None
+    if approval_status == UserStatus.APPROVED.value:
+        _approval_status_cache.set(user_id, approval_status)
+    return approval_status
 
 
 async def update_user_approval_status(user_id: int, new_status: str) -> bool:
@@ -140,6 +276,7 @@ async def update_user_approval_status(user_id: int, new_status: str) -> bool:
             (new_status, now, user_id),
         )
         await db.commit()
+        _approval_status_cache.pop(user_id)
         if cursor.rowcount > 0:
             logger.info("user %s approval_status updated to %s.", user_id, new_status)
             return True
@@ -177,14 +314,15 @@ async def add_request(
     imdb_id: Optional[str] = None,
     user_query: Optional[str] = None,
     user_note: Optional[str] = None,
+    tmdb_status: Optional[str] = None,
 ) -> int:
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
     async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
         cursor = await db.execute(
             """
             insert into requests (user_id, request_type, status, tmdb_id, title, year, imdb_id, user_query, user_note,
-                                    created_at, updated_at)
-            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                    tmdb_status, created_at, updated_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 user_id,
@@ -196,6 +334,7 @@ async def add_request(
                 imdb_id,
                 user_query,
                 user_note,
+                tmdb_status,
                 now,
                 now,
             ),
@@ -224,6 +363,7 @@ async def add_media_request(
     request_type: str,
     user_query: str | None,
     user_note: str | None,
+    tmdb_status: str | None = None,
 ) -> int:
     return await add_request(
         user_id=user_id,
@@ -234,6 +374,7 @@ async def add_media_request(
         imdb_id=imdb_id,
         user_query=user_query,
         user_note=user_note,
+        tmdb_status=tmdb_status,
     )
 
 
@@ -272,26 +413,114 @@ async def get_request_by_id(request_id: int) -> aiosqlite.Row | None:
             return await cursor.fetchone()
 
 
-async def update_request_status(request_id: int, new_status: str, admin_note: str | None = None) -> bool:
+async def update_request_status_with_notification(
+    request_id: int,
+    new_status: str,
+    admin_note: str | None,
+    admin_user_id: int,
+    action: str,
+    notification_text: str,
+) -> Tuple[bool, bool]:
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
     async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
-        if admin_note is not None:
-            cursor = await db.execute(
-                "update requests set status = ?, admin_note = ?, updated_at = ? where request_id = ?",
-                (new_status, admin_note, now, request_id),
-            )
-        else:
-            cursor = await db.execute(
-                "update requests set status = ?, updated_at = ? where request_id = ?",
-                (new_status, now, request_id),
-            )
+        cursor = await db.execute(
+            """
+            update requests
+            set status     = ?,
+                admin_note = coalesce(?, admin_note),
+                updated_at = ?
+            where request_id = ?
+            """,
+            (new_status, admin_note, now, request_id),
+        )
+        if cursor.rowcount == 0:
+            await db.rollback()
+            logger.warning("failed to update status for request %s. request not found or no change.", request_id)
+            return False, False
+
+        await db.execute(
+            """
+            insert into admin_logs (admin_user_id, request_id, action, details, created_at)
+            values (?, ?, ?, ?, ?)
+            """,
+            (admin_user_id, request_id, action, admin_note, now),
+        )
+        cursor = await db.execute(
+            """
+            insert into notification_outbox (chat_id, message_text, request_id, status, next_attempt_at, created_at)
+            select u.chat_id, ?, r.request_id, ?, ?, ?
+            from requests r
+                     join users u on r.user_id = u.user_id
+            where r.request_id = ?
+            """,
+            (notification_text, OutboxStatus.PENDING.value, now, now, request_id),
+        )
+        notification_queued = cursor.rowcount > 0
+        await db.commit()
+    logger.info(
+        "request %s status updated to %s by admin %s. notification queued: %s",
+        request_id,
+        new_status,
+        admin_user_id,
+        notification_queued,
+    )
+    return True, notification_queued
+
+
+async def get_due_outbox_messages(limit: int) -> List[aiosqlite.Row]:
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            select * from notification_outbox
+            where status = ?
+              and next_attempt_at <= ?
+            order by next_attempt_at, outbox_id
+            limit ?
+            """,
+            (OutboxStatus.PENDING.value, now, limit),
+        ) as cursor:
+            return await cursor.fetchall()
+
+
+async def get_next_outbox_attempt_at() -> Optional[str]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute(
+            "select min(next_attempt_at) from notification_outbox where status = ?", (OutboxStatus.PENDING.value,)
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def mark_outbox_messages_sent(outbox_ids: List[int]):
+    if not outbox_ids:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.executemany(
+            "update notification_outbox set status = ?, attempts = attempts + 1, sent_at = ? where outbox_id = ?",
+            [(OutboxStatus.SENT.value, now, outbox_id) for outbox_id in outbox_ids],
+        )
+        await db.commit()
+
+
+async def reschedule_outbox_messages(retries: List[Tuple[int, str, str, str]]):
+    if not retries:
+        return
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.executemany(
+            """
+            update notification_outbox
+            set status          = ?,
+                attempts        = attempts + 1,
+                next_attempt_at = ?,
+                last_error      = ?
+            where outbox_id = ?
+            """,
+            [(status, next_attempt_at, error, outbox_id) for outbox_id, status, next_attempt_at, error in retries],
+        )
         await db.commit()
-        updated_rows = cursor.rowcount
-        if updated_rows > 0:
-            logger.info("request %s status updated to %s.", request_id, new_status)
-            return True
-        logger.warning("failed to update status for request %s. request not found or no change.", request_id)
-        return False
 
 
 async def log_admin_action(admin_user_id: int, action: str, details: str | None = None, request_id: int | None = None):
@@ -313,24 +542,35 @@ async def log_admin_action(admin_user_id: int, action: str, details: str | None
         )
 
 
-async def get_all_user_chat_ids() -> list[int]:
+async def get_broadcast_chat_ids(approval_statuses: List[str], active_since: Optional[str] = None) -> List[int]:
+    placeholders = ", ".join("?" for _ in approval_statuses)
+    query = f"""
+                select chat_id
+                from users
+                where approval_status in ({placeholders})
+                  and unreachable_at is null
+                """
+    params: List[Any] = list(approval_statuses)
+    if active_since:
+        query += " and last_active_at >= ?"
+        params.append(active_since)
     async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
-        async with db.execute("select distinct chat_id from users") as cursor:
+        async with db.execute(query, params) as cursor:
             rows = await cursor.fetchall()
             return [row[0] for row in rows]
 
 
-async def get_request_submitter_chat_id(request_id: int) -> int | None:
+async def mark_chats_unreachable(unreachable_chats: List[Tuple[int, str]]):
+    if not unreachable_chats:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
     async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
-        query = """
-                    select u.chat_id
-                    from requests r
-                            join users u on r.user_id = u.user_id
-                    where r.request_id = ?
-                    """
-        async with db.execute(query, (request_id,)) as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+        await db.executemany(
+            "update users set unreachable_at = ?, unreachable_reason = ? where chat_id = ?",
+            [(now, reason, chat_id) for chat_id, reason in unreachable_chats],
+        )
+        await db.commit()
+    logger.info("marked %s chats as unreachable.", len(unreachable_chats))
 
 
 async def get_actionable_admin_requests(page: int, page_size: int = DEFAULT_PAGE_SIZE) -> List[aiosqlite.Row]:
@@ -363,5 +603,318 @@ async def get_actionable_admin_requests_count() -> int:
         return result[0] if result and result[0] is not None else 0
 
 
+async def get_poster_file_id(poster_url: str) -> Optional[str]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute("select file_id from poster_files where poster_url = ?", (poster_url,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def save_poster_file_id(poster_url: str, file_id: str):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.execute(
+            """
+            insert into poster_files (poster_url, file_id, created_at)
+            values (?, ?, ?)
+            on conflict (poster_url) do update set file_id = excluded.file_id, created_at = excluded.created_at
+            """,
+            (poster_url, file_id, now),
+        )
+        await db.commit()
+        logger.debug("cached telegram file_id for poster %s.", poster_url)
+
+
+async def delete_poster_file_id(poster_url: str):
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.execute("delete from poster_files where poster_url = ?", (poster_url,))
+        await db.commit()
+
+
+async def get_sync_state(key: str) -> Optional[str]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute("select value from sync_state where key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def set_sync_state(key: str, value: str):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.execute(
+            """
+            insert into sync_state (key, value, updated_at)
+            values (?, ?, ?)
+            on conflict (key) do update set value = excluded.value, updated_at = excluded.updated_at
+            """,
+            (key, value, now),
+        )
+        await db.commit()
+
+
+async def get_tracked_tmdb_ids(media_type: str) -> Set[int]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute(
+            "select distinct tmdb_id from requests where request_type = ? and tmdb_id is not null and status in (?, ?)",
+            (media_type, *TRACKED_REQUEST_STATUSES),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return {row[0] for row in rows}
+
+
+async def apply_tmdb_metadata(media_details: Dict[str, Any]) -> Optional[str]:
+    tmdb_id = media_details["tmdb_id"]
+    media_type = media_details["media_type"]
+    new_tmdb_status = media_details.get("status")
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute(
+            """
+            select tmdb_status
+            from requests
+            where tmdb_id = ?
+              and request_type = ?
+              and status in (?, ?)
+              and tmdb_status is not null
+            order by updated_at desc
+            limit 1
+            """,
+            (tmdb_id, media_type, *TRACKED_REQUEST_STATUSES),
+        ) as cursor:
+            row = await cursor.fetchone()
+            old_tmdb_status = row[0] if row else None
+
+        await db.execute(
+            """
+            update requests
+            set year        = coalesce(?, year),
+                imdb_id     = coalesce(?, imdb_id),
+                tmdb_status = coalesce(?, tmdb_status),
+                updated_at  = ?
+            where tmdb_id = ?
+              and request_type = ?
+              and status in (?, ?)
+            """,
+            (
+                media_details.get("year"),
+                media_details.get("imdb_id"),
+                new_tmdb_status,
+                now,
+                tmdb_id,
+                media_type,
+                *TRACKED_REQUEST_STATUSES,
+            ),
+        )
+
+        status_changed = (
+            old_tmdb_status is not None and new_tmdb_status is not None and new_tmdb_status != old_tmdb_status
+        )
+        if status_changed:
+            await db.execute(
+                """
+                insert into media_status_events (tmdb_id, media_type, old_status, new_status, created_at)
+                values (?, ?, ?, ?, ?)
+                """,
+                (tmdb_id, media_type, old_tmdb_status, new_tmdb_status, now),
+            )
+        await db.commit()
+
+    if status_changed:
+        logger.info(
+            "tmdb status for %s id %s changed from %s to %s.", media_type, tmdb_id, old_tmdb_status, new_tmdb_status
+        )
+        return new_tmdb_status
+    return None
+
+
+async def iter_backfill_candidates(chunk_size: int) -> AsyncIterator[List[aiosqlite.Row]]:
+    last_request_id = 0
+    while True:
+        async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                """
+                select request_id, request_type, tmdb_id, title, year, imdb_id
+                from requests
+                where request_id > ?
+                  and ((request_type in (?, ?) and tmdb_id is not null and (year is null or imdb_id is null))
+                    or (request_type = ? and tmdb_id is null))
+                order by request_id
+                limit ?
+                """,
+                (
+                    last_request_id,
+                    MediaType.MOVIE.value,
+                    MediaType.TV.value,
+                    MediaType.MANUAL.value,
+                    chunk_size,
+                ),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        if not rows:
+            return
+        last_request_id = rows[-1]["request_id"]
+        yield rows
+
+
+async def apply_request_backfill(updates: List[Dict[str, Any]]) -> int:
+    if not updates:
+        return 0
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.executemany(
+            """
+            update requests
+            set tmdb_id      = coalesce(tmdb_id, ?),
+                request_type = ?,
+                year         = coalesce(year, ?),
+                imdb_id      = coalesce(imdb_id, ?),
+                tmdb_status  = coalesce(tmdb_status, ?),
+                updated_at   = ?
+            where request_id = ?
+            """,
+            [
+                (
+                    update["tmdb_id"],
+                    update["media_type"],
+                    update.get("year"),
+                    update.get("imdb_id"),
+                    update.get("status"),
+                    now,
+                    update["request_id"],
+                )
+                for update in updates
+            ],
+        )
+        await db.commit()
+    logger.debug("applied metadata backfill to %s requests.", len(updates))
+    return len(updates)
+
+
+async def create_broadcast_job(
+    admin_user_id: int,
+    message_text: str,
+    admin_text: str,
+    is_muted: bool,
+    chat_ids: List[int],
+    status_chat_id: int,
+    status_message_id: int,
+) -> int:
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        cursor = await db.execute(
+            """
+            insert into broadcast_jobs (admin_user_id, message_text, admin_text, is_muted, status, total_count,
+                                        status_chat_id, status_message_id, created_at, updated_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                admin_user_id,
+                message_text,
+                admin_text,
+                is_muted,
+                BroadcastJobStatus.RUNNING.value,
+                len(chat_ids),
+                status_chat_id,
+                status_message_id,
+                now,
+                now,
+            ),
+        )
+        job_id = cursor.lastrowid
+        await db.executemany(
+            "insert or ignore into broadcast_recipients (job_id, chat_id, status) values (?, ?, ?)",
+            [(job_id, chat_id, BroadcastRecipientStatus.PENDING.value) for chat_id in chat_ids],
+        )
+        await db.commit()
+    logger.info("broadcast job %s created by admin %s for %s chats.", job_id, admin_user_id, len(chat_ids))
+    return job_id
+
+
+async def get_broadcast_job(job_id: int) -> aiosqlite.Row | None:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute("select * from broadcast_jobs where job_id = ?", (job_id,)) as cursor:
+            return await cursor.fetchone()
+
+
+async def get_broadcast_jobs_by_status(statuses: List[str]) -> List[aiosqlite.Row]:
+    placeholders = ", ".join("?" for _ in statuses)
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"select * from broadcast_jobs where status in ({placeholders}) order by job_id", statuses
+        ) as cursor:
+            return await cursor.fetchall()
+
+
+async def find_unfinished_broadcast_job(message_text: str) -> Optional[int]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute(
+            "select job_id from broadcast_jobs where message_text = ? and status in (?, ?) order by job_id limit 1",
+            (message_text, BroadcastJobStatus.RUNNING.value, BroadcastJobStatus.PAUSED.value),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def get_pending_broadcast_chat_ids(job_id: int) -> List[int]:
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        async with db.execute(
+            "select chat_id from broadcast_recipients where job_id = ? and status = ? order by chat_id",
+            (job_id, BroadcastRecipientStatus.PENDING.value),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [row[0] for row in rows]
+
+
+async def record_broadcast_deliveries(job_id: int, deliveries: List[Tuple[int, str]]):
+    if not deliveries:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    sent_count = sum(1 for _, status in deliveries if status == BroadcastRecipientStatus.SENT.value)
+    failed_count = len(deliveries) - sent_count
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        await db.executemany(
+            "update broadcast_recipients set status = ?, updated_at = ? where job_id = ? and chat_id = ?",
+            [(status, now, job_id, chat_id) for chat_id, status in deliveries],
+        )
+        await db.execute(
+            """
+            update broadcast_jobs
+            set sent_count   = sent_count + ?,
+                failed_count = failed_count + ?,
+                updated_at   = ?
+            where job_id = ?
+            """,
+            (sent_count, failed_count, now, job_id),
+        )
+        await db.commit()
+    logger.debug("recorded %s broadcast deliveries for job %s.", len(deliveries), job_id)
+
+
+async def update_broadcast_job_status(job_id: int, new_status: str, expected_statuses: List[str]) -> bool:
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    is_final = new_status in (BroadcastJobStatus.COMPLETED.value, BroadcastJobStatus.CANCELLED.value)
+    placeholders = ", ".join("?" for _ in expected_statuses)
+    async with aiosqlite.connect(DATABASE_FILE_PATH) as db:
+        cursor = await db.execute(
+            f"""
+            update broadcast_jobs
+            set status      = ?,
+                updated_at  = ?,
+                finished_at = ?
+            where job_id = ?
+              and status in ({placeholders})
+            """,
+            (new_status, now, now if is_final else None, job_id, *expected_statuses),
+        )
+        await db.commit()
+        if cursor.rowcount > 0:
+            logger.info("broadcast job %s status set to %s.", job_id, new_status)
+            return True
+        return False
+
+
 class DatabaseError(Exception):
     pass
@@ -0,0 +1,133 @@
+import json
+import random
+import asyncio
+
+from pathlib import Path
+from aiohttp import web
+from collections import Counter
+from typing import Dict, Any, Optional
+
+from telecopter.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+FAKE_CATALOG_SIZE = 1000
+FAKE_RESULTS_PER_PAGE = 20
+FAKE_TOTAL_PAGES = 3
+
+
+def load_fixtures(fixtures_dir: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    fixtures: Dict[str, Dict[str, Any]] = {}
+    if not fixtures_dir:
+        return fixtures
+    root = Path(fixtures_dir)
+    for fixture_path in root.rglob("*.json"):
+        route = "/" + fixture_path.relative_to(root).with_suffix("").as_posix()
+        fixtures[route] = json.loads(fixture_path.read_text())
+    logger.info("loaded %s recorded tmdb fixtures from %s.", len(fixtures), root)
+    return fixtures
+
+
+def _fake_details(media_type: str, tmdb_id: int) -> Dict[str, Any]:
+    year = 1950 + tmdb_id % 75
+    details: Dict[str, Any] = {
+        "id": tmdb_id,
+        "overview": f"Synthetic overview for {media_type} {tmdb_id}.",
+        "poster_path": f"/fake_{media_type}_{tmdb_id}.jpg",
+        "genres": [{"name": "Drama"}, {"name": "Comedy"}][: 1 + tmdb_id % 2],
+        "status": "Released" if tmdb_id % 10 else "In Production",
+        "tagline": None,
+        "external_ids": {"imdb_id": f"tt{tmdb_id:07d}"},
+    }
+    if media_type == "movie":
+        details.update(title=f"Movie {tmdb_id}", release_date=f"{year}-01-01")
+    else:
+        details.update(name=f"Show {tmdb_id}", first_air_date=f"{year}-01-01")
+    return details
+
+
+def _fake_search(query: str, page: int) -> Dict[str, Any]:
+    rng = random.Random(f"{query}:{page}")
+    results = []
+    for _ in range(FAKE_RESULTS_PER_PAGE):
+        media_type = rng.choice(["movie", "tv"])
+        tmdb_id = rng.randint(1, FAKE_CATALOG_SIZE)
+        item = _fake_details(media_type, tmdb_id)
+        item["media_type"] = media_type
+        results.append(item)
+    return {
+        "page": page,
+        "results": results,
+        "total_pages": FAKE_TOTAL_PAGES,
+        "total_results": FAKE_TOTAL_PAGES * FAKE_RESULTS_PER_PAGE,
+    }
+
+
+def _fake_changes(media_type: str, start_date: str, page: int) -> Dict[str, Any]:
+    rng = random.Random(f"{media_type}:{start_date}:{page}")
+    changed_ids = rng.sample(range(1, FAKE_CATALOG_SIZE + 1), 100)
+    return {"page": page, "results": [{"id": tmdb_id, "adult": False} for tmdb_id in changed_ids], "total_pages": 1}
+
+
+@web.middleware
+async def _latency_and_errors_middleware(request: web.Request, handler):
+    config = request.app["fake_config"]
+    request.app["stats"][request.path] += 1
+    delay_ms = max(0.0, random.gauss(config["latency_ms"], config["jitter_ms"]))
+    if delay_ms:
+        await asyncio.sleep(delay_ms / 1000)
+    if random.random() < config["error_rate"]:
+        status = random.choice([429, 503])
+        request.app["stats"][f"error_{status}"] += 1
+        return web.json_response({"status_message": "injected failure"}, status=status)
+    return await handler(request)
+
+
+async def _handle(request: web.Request) -> web.Response:
+    fixtures = request.app["fixtures"]
+    path = request.path
+    if path in fixtures:
+        return web.json_response(fixtures[path])
+
+    page = int(request.query.get("page", "1"))
+    parts = path.strip("/").split("/")
+    if path == "/search/multi":
+        return web.json_response(_fake_search(request.query.get("query", ""), page))
+    if len(parts) == 2 and parts[0] in ("movie", "tv") and parts[1] == "changes":
+        return web.json_response(_fake_changes(parts[0], request.query.get("start_date", ""), page))
+    if len(parts) == 2 and parts[0] in ("movie", "tv") and parts[1].isdigit():
+        return web.json_response(_fake_details(parts[0], int(parts[1])))
+    return web.json_response({"status_message": "not found"}, status=404)
+
+
+def create_app(
+    latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rate: float = 0.0, fixtures_dir: Optional[str] = None
+) -> web.Application:
+    app = web.Application(middlewares=[_latency_and_errors_middleware])
+    app["fake_config"] = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate}
+    app["fixtures"] = load_fixtures(fixtures_dir)
+    app["stats"] = Counter()
+    app.router.add_get("/{tail:.*}", _handle)
+    return app
+
+
+async def serve_fake_tmdb(
+    host: str, port: int, latency_ms: float, jitter_ms: float, error_rate: float, fixtures_dir: Optional[str]
+):
+    runner = web.AppRunner(create_app(latency_ms, jitter_ms, error_rate, fixtures_dir))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(
+        "fake tmdb listening on http://%s:%s (latency %sms ±%sms, error rate %s). set TMDB_BASE_URL to use it.",
+        host,
+        port,
+        latency_ms,
+        jitter_ms,
+        error_rate,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,296 @@
+import sys
+import json
+import time
+import asyncio
+import aiosqlite
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from telecopter.logger import setup_logger
+from telecopter.config import (
+    FSM_STORAGE,
+    FSM_STORAGE_FILE_PATH,
+    FSM_STATE_TTL_SECONDS,
+    FSM_STORAGE_FLUSH_INTERVAL_SECONDS,
+    FSM_MEMORY_MAX_ENTRIES,
+)
+
+
+logger = setup_logger(__name__)
+
+EMPTY_DATA = "{}"
+EXPIRED_PURGE_INTERVAL_SECONDS = 60.0
+
+
+def build_storage_key(key: StorageKey) -> str:
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny)
+    )
+
+
+def dump_data(data: Mapping[str, Any]) -> str:
+    if not isinstance(data, dict):
+        raise DataNotDictLikeError(f"Data must be a dict or dict-like object, got {type(data).__name__}")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(self, path: str, ttl_seconds: float, flush_interval_seconds: float):
+        self._path = path
+        self._ttl_seconds = ttl_seconds
+        self._flush_interval_seconds = flush_interval_seconds
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._pending: Dict[str, Dict[str, Optional[str]]] = {}
+        self._flushing: Dict[str, Dict[str, Optional[str]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_purge_at = 0.0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        if self._connection is not None:
+            return self._connection
+        async with self._connect_lock:
+            if self._connection is None:
+                Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+                connection = await aiosqlite.connect(self._path)
+                await connection.execute("pragma journal_mode=wal")
+                await connection.execute("pragma synchronous=normal")
+                await connection.execute("""
+                    create table if not exists fsm_states (
+                        storage_key text primary key,
+                        state text,
+                        data text not null default '{}',
+                        updated_at real not null
+                    )
+                    """)
+                await connection.execute(
+                    "create index if not exists idx_fsm_states_updated_at on fsm_states (updated_at)"
+                )
+                await connection.commit()
+                self._connection = connection
+        return self._connection
+
+    def _buffered(self, storage_key: str, field: str) -> Tuple[bool, Optional[str]]:
+        for buffer in (self._pending, self._flushing):
+            changes = buffer.get(storage_key)
+            if changes is not None and field in changes:
+                return True, changes[field]
+        return False, None
+
+    async def _read(self, storage_key: str, field: str) -> Optional[str]:
+        found, value = self._buffered(storage_key, field)
+        if found:
+            return value
+        connection = await self._connect()
+        expired_before = time.time() - self._ttl_seconds if self._ttl_seconds > 0 else 0
+        async with connection.execute(
+            f"select {field} from fsm_states where storage_key = ? and updated_at >= ?",
+            (storage_key, expired_before),
+        ) as cursor:
+            row = await cursor.fetchone()
+        found, value = self._buffered(storage_key, field)
+        if found:
+            return value
+        return row[0] if row else None
+
+    async def _write(self, storage_key: str, field: str, value: Optional[str]):
+        self._pending.setdefault(storage_key, {})[field] = value
+        if self._flush_interval_seconds <= 0:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self._flush_interval_seconds)
+            self._flush_task = None
+            await self.flush()
+        except asyncio.CancelledError:
+            self._flush_task = None
+            raise
+        except Exception as e:
+            logger.error("failed to flush fsm states: %s", e, exc_info=True)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, {}
+            now = time.time()
+            expired_before = now - self._ttl_seconds if self._ttl_seconds > 0 else 0
+            state_rows = [
+                (storage_key, changes["state"], now, expired_before)
+                for storage_key, changes in self._flushing.items()
+                if "state" in changes
+            ]
+            data_rows = [
+                (storage_key, changes["data"], now, expired_before)
+                for storage_key, changes in self._flushing.items()
+                if "data" in changes
+            ]
+            try:
+                connection = await self._connect()
+                await connection.executemany(
+                    """
+                    insert into fsm_states (storage_key, state, updated_at) values (?, ?, ?)
+                    on conflict(storage_key) do update set
+                        state = excluded.state,
+                        data = case when fsm_states.updated_at < ? then '{}' else fsm_states.data end,
+                        updated_at = excluded.updated_at
+                    """,
+                    state_rows,
+                )
+                await connection.executemany(
+                    """
+                    insert into fsm_states (storage_key, data, updated_at) values (?, ?, ?)
+                    on conflict(storage_key) do update set
+                        state = case when fsm_states.updated_at < ? then null else fsm_states.state end,
+                        data = excluded.data,
+                        updated_at = excluded.updated_at
+                    """,
+                    data_rows,
+                )
+                await connection.executemany(
+                    "delete from fsm_states where storage_key = ? and state is null and data = '{}'",
+                    [(storage_key,) for storage_key in self._flushing],
+                )
+                if self._ttl_seconds > 0 and now - self._last_purge_at >= EXPIRED_PURGE_INTERVAL_SECONDS:
+                    cursor = await connection.execute("delete from fsm_states where updated_at < ?", (expired_before,))
+                    self._last_purge_at = now
+                    if cursor.rowcount:
+                        logger.info("purged %s expired fsm states.", cursor.rowcount)
+                await connection.commit()
+            except Exception:
+                if self._connection is not None:
+                    await self._connection.rollback()
+                for storage_key, changes in self._flushing.items():
+                    self._pending[storage_key] = {**changes, **self._pending.get(storage_key, {})}
+                raise
+            finally:
+                self._flushing = {}
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._write(build_storage_key(key), "state", state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self._read(build_storage_key(key), "state")
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(build_storage_key(key), "data", dump_data(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return json.loads(await self._read(build_storage_key(key), "data") or EMPTY_DATA)
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class BoundedMemoryStorage(BaseStorage):
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._records: "OrderedDict[StorageKey, Tuple[float, Optional[str], str]]" = OrderedDict()
+        self._evicted = 0
+        self._expired = 0
+        self._last_purge_at = time.monotonic()
+
+    def _is_expired(self, touched_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and touched_at + self.ttl_seconds <= now
+
+    def _get(self, key: StorageKey) -> Tuple[Optional[str], str]:
+        record = self._records.get(key)
+        if record is None:
+            return None, EMPTY_DATA
+        now = time.monotonic()
+        touched_at, state, data = record
+        if self._is_expired(touched_at, now):
+            del self._records[key]
+            self._expired += 1
+            return None, EMPTY_DATA
+        self._records[key] = (now, state, data)
+        self._records.move_to_end(key)
+        return state, data
+
+    def _put(self, key: StorageKey, state: Optional[str], data: str):
+        if state is None and data == EMPTY_DATA:
+            self._records.pop(key, None)
+            return
+        now = time.monotonic()
+        self._records[key] = (now, state, data)
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_entries > 0:
+            self._records.popitem(last=False)
+            self._evicted += 1
+        if now - self._last_purge_at >= EXPIRED_PURGE_INTERVAL_SECONDS:
+            self._purge_expired(now)
+
+    def _purge_expired(self, now: float):
+        self._last_purge_at = now
+        purged = 0
+        while self._records:
+            key, (touched_at, _, _) = next(iter(self._records.items()))
+            if not self._is_expired(touched_at, now):
+                break
+            del self._records[key]
+            purged += 1
+        if purged:
+            self._expired += purged
+            logger.info("purged %s idle fsm states. %s", purged, self.memory_report())
+
+    def memory_report(self) -> Dict[str, int]:
+        approx_bytes = sys.getsizeof(self._records)
+        for key, record in self._records.items():
+            _, state, data = record
+            approx_bytes += sys.getsizeof(key) + sys.getsizeof(record) + sys.getsizeof(state) + sys.getsizeof(data)
+        return {
+            "states": len(self._records),
+            "approx_bytes": approx_bytes,
+            "evicted": self._evicted,
+            "expired": self._expired,
+        }
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _, data = self._get(key)
+        self._put(key, state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return self._get(key)[0]
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        state, _ = self._get(key)
+        self._put(key, state, dump_data(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return json.loads(self._get(key)[1])
+
+    async def close(self) -> None:
+        logger.info("fsm memory storage closing. %s", self.memory_report())
+
+
+def create_fsm_storage() -> BaseStorage:
+    if FSM_STORAGE == "sqlite":
+        logger.info(
+            "using sqlite fsm storage at %s (ttl %ss, flush interval %ss).",
+            FSM_STORAGE_FILE_PATH,
+            FSM_STATE_TTL_SECONDS,
+            FSM_STORAGE_FLUSH_INTERVAL_SECONDS,
+        )
+        return SQLiteStorage(FSM_STORAGE_FILE_PATH, FSM_STATE_TTL_SECONDS, FSM_STORAGE_FLUSH_INTERVAL_SECONDS)
+    logger.info(
+        "using in-memory fsm storage (max %s states, idle ttl %ss).", FSM_MEMORY_MAX_ENTRIES, FSM_STATE_TTL_SECONDS
+    )
+    return BoundedMemoryStorage(FSM_MEMORY_MAX_ENTRIES, FSM_STATE_TTL_SECONDS)
@@ -1,4 +1,4 @@
-import asyncio
+import datetime
 from typing import List, Union, Optional
 
 from aiogram import Router, F, Bot
@@ -10,6 +10,14 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 import telecopter.database as db
 from telecopter.logger import setup_logger
+from telecopter.broadcast import (
+    start_broadcast,
+    pause_broadcast,
+    resume_broadcast,
+    cancel_broadcast,
+    get_broadcast_job_keyboard,
+)
+from telecopter.outbox import wake_outbox_worker
 from telecopter.config import DEFAULT_PAGE_SIZE, MAX_NOTE_LENGTH
 from telecopter.utils import format_request_for_admin, format_request_item_display_parts, truncate_text
 from telecopter.handlers.menu_utils import show_admin_panel
@@ -56,8 +64,21 @@ from telecopter.constants import (
     MSG_ADMIN_BROADCAST_CANCELLED,
     PROMPT_ADMIN_BROADCAST_TYPING_MESSAGE,
     MSG_ADMIN_BROADCAST_NO_USERS,
-    MSG_ADMIN_BROADCAST_SENT_CONFIRM,
-    MSG_ADMIN_BROADCAST_FAILURES_SUFFIX,
+    MSG_ADMIN_BROADCAST_STARTED,
+    PROMPT_ADMIN_BROADCAST_AUDIENCE,
+    BTN_BROADCAST_AUDIENCE_APPROVED,
+    BTN_BROADCAST_AUDIENCE_ACTIVE_7D,
+    BTN_BROADCAST_AUDIENCE_ACTIVE_30D,
+    BTN_BROADCAST_AUDIENCE_PENDING,
+    AdminBroadcastAudience,
+    MSG_ADMIN_BROADCAST_DUPLICATE,
+    MSG_ADMIN_BROADCAST_JOB_ITEM,
+    MSG_ADMIN_BROADCAST_JOB_NOT_FOUND,
+    MSG_ADMIN_BROADCAST_JOB_RESUMED,
+    MSG_ADMIN_BROADCAST_JOBS_EMPTY,
+    TITLE_ADMIN_BROADCAST_JOBS,
+    BroadcastJobStatus,
+    BroadcastJobCallback,
     BTN_BROADCAST_UNMUTED,
     BTN_BROADCAST_MUTED,
     BTN_BROADCAST_CANCEL,
@@ -86,7 +107,9 @@ from telecopter.constants import (
     MSG_ADMIN_ACTION_ERROR,
     MSG_ADMIN_ACTION_SUCCESS,
     MSG_ADMIN_ACTION_SUCCESS_WITH_NOTE,
-    MSG_ADMIN_ACTION_NOTIFICATION_FAILED,
+    MSG_ADMIN_ACTION_NOTIFICATION_QUEUED,
+    BTN_ADMIN_DIGEST_REVIEW,
+    BTN_MANAGE_PENDING_USERS,
     MSG_ADMIN_ACTION_USER_NOT_FOUND,
     MSG_ADMIN_ACTION_DB_UPDATE_FAILED,
     MSG_ADMIN_ACTION_DB_UPDATE_FAILED_WITH_NOTE,
@@ -131,6 +154,14 @@ async def admin_panel_send_broadcast_cb(callback_query: CallbackQuery, bot: Bot,
     if callback_query.message:
         await ask_broadcast_type(callback_query.message, state, bot)
 
+@admin_router.callback_query(
+    F.data == f"{AdminPanelCallback.PREFIX.value}:{AdminPanelCallback.BROADCAST_JOBS.value}", IsAdminFilter()
+)
+async def admin_panel_broadcast_jobs_cb(callback_query: CallbackQuery, bot: Bot):
+    await callback_query.answer()
+    if callback_query.message:
+        await list_broadcast_jobs(callback_query.message)
+
 
 # --- Admin Tasks Logic ---
 
@@ -518,6 +549,18 @@ def get_admin_report_action_keyboard(request_id: int) -> InlineKeyboardMarkup:
     builder.adjust(1, 1, 1)
     return builder.as_markup()
 
+def get_admin_digest_review_button(request_id: int) -> InlineKeyboardButton:
+    return InlineKeyboardButton(
+        text=BTN_ADMIN_DIGEST_REVIEW.format(request_id=request_id),
+        callback_data=f"{AdminTasksCallback.MODERATE_PREFIX.value}:{request_id}",
+    )
+
+def get_admin_digest_pending_users_button() -> InlineKeyboardButton:
+    return InlineKeyboardButton(
+        text=BTN_MANAGE_PENDING_USERS,
+        callback_data=f"{AdminPanelCallback.PREFIX.value}:{AdminPanelCallback.MANAGE_USERS.value}",
+    )
+
 async def _perform_moderation_action_and_notify(
     bot: Bot,
     request_id: int,
@@ -551,31 +594,29 @@ async def _perform_moderation_action_and_notify(
     admin_confirm_message_core = MSG_ADMIN_ACTION_ERROR.format(request_id=request_id)
 
     if user_notification_text_template:
-        db_update_successful = await db.update_request_status(request_id, new_status, admin_note=admin_note)
+        user_msg_str = user_notification_text_template.format(title=original_request_title)
+        user_msg_obj_parts = [Text(user_msg_str)]
+        if admin_note:
+            user_msg_obj_parts.extend([Text("\n\n"), Bold(MSG_ADMIN_NOTE_LABEL), Text(" "), Italic(admin_note)])
+        user_msg_obj = Text(*user_msg_obj_parts)
+
+        db_update_successful, notification_queued = await db.update_request_status_with_notification(
+            request_id,
+            new_status,
+            admin_note=admin_note,
+            admin_user_id=acting_admin_user_id,
+            action=action_key_for_log,
+            notification_text=user_msg_obj.as_markdown(),
+        )
         if db_update_successful:
             admin_confirm_message_core = (
                 MSG_ADMIN_ACTION_SUCCESS_WITH_NOTE.format(request_id=request_id, new_status=new_status)
                 if admin_note
                 else MSG_ADMIN_ACTION_SUCCESS.format(request_id=request_id, new_status=new_status)
             )
-
-            await db.log_admin_action(
-                acting_admin_user_id, action_key_for_log, request_id=request_id, details=admin_note
-            )
-
-            submitter_chat_id = await db.get_request_submitter_chat_id(request_id)
-            if submitter_chat_id:
-                user_msg_str = user_notification_text_template.format(title=original_request_title)
-                user_msg_obj_parts = [Text(user_msg_str)]
-                if admin_note:
-                    user_msg_obj_parts.extend([Text("\n\n"), Bold(MSG_ADMIN_NOTE_LABEL), Text(" "), Italic(admin_note)])
-                user_msg_obj = Text(*user_msg_obj_parts)
-                try:
-                    await bot.send_message(submitter_chat_id, text=user_msg_obj.as_markdown(), parse_mode="MarkdownV2")
-                    admin_confirm_message_core += ". User notified."
-                except Exception as e:
-                    logger.error("failed to send status update to user for request %s: %s", request_id, e)
-                    admin_confirm_message_core += MSG_ADMIN_ACTION_NOTIFICATION_FAILED
+            if notification_queued:
+                wake_outbox_worker()
+                admin_confirm_message_core += MSG_ADMIN_ACTION_NOTIFICATION_QUEUED
             else:
                 admin_confirm_message_core += MSG_ADMIN_ACTION_USER_NOT_FOUND
         else:
@@ -802,6 +843,63 @@ BROADCAST_TYPE_KEYBOARD = (
     .as_markup()
 )
 
+BROADCAST_AUDIENCE_KEYBOARD = (
+    InlineKeyboardBuilder()
+    .add(
+        InlineKeyboardButton(
+            text=BTN_BROADCAST_AUDIENCE_APPROVED,
+            callback_data=f"broadcast_audience:{AdminBroadcastAudience.APPROVED.value}",
+        ),
+        InlineKeyboardButton(
+            text=BTN_BROADCAST_AUDIENCE_ACTIVE_7D,
+            callback_data=f"broadcast_audience:{AdminBroadcastAudience.ACTIVE_7D.value}",
+        ),
+        InlineKeyboardButton(
+            text=BTN_BROADCAST_AUDIENCE_ACTIVE_30D,
+            callback_data=f"broadcast_audience:{AdminBroadcastAudience.ACTIVE_30D.value}",
+        ),
+        InlineKeyboardButton(
+            text=BTN_BROADCAST_AUDIENCE_PENDING,
+            callback_data=f"broadcast_audience:{AdminBroadcastAudience.PENDING_APPROVAL.value}",
+        ),
+        InlineKeyboardButton(
+            text=BTN_BROADCAST_CANCEL, callback_data=f"broadcast_audience:{AdminBroadcastAction.CANCEL.value}"
+        ),
+    )
+    .adjust(1)
+    .as_markup()
+)
+
+BROADCAST_AUDIENCE_FILTERS = {
+    AdminBroadcastAudience.APPROVED.value: ([UserStatus.APPROVED.value], None),
+    AdminBroadcastAudience.ACTIVE_7D.value: ([UserStatus.APPROVED.value], 7),
+    AdminBroadcastAudience.ACTIVE_30D.value: ([UserStatus.APPROVED.value], 30),
+    AdminBroadcastAudience.PENDING_APPROVAL.value: ([UserStatus.PENDING_APPROVAL.value], None),
+}
+
+async def get_broadcast_audience_chat_ids(audience: str) -> List[int]:
+    approval_statuses, active_within_days = BROADCAST_AUDIENCE_FILTERS.get(
+        audience, BROADCAST_AUDIENCE_FILTERS[AdminBroadcastAudience.APPROVED.value]
+    )
+    active_since = None
+    if active_within_days:
+        active_since = (
+            datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=active_within_days)
+        ).isoformat()
+    return await db.get_broadcast_chat_ids(approval_statuses, active_since)
+
+async def _cancel_broadcast_setup(callback_query: CallbackQuery, state: FSMContext, bot: Bot):
+    await state.clear()
+    if callback_query.message:
+        try:
+            await callback_query.message.edit_text(
+                Text(MSG_ADMIN_BROADCAST_CANCELLED).as_markdown(), parse_mode="MarkdownV2", reply_markup=None
+            )
+        except Exception:
+            logger.debug("could not edit message for broadcast cancel")
+    if callback_query.message:
+         await show_admin_panel(callback_query.message, bot)
+
 async def ask_broadcast_type(message_event: Message, state: FSMContext, bot: Bot):
     await state.set_state(AdminBroadcastStates.choosing_type)
     text_obj = Text(PROMPT_ADMIN_BROADCAST_TYPE)
@@ -836,23 +934,39 @@ async def process_broadcast_type_cb(callback_query: CallbackQuery, state: FSMCon
     await callback_query.answer()
 
     if action == AdminBroadcastAction.CANCEL.value:
-        await state.clear()
-        if callback_query.message:
-            try:
-                await callback_query.message.edit_text(
-                    Text(MSG_ADMIN_BROADCAST_CANCELLED).as_markdown(), parse_mode="MarkdownV2", reply_markup=None
-                )
-            except Exception:
-                logger.debug("could not edit message for broadcast cancel")
-        if callback_query.message:
-             await show_admin_panel(callback_query.message, bot)
+        await _cancel_broadcast_setup(callback_query, state, bot)
         return
 
     is_muted = action == AdminBroadcastAction.MUTED.value
     await state.update_data(is_muted=is_muted)
+    await state.set_state(AdminBroadcastStates.choosing_audience)
+
+    if callback_query.message:
+        try:
+            await callback_query.message.edit_text(
+                Text(PROMPT_ADMIN_BROADCAST_AUDIENCE).as_markdown(),
+                parse_mode="MarkdownV2",
+                reply_markup=BROADCAST_AUDIENCE_KEYBOARD,
+            )
+        except Exception as e:
+            logger.debug(f"could not edit message for audience prompt: {e}")
+
+@admin_router.callback_query(
+    StateFilter(AdminBroadcastStates.choosing_audience), F.data.startswith("broadcast_audience:")
+)
+async def process_broadcast_audience_cb(callback_query: CallbackQuery, state: FSMContext, bot: Bot):
+    audience = callback_query.data.split(":")[1]
+    await callback_query.answer()
+
+    if audience == AdminBroadcastAction.CANCEL.value:
+        await _cancel_broadcast_setup(callback_query, state, bot)
+        return
+
+    await state.update_data(audience=audience)
     await state.set_state(AdminBroadcastStates.typing_message)
 
-    muted_status = "muted" if is_muted else "unmuted"
+    data = await state.get_data()
+    muted_status = "muted" if data.get("is_muted", False) else "unmuted"
     prompt_text_str = PROMPT_ADMIN_BROADCAST_TYPING_MESSAGE.format(muted_status=muted_status)
     prompt_text_obj = Text(prompt_text_str)
     if callback_query.message:
@@ -870,6 +984,7 @@ async def process_broadcast_message_text(message: Message, state: FSMContext, bo
 
     data = await state.get_data()
     is_muted = data.get("is_muted", False)
+    audience = data.get("audience", AdminBroadcastAudience.APPROVED.value)
     broadcast_text_from_admin = message.text
     await state.clear()
 
@@ -878,7 +993,7 @@ async def process_broadcast_message_text(message: Message, state: FSMContext, bo
     )
     final_message_to_send_md = formatted_broadcast_content.as_markdown()
 
-    chat_ids = await db.get_all_user_chat_ids()
+    chat_ids = await get_broadcast_audience_chat_ids(audience)
     admin_user_id = message.from_user.id
 
     if not chat_ids or (len(chat_ids) == 1 and admin_user_id in chat_ids):
@@ -887,30 +1002,105 @@ async def process_broadcast_message_text(message: Message, state: FSMContext, bo
         await show_admin_panel(message, bot)
         return
 
-    sent_count = 0
-    failed_count = 0
-    for cid in chat_ids:
-        if cid == admin_user_id:
-            continue
-        try:
-            await bot.send_message(
-                chat_id=cid, text=final_message_to_send_md, parse_mode="MarkdownV2", disable_notification=is_muted
-            )
-            sent_count += 1
-        except Exception as e:
-            logger.error(f"failed to send broadcast to chat_id {cid}: {e}")
-            failed_count += 1
-        await asyncio.sleep(0.05)
+    duplicate_job_id = await db.find_unfinished_broadcast_job(final_message_to_send_md)
+    if duplicate_job_id is not None:
+        response_text_obj = Text(MSG_ADMIN_BROADCAST_DUPLICATE.format(job_id=duplicate_job_id))
+        await message.reply(response_text_obj.as_markdown(), parse_mode="MarkdownV2")
+        await show_admin_panel(message, bot)
+        return
 
-    response_text_str = MSG_ADMIN_BROADCAST_SENT_CONFIRM.format(sent_count=sent_count)
-    if failed_count > 0:
-        response_text_str += MSG_ADMIN_BROADCAST_FAILURES_SUFFIX.format(failed_count=failed_count)
-    response_text_obj = Text(response_text_str)
-    await message.reply(response_text_obj.as_markdown(), parse_mode="MarkdownV2")
+    recipient_chat_ids = [cid for cid in chat_ids if cid != admin_user_id]
+    status_text_obj = Text(MSG_ADMIN_BROADCAST_STARTED.format(total_count=len(recipient_chat_ids)))
+    status_message = await message.reply(status_text_obj.as_markdown(), parse_mode="MarkdownV2")
 
-    await db.log_admin_action(
+    await start_broadcast(
+        bot=bot,
         admin_user_id=admin_user_id,
-        action="broadcast_muted" if is_muted else "broadcast",
-        details=f"Sent: {sent_count}, Failed: {failed_count}. Msg: {broadcast_text_from_admin[:100]}...",
+        message_markdown=final_message_to_send_md,
+        admin_text=broadcast_text_from_admin,
+        is_muted=is_muted,
+        chat_ids=recipient_chat_ids,
+        status_chat_id=status_message.chat.id,
+        status_message_id=status_message.message_id,
     )
     await show_admin_panel(message, bot)
+
+
+async def list_broadcast_jobs(message_to_edit: Message):
+    jobs = await db.get_broadcast_jobs_by_status([BroadcastJobStatus.RUNNING.value, BroadcastJobStatus.PAUSED.value])
+
+    content_elements: List[Union[Text, Bold]] = [Bold(TITLE_ADMIN_BROADCAST_JOBS)]
+    keyboard_builder = InlineKeyboardBuilder()
+
+    if not jobs:
+        content_elements.append(Text(MSG_ADMIN_BROADCAST_JOBS_EMPTY))
+
+    for job in jobs:
+        content_elements.append(
+            Text(
+                MSG_ADMIN_BROADCAST_JOB_ITEM.format(
+                    job_id=job["job_id"],
+                    status=job["status"],
+                    sent_count=job["sent_count"],
+                    total_count=job["total_count"],
+                    failed_count=job["failed_count"],
+                )
+            )
+        )
+        content_elements.append(Text("   ", Italic(truncate_text(job["admin_text"], 60))))
+        job_keyboard = get_broadcast_job_keyboard(job["job_id"], job["status"])
+        if job_keyboard:
+            for row in job_keyboard.inline_keyboard:
+                keyboard_builder.row(*row)
+
+    keyboard_builder.row(
+        InlineKeyboardButton(text=BTN_BACK_TO_ADMIN_PANEL, callback_data=AdminTasksCallback.BACK_TO_PANEL.value)
+    )
+
+    final_text_content_obj = as_list(*content_elements, sep="\n")
+    await message_to_edit.edit_text(
+        final_text_content_obj.as_markdown(),
+        parse_mode="MarkdownV2",
+        reply_markup=keyboard_builder.as_markup(),
+    )
+
+
+@admin_router.callback_query(F.data.startswith(f"{BroadcastJobCallback.PREFIX.value}:"), IsAdminFilter())
+async def broadcast_job_action_cb(callback_query: CallbackQuery, bot: Bot):
+    try:
+        _, action, job_id_str = callback_query.data.split(":")
+        job_id = int(job_id_str)
+    except (ValueError, AttributeError):
+        await callback_query.answer(MSG_ERROR_PROCESSING_ACTION_ALERT, show_alert=True)
+        return
+
+    if action == BroadcastJobCallback.PAUSE.value:
+        changed = await pause_broadcast(bot, job_id)
+    elif action == BroadcastJobCallback.RESUME.value:
+        changed = await resume_broadcast(bot, job_id)
+    elif action == BroadcastJobCallback.CANCEL.value:
+        changed = await cancel_broadcast(bot, job_id)
+    else:
+        await callback_query.answer(MSG_ERROR_PROCESSING_ACTION_ALERT, show_alert=True)
+        return
+
+    if not changed:
+        await callback_query.answer(MSG_ADMIN_BROADCAST_JOB_NOT_FOUND, show_alert=True)
+        return
+
+    if callback_query.from_user:
+        await db.log_admin_action(
+            admin_user_id=callback_query.from_user.id, action=f"broadcast_{action}", details=f"Job: {job_id}"
+        )
+
+    if action == BroadcastJobCallback.RESUME.value:
+        await callback_query.answer(MSG_ADMIN_BROADCAST_JOB_RESUMED.format(job_id=job_id))
+    else:
+        await callback_query.answer()
+
+    job = await db.get_broadcast_job(job_id)
+    if callback_query.message and job and callback_query.message.message_id != job["status_message_id"]:
+        try:
+            await list_broadcast_jobs(callback_query.message)
+        except Exception as e:
+            logger.debug(f"could not refresh broadcast jobs list: {e}")
@@ -1,17 +1,20 @@
-import asyncio
-
 from typing import Optional, Union
 
 from aiogram import Bot
 from aiogram.filters import Filter
 from aiogram.fsm.context import FSMContext
-from aiogram.exceptions import TelegramAPIError
 from aiogram.utils.formatting import Text, TextLink
-from aiogram.types import User as AiogramUser, InlineKeyboardMarkup, Message, CallbackQuery
+from aiogram.types import User as AiogramUser, InlineKeyboardMarkup, InlineKeyboardButton, Message, CallbackQuery
 
 import telecopter.database as db
 from telecopter.logger import setup_logger
-from telecopter.config import ADMIN_CHAT_IDS
+from telecopter.admin_notifications import (
+    AdminDigestEntry,
+    digest_enabled,
+    queue_admin_digest_entry,
+    schedule_admin_notification,
+)
+from telecopter.config import ADMIN_CHAT_ID_SET
 from telecopter.constants import (
     UserStatus,
     MSG_USER_ACCESS_PENDING_INFO,
@@ -28,7 +31,7 @@ class IsAdminFilter(Filter):
     async def __call__(self, message: Message) -> bool:
         if not message.from_user:
             return False
-        return await is_admin(message.from_user.id)
+        return message.from_user.id in ADMIN_CHAT_ID_SET
 
 
 async def register_user_if_not_exists(aiogram_user: Optional[AiogramUser], chat_id: int, bot: Bot):
@@ -47,11 +50,11 @@ async def register_user_if_not_exists(aiogram_user: Optional[AiogramUser], chat_
 
 
 async def is_admin(user_id: int) -> bool:
-    if not ADMIN_CHAT_IDS:
+    if not ADMIN_CHAT_ID_SET:
         logger.debug("ADMIN_CHAT_IDS not configured. User %s considered not admin.", user_id)
         return False
 
-    is_user_admin = user_id in ADMIN_CHAT_IDS
+    is_user_admin = user_id in ADMIN_CHAT_ID_SET
     if is_user_admin:
         logger.debug("user %s is in ADMIN_CHAT_IDS and considered admin.", user_id)
     else:
@@ -60,35 +63,24 @@ async def is_admin(user_id: int) -> bool:
 
 
 async def notify_admin_formatted(
-    bot: Bot, formatted_text_object: Text, keyboard: Optional[InlineKeyboardMarkup] = None
+    bot: Bot,
+    formatted_text_object: Text,
+    keyboard: Optional[InlineKeyboardMarkup] = None,
+    digest_summary: Optional[Text] = None,
+    digest_button: Optional[InlineKeyboardButton] = None,
 ):
-    if not ADMIN_CHAT_IDS:
-        logger.warning("ADMIN_CHAT_IDS not configured. Cannot send admin notification.")
+    if digest_summary is not None and digest_button is not None and digest_enabled():
+        queue_admin_digest_entry(
+            bot,
+            AdminDigestEntry(
+                summary=digest_summary,
+                button=digest_button,
+                full_text_markdown=formatted_text_object.as_markdown(),
+                keyboard=keyboard,
+            ),
+        )
         return
-
-    success_count = 0
-    failure_count = 0
-    for admin_id in ADMIN_CHAT_IDS:
-        try:
-            await bot.send_message(
-                chat_id=admin_id,
-                text=formatted_text_object.as_markdown(),
-                parse_mode="MarkdownV2",
-                reply_markup=keyboard,
-            )
-            logger.info("sent notification to admin_id %s.", admin_id)
-            success_count += 1
-        except TelegramAPIError as e:
-            logger.error("failed to send notification to admin_id %s: %s", admin_id, e)
-            failure_count += 1
-        except Exception as e:
-            logger.error("unexpected error sending notification to admin_id %s: %s", admin_id, e)
-            failure_count += 1
-        if len(ADMIN_CHAT_IDS) > 1:
-            await asyncio.sleep(0.1)
-
-    if failure_count > 0:
-        logger.warning(f"admin notifications: {success_count} sent, {failure_count} failed.")
+    schedule_admin_notification(bot, formatted_text_object.as_markdown(), keyboard)
 
 
 async def ensure_user_approved(event: Union[Message, CallbackQuery], bot: Bot, state: FSMContext) -> bool:
@@ -11,6 +11,7 @@ class RequestMediaStates(StatesGroup):
 
 class AdminBroadcastStates(StatesGroup):
     choosing_type = State()
+    choosing_audience = State()
     typing_message = State()
 
 
@@ -1,18 +1,22 @@
 from aiogram import Router, F, Bot
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
 from aiogram.utils.formatting import Text
 
 import telecopter.database as db
 from telecopter.logger import setup_logger
-from telecopter.utils import format_request_for_admin
+from telecopter.utils import format_request_for_admin, format_request_digest_line
 from telecopter.handlers.menu_utils import show_main_menu_for_user, show_admin_panel
 # --- Start of Correction ---
 from telecopter.handlers.common_utils import ensure_user_approved, notify_admin_formatted, is_admin
 # --- End of Correction ---
-from telecopter.handlers.request_handlers import my_requests_entrypoint
-from telecopter.handlers.admin_handlers import get_admin_report_action_keyboard
+from telecopter.handlers.request_handlers import my_requests_entrypoint, media_prefetch_tasks, media_search_tasks
+from telecopter.handlers.admin_handlers import (
+    get_admin_report_action_keyboard,
+    get_admin_digest_review_button,
+    get_admin_digest_pending_users_button,
+)
 from telecopter.handlers.handler_states import RequestMediaStates, ReportProblemStates
 from telecopter.constants import (
     MSG_USER_ACCESS_REQUEST_SUBMITTED,
@@ -28,7 +32,8 @@ from telecopter.constants import (
     MSG_REPORT_SUCCESS,
     ERR_PROBLEM_DESCRIPTION_TOO_SHORT,
     PROMPT_MEDIA_NAME_TYPING,
-    RequestType,
+    MSG_ADMIN_NEW_USER_PENDING,
+    MSG_ADMIN_DIGEST_NEW_USER,
 )
 
 logger = setup_logger(__name__)
@@ -43,6 +48,8 @@ async def start_command(message: Message, bot: Bot, state: FSMContext):
     await state.clear()
 
     user_id = message.from_user.id
+    media_search_tasks.cancel(user_id)
+    media_prefetch_tasks.cancel(user_id)
     
     # --- Start of Correction ---
     if await is_admin(user_id):
@@ -74,7 +81,16 @@ async def start_command(message: Message, bot: Bot, state: FSMContext):
         )
         reply_text_obj = Text(MSG_USER_ACCESS_REQUEST_SUBMITTED)
         await message.answer(reply_text_obj.as_markdown(), parse_mode="MarkdownV2")
-        await notify_admin_formatted(bot, f"New user waiting for approval: {user_id}", None)
+        user_name = (
+            f"@{user_details_from_tg.username}" if user_details_from_tg.username else user_details_from_tg.first_name
+        )
+        await notify_admin_formatted(
+            bot,
+            Text(MSG_ADMIN_NEW_USER_PENDING.format(user_name=user_name, user_id=user_id)),
+            InlineKeyboardMarkup(inline_keyboard=[[get_admin_digest_pending_users_button()]]),
+            digest_summary=Text(MSG_ADMIN_DIGEST_NEW_USER.format(user_name=user_name)),
+            digest_button=get_admin_digest_pending_users_button(),
+        )
 
 
 @main_router.message(Command("admin"))
@@ -86,6 +102,9 @@ async def admin_command(message: Message, bot: Bot):
 
 @main_router.message(Command("cancel"))
 async def cancel_command(message: Message, state: FSMContext, bot: Bot):
+    if message.from_user:
+        media_search_tasks.cancel(message.from_user.id)
+        media_prefetch_tasks.cancel(message.from_user.id)
     current_state = await state.get_state()
     if current_state is None:
         reply_text_obj = Text(MSG_NO_ACTIVE_OPERATION_MENU)
@@ -102,6 +121,8 @@ async def cancel_command(message: Message, state: FSMContext, bot: Bot):
 @main_router.callback_query(F.data == GenericCallbackAction.CANCEL.value)
 async def cancel_callback_handler(callback_query: CallbackQuery, bot: Bot, state: FSMContext):
     await callback_query.answer()
+    media_search_tasks.cancel(callback_query.from_user.id)
+    media_prefetch_tasks.cancel(callback_query.from_user.id)
     current_state = await state.get_state()
     if not current_state:
         if callback_query.message:
@@ -177,11 +198,15 @@ async def problem_report_description_handler(message: Message, state: FSMContext
     db_request_row = await db.get_request_by_id(request_id)
     db_user_row = await db.get_user(message.from_user.id)
     if db_request_row and db_user_row:
-        admin_msg_obj = format_request_for_admin(
-            dict(db_request_row), dict(db_user_row), request_type_override=RequestType.PROBLEM
-        )
+        admin_msg_obj = format_request_for_admin(dict(db_request_row), dict(db_user_row))
         admin_kb = get_admin_report_action_keyboard(request_id)
-        await notify_admin_formatted(bot, admin_msg_obj, admin_kb)
+        await notify_admin_formatted(
+            bot,
+            admin_msg_obj,
+            admin_kb,
+            digest_summary=format_request_digest_line(dict(db_request_row), dict(db_user_row)),
+            digest_button=get_admin_digest_review_button(request_id),
+        )
 
     await state.clear()
     await show_main_menu_for_user(message, bot, custom_text_str=MSG_REPORT_SUCCESS)
@@ -12,6 +12,7 @@ from telecopter.constants import (
     BTN_VIEW_TASKS,
     BTN_MANAGE_PENDING_USERS,
     BTN_SEND_BROADCASTMENT,
+    BTN_BROADCAST_JOBS,
     AdminPanelCallback,
     MSG_MAIN_MENU_DEFAULT_WELCOME,
     BTN_REQUEST_MEDIA,
@@ -44,6 +45,10 @@ async def show_admin_panel(event: Union[Message, CallbackQuery], bot: Bot):
             text=BTN_SEND_BROADCASTMENT,
             callback_data=f"{AdminPanelCallback.PREFIX.value}:{AdminPanelCallback.SEND_BROADCASTMENT.value}",
         )
+        .button(
+            text=BTN_BROADCAST_JOBS,
+            callback_data=f"{AdminPanelCallback.PREFIX.value}:{AdminPanelCallback.BROADCAST_JOBS.value}",
+        )
         .adjust(1)
         .as_markup()
     )
@@ -1,4 +1,6 @@
-from typing import Optional, List, Union
+import asyncio
+
+from typing import Optional, List, Union, Dict, Any, Tuple
 
 from aiogram import Router, F, Bot
 from aiogram.filters import StateFilter
@@ -11,23 +13,40 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 import telecopter.tmdb as tmdb_api
 import telecopter.database as db
 from telecopter.logger import setup_logger
-from telecopter.config import DEFAULT_PAGE_SIZE, MAX_NOTE_LENGTH
+from telecopter.cache import TTLCache
+from telecopter.tasks import UserTaskRegistry
+from telecopter.config import (
+    DEFAULT_PAGE_SIZE,
+    MAX_NOTE_LENGTH,
+    TMDB_SEARCH_DEBOUNCE_SECONDS,
+    TMDB_REQUEST_DISAMBIGUATION_LIMIT,
+    TMDB_SEARCH_SESSION_TTL_SECONDS,
+    TMDB_SEARCH_SESSION_MAX_ENTRIES,
+)
 from telecopter.handlers.handler_states import RequestMediaStates
 from telecopter.handlers.menu_utils import show_main_menu_for_user
 from telecopter.handlers.common_utils import notify_admin_formatted
-from telecopter.utils import truncate_text, format_media_details_for_user, format_request_for_admin, format_request_item_display_parts
-from telecopter.handlers.admin_handlers import get_admin_request_action_keyboard
+from telecopter.utils import (
+    truncate_text,
+    format_media_details_for_user,
+    format_request_for_admin,
+    format_request_digest_line,
+    format_request_item_display_parts,
+)
+from telecopter.handlers.admin_handlers import get_admin_request_action_keyboard, get_admin_digest_review_button
 from telecopter.constants import (
     PROMPT_MEDIA_NAME_TYPING,
     ERR_MEDIA_QUERY_TOO_SHORT,
     MSG_MEDIA_SEARCHING,
     MSG_MEDIA_NO_RESULTS,
+    MSG_MEDIA_SEARCH_UNAVAILABLE,
     MSG_MEDIA_RESULTS_FOUND,
     PROMPT_MANUAL_REQUEST_DESCRIPTION,
     ERR_CALLBACK_INVALID_MEDIA_SELECTION,
     ERR_MEDIA_DETAILS_FETCH_FAILED,
     MSG_MEDIA_CONFIRM_REQUEST,
     BTN_MEDIA_MANUAL_REQUEST,
+    BTN_MEDIA_MORE_RESULTS,
     BTN_CANCEL_ACTION,
     GenericCallbackAction,
     BTN_CONFIRM_REQUEST,
@@ -58,10 +77,16 @@ logger = setup_logger(__name__)
 
 request_router = Router(name="request_router")
 
+media_search_tasks = UserTaskRegistry("media_search")
+media_prefetch_tasks = UserTaskRegistry("media_prefetch")
+media_search_sessions: TTLCache[tmdb_api.LazySearchResults] = TTLCache(
+    max_size=TMDB_SEARCH_SESSION_MAX_ENTRIES, ttl=TMDB_SEARCH_SESSION_TTL_SECONDS
+)
+
 
 # --- Media Search and Submission Logic ---
 
-def get_tmdb_select_keyboard(search_results: list) -> InlineKeyboardMarkup:
+def get_tmdb_select_keyboard(search_results: list, page: int = 0, has_more: bool = False) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for item in search_results:
         year = f" ({item['year']})" if item.get("year") else ""
@@ -69,9 +94,20 @@ def get_tmdb_select_keyboard(search_results: list) -> InlineKeyboardMarkup:
         button_text = f"{media_emoji} {item['title']}{year}"
         callback_data = f"tmdb_sel:{item['tmdb_id']}:{item['media_type']}"
         builder.button(text=truncate_text(button_text, 60), callback_data=callback_data)
-    builder.button(text=BTN_MEDIA_MANUAL_REQUEST, callback_data="tmdb_sel:manual_request")
-    builder.button(text=BTN_CANCEL_ACTION, callback_data=GenericCallbackAction.CANCEL.value)
     builder.adjust(1)
+
+    pagination_buttons = []
+    if page > 0:
+        pagination_buttons.append(InlineKeyboardButton(text=BTN_PREVIOUS_PAGE, callback_data=f"tmdb_page:{page - 1}"))
+    if has_more:
+        pagination_buttons.append(
+            InlineKeyboardButton(text=BTN_MEDIA_MORE_RESULTS, callback_data=f"tmdb_page:{page + 1}")
+        )
+    if pagination_buttons:
+        builder.row(*pagination_buttons)
+
+    builder.row(InlineKeyboardButton(text=BTN_MEDIA_MANUAL_REQUEST, callback_data="tmdb_sel:manual_request"))
+    builder.row(InlineKeyboardButton(text=BTN_CANCEL_ACTION, callback_data=GenericCallbackAction.CANCEL.value))
     return builder.as_markup()
 
 def get_request_confirm_keyboard() -> InlineKeyboardMarkup:
@@ -82,6 +118,22 @@ def get_request_confirm_keyboard() -> InlineKeyboardMarkup:
     builder.adjust(1)
     return builder.as_markup()
 
+async def _answer_search_unavailable(message: Message, state: FSMContext):
+    reply_text_obj = Text(MSG_MEDIA_SEARCH_UNAVAILABLE)
+    await message.answer(
+        reply_text_obj.as_markdown(),
+        parse_mode="MarkdownV2",
+        reply_markup=get_tmdb_select_keyboard([]),
+    )
+    await state.set_state(RequestMediaStates.select_media)
+
+async def _debounced_search_media(query_text: str) -> Tuple[tmdb_api.LazySearchResults, List[Dict[str, Any]]]:
+    if TMDB_SEARCH_DEBOUNCE_SECONDS > 0:
+        await asyncio.sleep(TMDB_SEARCH_DEBOUNCE_SECONDS)
+    lazy_results = tmdb_api.search_media_lazy(query_text)
+    first_page = await lazy_results.get_page(0, TMDB_REQUEST_DISAMBIGUATION_LIMIT)
+    return lazy_results, first_page
+
 @request_router.message(StateFilter(RequestMediaStates.typing_media_name), F.text)
 async def process_media_name_handler(message: Message, state: FSMContext, bot: Bot):
     if not message.from_user or not message.text:
@@ -97,16 +149,41 @@ async def process_media_name_handler(message: Message, state: FSMContext, bot: B
 
     logger.info("user %s initiated media search with query: %s", message.from_user.id, query_text)
     await state.update_data(request_query=query_text)
+
+    if not tmdb_api.is_search_available():
+        logger.info("tmdb unavailable, offering manual request to user %s.", message.from_user.id)
+        await _answer_search_unavailable(message, state)
+        return
+
+    user_id = message.from_user.id
+    media_prefetch_tasks.cancel(user_id)
     searching_msg_obj = Text(MSG_MEDIA_SEARCHING.format(query_text=query_text))
     searching_msg = await message.answer(searching_msg_obj.as_markdown(), parse_mode="MarkdownV2")
 
-    search_results = await tmdb_api.search_media(query_text)
+    search_task = media_search_tasks.start(user_id, _debounced_search_media(query_text))
+    superseded = False
+    try:
+        lazy_results, search_results = await search_task
+    except asyncio.CancelledError:
+        current_task = asyncio.current_task()
+        if current_task and current_task.cancelling():
+            raise
+        superseded = True
+        logger.info("media search for '%s' by user %s was superseded by a newer search.", query_text, user_id)
+
     try:
         if searching_msg:
             await bot.delete_message(chat_id=searching_msg.chat.id, message_id=searching_msg.message_id)
     except Exception:
         logger.debug("could not delete 'searching...' message.")
 
+    if superseded:
+        return
+
+    if not search_results and not tmdb_api.is_search_available():
+        await _answer_search_unavailable(message, state)
+        return
+
     if not search_results:
         reply_text_obj = Text(MSG_MEDIA_NO_RESULTS.format(query_text=query_text))
         await message.answer(
@@ -117,13 +194,69 @@ async def process_media_name_handler(message: Message, state: FSMContext, bot: B
         await state.set_state(RequestMediaStates.select_media)
         return
 
+    media_search_sessions.set(user_id, lazy_results)
     reply_text_obj = Text(MSG_MEDIA_RESULTS_FOUND.format(query_text=query_text))
     await message.answer(
         reply_text_obj.as_markdown(),
         parse_mode="MarkdownV2",
-        reply_markup=get_tmdb_select_keyboard(search_results),
+        reply_markup=get_tmdb_select_keyboard(
+            search_results, page=0, has_more=lazy_results.has_more(0, TMDB_REQUEST_DISAMBIGUATION_LIMIT)
+        ),
     )
     await state.set_state(RequestMediaStates.select_media)
+    media_prefetch_tasks.start(user_id, tmdb_api.prefetch_media_details(search_results))
+
+@request_router.callback_query(StateFilter(RequestMediaStates.select_media), F.data.startswith("tmdb_page:"))
+async def search_results_page_callback_handler(callback_query: CallbackQuery, state: FSMContext, bot: Bot):
+    await callback_query.answer()
+    if not callback_query.from_user or not callback_query.message:
+        return
+
+    user_id = callback_query.from_user.id
+    try:
+        page = int(callback_query.data.split(":")[1])
+    except (IndexError, ValueError):
+        logger.warning("invalid page number in search_results_page_callback_handler: %s", callback_query.data)
+        return
+
+    lazy_results = media_search_sessions.get(user_id)
+    if lazy_results is None:
+        error_text_obj = Text(ERR_CALLBACK_INVALID_MEDIA_SELECTION)
+        await callback_query.message.edit_text(error_text_obj.as_markdown(), parse_mode="MarkdownV2", reply_markup=None)
+        await state.set_state(RequestMediaStates.typing_media_name)
+        return
+
+    page_results = await lazy_results.get_page(page, TMDB_REQUEST_DISAMBIGUATION_LIMIT)
+    if not page_results:
+        logger.debug("no search results on page %s for user %s.", page, user_id)
+        return
+
+    keyboard = get_tmdb_select_keyboard(
+        page_results, page=page, has_more=lazy_results.has_more(page, TMDB_REQUEST_DISAMBIGUATION_LIMIT)
+    )
+    try:
+        await callback_query.message.edit_reply_markup(reply_markup=keyboard)
+    except TelegramBadRequest as e:
+        logger.debug("could not update search results page for user %s: %s", user_id, e)
+    media_prefetch_tasks.start(user_id, tmdb_api.prefetch_media_details(page_results))
+
+async def _send_media_poster(bot: Bot, chat_id: int, poster_url: str, caption: str, keyboard: InlineKeyboardMarkup):
+    cached_file_id = await db.get_poster_file_id(poster_url)
+    if cached_file_id:
+        try:
+            await bot.send_photo(
+                chat_id=chat_id, photo=cached_file_id, caption=caption, parse_mode="MarkdownV2", reply_markup=keyboard
+            )
+            return
+        except TelegramBadRequest as e:
+            logger.warning("cached file_id for poster %s was rejected: %s. resending from url.", poster_url, e)
+            await db.delete_poster_file_id(poster_url)
+
+    sent_message = await bot.send_photo(
+        chat_id=chat_id, photo=poster_url, caption=caption, parse_mode="MarkdownV2", reply_markup=keyboard
+    )
+    if sent_message.photo:
+        await db.save_poster_file_id(poster_url, sent_message.photo[-1].file_id)
 
 @request_router.callback_query(StateFilter(RequestMediaStates.select_media), F.data.startswith("tmdb_sel:"))
 async def select_media_callback_handler(callback_query: CallbackQuery, state: FSMContext, bot: Bot):
@@ -134,6 +267,7 @@ async def select_media_callback_handler(callback_query: CallbackQuery, state: FS
     action_data = callback_query.data
 
     if action_data == "tmdb_sel:manual_request":
+        media_prefetch_tasks.cancel(callback_query.from_user.id)
         user_fsm_data = await state.get_data()
         original_query = user_fsm_data.get("request_query", "your previous search")
         prompt_text_obj = Text(PROMPT_MANUAL_REQUEST_DESCRIPTION.format(original_query=original_query))
@@ -156,13 +290,14 @@ async def select_media_callback_handler(callback_query: CallbackQuery, state: FS
         return
 
     media_details = await tmdb_api.get_media_details(tmdb_id, media_type)
+    media_prefetch_tasks.cancel(callback_query.from_user.id)
     if not media_details:
         error_text_obj = Text(ERR_MEDIA_DETAILS_FETCH_FAILED)
         await callback_query.message.edit_text(error_text_obj.as_markdown(), parse_mode="MarkdownV2", reply_markup=None)
         await state.set_state(RequestMediaStates.select_media)
         return
 
-    await state.update_data(selected_media_details=media_details)
+    await state.update_data(selected_media={"tmdb_id": tmdb_id, "media_type": media_type})
     formatted_details_obj = format_media_details_for_user(media_details)
 
     caption_confirm_text_obj = Text(MSG_MEDIA_CONFIRM_REQUEST)
@@ -176,12 +311,12 @@ async def select_media_callback_handler(callback_query: CallbackQuery, state: FS
             await callback_query.message.delete()
 
             if media_details.get("poster_url"):
-                await bot.send_photo(
+                await _send_media_poster(
+                    bot,
                     chat_id=original_message_chat_id,
-                    photo=media_details["poster_url"],
+                    poster_url=media_details["poster_url"],
                     caption=full_caption_obj.as_markdown(),
-                    parse_mode="MarkdownV2",
-                    reply_markup=keyboard,
+                    keyboard=keyboard,
                 )
             else:
                 await bot.send_message(
@@ -235,11 +370,23 @@ async def manual_request_description_handler(message: Message, state: FSMContext
     if db_request_row and db_user_row:
         admin_msg_obj = format_request_for_admin(dict(db_request_row), dict(db_user_row))
         admin_kb = get_admin_request_action_keyboard(request_id)
-        await notify_admin_formatted(bot, admin_msg_obj, admin_kb)
+        await notify_admin_formatted(
+            bot,
+            admin_msg_obj,
+            admin_kb,
+            digest_summary=format_request_digest_line(dict(db_request_row), dict(db_user_row)),
+            digest_button=get_admin_digest_review_button(request_id),
+        )
 
     await state.clear()
     await show_main_menu_for_user(message, bot, custom_text_str=MSG_MANUAL_REQUEST_SUCCESS)
 
+async def get_selected_media_details(user_fsm_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    selected_media = user_fsm_data.get("selected_media")
+    if not selected_media:
+        return None
+    return await tmdb_api.get_media_details(selected_media["tmdb_id"], selected_media["media_type"])
+
 @request_router.callback_query(StateFilter(RequestMediaStates.confirm_media), F.data.startswith("req_conf:"))
 async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMContext, bot: Bot):
     await callback_query.answer()
@@ -248,7 +395,6 @@ async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMCont
 
     action = callback_query.data.split(":")[1]
     user_fsm_data = await state.get_data()
-    selected_media = user_fsm_data.get("selected_media_details")
     chat_id_to_reply = callback_query.from_user.id
 
     try:
@@ -266,7 +412,7 @@ async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMCont
     except Exception as e:
         logger.error(f"Unexpected error when editing confirmation message markup: {e}")
 
-    if not selected_media:
+    if not user_fsm_data.get("selected_media"):
         error_text_obj = Text(ERR_REQUEST_EXPIRED)
         await bot.send_message(chat_id_to_reply, error_text_obj.as_markdown(), parse_mode="MarkdownV2")
         await state.clear()
@@ -279,6 +425,14 @@ async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMCont
         await state.set_state(RequestMediaStates.typing_user_note)
         return
 
+    selected_media = await get_selected_media_details(user_fsm_data)
+    if not selected_media:
+        error_text_obj = Text(ERR_MEDIA_DETAILS_FETCH_FAILED)
+        await bot.send_message(chat_id_to_reply, error_text_obj.as_markdown(), parse_mode="MarkdownV2")
+        await state.clear()
+        await show_main_menu_for_user(callback_query, bot)
+        return
+
     request_id = await db.add_media_request(
         user_id=callback_query.from_user.id,
         tmdb_id=selected_media["tmdb_id"],
@@ -288,6 +442,7 @@ async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMCont
         request_type=selected_media["media_type"],
         user_query=user_fsm_data.get("request_query"),
         user_note=None,
+        tmdb_status=selected_media.get("status"),
     )
     reply_text_obj = Text(MSG_REQUEST_SUBMITTED)
     await bot.send_message(chat_id_to_reply, reply_text_obj.as_markdown(), parse_mode="MarkdownV2")
@@ -297,7 +452,13 @@ async def confirm_media_request_cb(callback_query: CallbackQuery, state: FSMCont
     if db_request_row and db_user_row:
         admin_msg_obj = format_request_for_admin(dict(db_request_row), dict(db_user_row))
         admin_kb = get_admin_request_action_keyboard(request_id)
-        await notify_admin_formatted(bot, admin_msg_obj, admin_kb)
+        await notify_admin_formatted(
+            bot,
+            admin_msg_obj,
+            admin_kb,
+            digest_summary=format_request_digest_line(dict(db_request_row), dict(db_user_row)),
+            digest_button=get_admin_digest_review_button(request_id),
+        )
 
     await state.clear()
     await show_main_menu_for_user(callback_query, bot, custom_text_str=MSG_REQUEST_SUCCESS)
@@ -308,15 +469,19 @@ async def user_note_handler(message: Message, state: FSMContext, bot: Bot):
         return
 
     user_fsm_data = await state.get_data()
-    selected_media = user_fsm_data.get("selected_media_details")
-
-    if not selected_media:
+    if not user_fsm_data.get("selected_media"):
         error_text_obj = Text(ERR_REQUEST_EXPIRED)
         await message.answer(error_text_obj.as_markdown(), parse_mode="MarkdownV2")
         await state.clear()
         await show_main_menu_for_user(message, bot, custom_text_str=MSG_SELECTION_EXPIRED)
         return
 
+    selected_media = await get_selected_media_details(user_fsm_data)
+    if not selected_media:
+        error_text_obj = Text(ERR_MEDIA_DETAILS_FETCH_FAILED)
+        await message.answer(error_text_obj.as_markdown(), parse_mode="MarkdownV2")
+        return
+
     note_text = truncate_text(message.text, MAX_NOTE_LENGTH)
     request_id = await db.add_media_request(
         user_id=message.from_user.id,
@@ -327,6 +492,7 @@ async def user_note_handler(message: Message, state: FSMContext, bot: Bot):
         request_type=selected_media["media_type"],
         user_query=user_fsm_data.get("request_query"),
         user_note=note_text,
+        tmdb_status=selected_media.get("status"),
     )
     reply_text_obj = Text(MSG_REQUEST_WITH_NOTE_SUBMITTED)
     await message.answer(reply_text_obj.as_markdown(), parse_mode="MarkdownV2")
@@ -336,7 +502,13 @@ async def user_note_handler(message: Message, state: FSMContext, bot: Bot):
     if db_request_row and db_user_row:
         admin_msg_obj = format_request_for_admin(dict(db_request_row), dict(db_user_row))
         admin_kb = get_admin_request_action_keyboard(request_id)
-        await notify_admin_formatted(bot, admin_msg_obj, admin_kb)
+        await notify_admin_formatted(
+            bot,
+            admin_msg_obj,
+            admin_kb,
+            digest_summary=format_request_digest_line(dict(db_request_row), dict(db_user_row)),
+            digest_button=get_admin_digest_review_button(request_id),
+        )
 
     await state.clear()
     await show_main_menu_for_user(message, bot, custom_text_str=MSG_REQUEST_SUCCESS)
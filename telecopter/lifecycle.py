@@ -0,0 +1,112 @@
+import time
+import signal
+import asyncio
+import logging
+
+from aiogram.types import TelegramObject
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from telecopter.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class Lifecycle:
+    def __init__(self, drain_timeout: float):
+        self.drain_timeout = drain_timeout
+        self.stop_requested = asyncio.Event()
+        self._forced = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._report: Dict[str, Any] = {}
+        self._stop_started_at: Optional[float] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._handler_tasks)
+
+    def install_signal_handlers(self, signals: Tuple[signal.Signals, ...] = (signal.SIGINT, signal.SIGTERM)):
+        loop = asyncio.get_running_loop()
+        for signal_number in signals:
+            loop.add_signal_handler(signal_number, self.request_stop, signal_number)
+
+    def request_stop(self, signal_number: Optional[signal.Signals] = None):
+        signal_name = signal_number.name if signal_number else "request"
+        if self.stop_requested.is_set():
+            logger.warning("received %s again while draining. forcing shutdown.", signal_name)
+            self._forced.set()
+            return
+        logger.info("received %s. no longer accepting updates, draining...", signal_name)
+        self._stop_started_at = time.monotonic()
+        self.stop_requested.set()
+
+    async def track_update(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        task = asyncio.current_task()
+        if task is None or task in self._handler_tasks:
+            return await handler(event, data)
+        self._handler_tasks.add(task)
+        self._idle.clear()
+        try:
+            return await handler(event, data)
+        finally:
+            self._handler_tasks.discard(task)
+            if not self._handler_tasks:
+                self._idle.set()
+
+    async def wait_until_stopped(self, intake: asyncio.Task):
+        stop_waiter = asyncio.create_task(self.stop_requested.wait())
+        await asyncio.wait({intake, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+        stop_waiter.cancel()
+        if not self.stop_requested.is_set():
+            self.request_stop()
+
+    async def drain_handlers(self):
+        in_flight = self.in_flight
+        if in_flight:
+            idle_waiter = asyncio.create_task(self._idle.wait())
+            forced_waiter = asyncio.create_task(self._forced.wait())
+            await asyncio.wait(
+                {idle_waiter, forced_waiter}, timeout=self.drain_timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            idle_waiter.cancel()
+            forced_waiter.cancel()
+        abandoned = list(self._handler_tasks)
+        for task in abandoned:
+            task.cancel()
+        if abandoned:
+            await asyncio.gather(*abandoned, return_exceptions=True)
+        self._report["handlers"] = {"drained": in_flight - len(abandoned), "cancelled": len(abandoned)}
+
+    async def step(self, name: str, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        started_at = time.monotonic()
+        try:
+            if self._forced.is_set():
+                timeout = 0.5
+            result = await asyncio.wait_for(awaitable, timeout=timeout or self.drain_timeout)
+            self._report[name] = result if result is not None else "ok"
+            return result
+        except asyncio.TimeoutError:
+            logger.warning("shutdown step '%s' timed out after %.1fs.", name, time.monotonic() - started_at)
+            self._report[name] = "timed out"
+        except Exception as e:
+            logger.error("shutdown step '%s' failed: %s", name, e, exc_info=True)
+            self._report[name] = "failed"
+        return None
+
+    def finish(self):
+        elapsed = time.monotonic() - self._stop_started_at if self._stop_started_at else 0.0
+        logger.info("shutdown complete in %.1fs: %s", elapsed, self._report)
+        for handler in logging.getLogger().handlers + [
+            handler
+            for existing_logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(existing_logger, logging.Logger)
+            for handler in existing_logger.handlers
+        ]:
+            handler.flush()
@@ -0,0 +1,267 @@
+import time
+import heapq
+import asyncio
+import itertools
+
+from enum import IntEnum
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.utils.formatting import Text
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.types import TelegramObject, Update
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+from telecopter.logger import setup_logger
+from telecopter.rate_limit import KeyedTokenBuckets
+from telecopter.handlers.handler_states import RequestMediaStates
+from telecopter.config import (
+    ADMIN_CHAT_ID_SET,
+    THROTTLE_MESSAGES_PER_SECOND,
+    THROTTLE_MESSAGE_BURST,
+    THROTTLE_CALLBACKS_PER_SECOND,
+    THROTTLE_CALLBACK_BURST,
+    THROTTLE_SEARCHES_PER_SECOND,
+    THROTTLE_SEARCH_BURST,
+)
+from telecopter.constants import (
+    ERR_BUSY_CALLBACK,
+    ERR_THROTTLED_CALLBACK,
+    ERR_THROTTLED_MESSAGE,
+    ERR_THROTTLED_SEARCH,
+)
+
+
+logger = setup_logger(__name__)
+
+THROTTLE_NOTICE_INTERVAL_SECONDS = 10.0
+THROTTLE_CLEANUP_INTERVAL_SECONDS = 60.0
+SEARCH_CALLBACK_PREFIXES = ("tmdb_page:",)
+PAGINATION_CALLBACK_PREFIXES = ("tmdb_page:", "my_req_page:")
+HANDLER_METRICS_LOG_INTERVAL_SECONDS = 60.0
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(self, fsm: FSMContextMiddleware):
+        self.fsm = fsm
+        self.buckets: Dict[str, KeyedTokenBuckets] = {
+            "message": KeyedTokenBuckets(THROTTLE_MESSAGES_PER_SECOND, THROTTLE_MESSAGE_BURST),
+            "callback": KeyedTokenBuckets(THROTTLE_CALLBACKS_PER_SECOND, THROTTLE_CALLBACK_BURST),
+            "search": KeyedTokenBuckets(THROTTLE_SEARCHES_PER_SECOND, THROTTLE_SEARCH_BURST),
+        }
+        self._noticed_at: Dict[Tuple[int, str], float] = {}
+        self._throttled: Counter = Counter()
+        self._cleaned_at = time.monotonic()
+
+    async def _is_searching(self, data: Dict[str, Any]) -> bool:
+        context = self.fsm.resolve_event_context(data["bot"], data)
+        return context is not None and await context.get_state() == RequestMediaStates.typing_media_name.state
+
+    async def _limits_for(self, event: Update, data: Dict[str, Any]) -> List[str]:
+        if event.callback_query:
+            if event.callback_query.data and event.callback_query.data.startswith(SEARCH_CALLBACK_PREFIXES):
+                return ["callback", "search"]
+            return ["callback"]
+        if event.message:
+            if event.message.text and await self._is_searching(data):
+                return ["message", "search"]
+            return ["message"]
+        return []
+
+    def _cleanup(self, now: float):
+        if now - self._cleaned_at < THROTTLE_CLEANUP_INTERVAL_SECONDS:
+            return
+        self._cleaned_at = now
+        for buckets in self.buckets.values():
+            buckets.prune()
+        self._noticed_at = {
+            key: noticed_at
+            for key, noticed_at in self._noticed_at.items()
+            if now - noticed_at < THROTTLE_NOTICE_INTERVAL_SECONDS
+        }
+        if self._throttled:
+            logger.info(
+                "throttled updates in the last %ss: %s", THROTTLE_CLEANUP_INTERVAL_SECONDS, dict(self._throttled)
+            )
+            self._throttled.clear()
+
+    def _should_notice(self, user_id: int, limit: str, now: float) -> bool:
+        noticed_at = self._noticed_at.get((user_id, limit))
+        if noticed_at is not None and now - noticed_at < THROTTLE_NOTICE_INTERVAL_SECONDS:
+            return False
+        self._noticed_at[(user_id, limit)] = now
+        return True
+
+    async def _reject(self, event: Update, user_id: int, limit: str, now: float):
+        if event.callback_query:
+            await event.callback_query.answer(ERR_THROTTLED_CALLBACK)
+            return
+        if event.message and self._should_notice(user_id, limit, now):
+            notice = ERR_THROTTLED_SEARCH if limit == "search" else ERR_THROTTLED_MESSAGE
+            await event.message.answer(Text(notice).as_markdown(), parse_mode="MarkdownV2")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if not isinstance(event, Update) or user is None or user.id in ADMIN_CHAT_ID_SET:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        self._cleanup(now)
+        for limit in await self._limits_for(event, data):
+            if not self.buckets[limit].try_acquire(user.id):
+                self._throttled[limit] += 1
+                logger.debug("throttled %s from user %s.", limit, user.id)
+                await self._reject(event, user.id, limit, now)
+                return None
+        return await handler(event, data)
+
+
+class UpdatePriority(IntEnum):
+    ADMIN = 0
+    MESSAGE = 1
+    CALLBACK = 2
+    PAGINATION = 3
+
+
+def get_update_priority(update: Update, user_id: Optional[int]) -> UpdatePriority:
+    if user_id is not None and user_id in ADMIN_CHAT_ID_SET:
+        return UpdatePriority.ADMIN
+    if update.callback_query:
+        if update.callback_query.data and update.callback_query.data.startswith(PAGINATION_CALLBACK_PREFIXES):
+            return UpdatePriority.PAGINATION
+        return UpdatePriority.CALLBACK
+    return UpdatePriority.MESSAGE
+
+
+class UserSerialIsolation(BaseEventIsolation):
+    def __init__(self, on_queued: Optional[Callable[[int], Any]] = None):
+        self.on_queued = on_queued
+        self._locks: Dict[StorageKey, asyncio.Lock] = {}
+        self._users: Dict[StorageKey, int] = {}
+
+    @property
+    def queued(self) -> int:
+        return sum(self._users.values()) - len(self._users)
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        if lock.locked() and self.on_queued is not None:
+            self.on_queued(key.user_id)
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+    async def close(self) -> None:
+        pass
+
+
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    def __init__(self, limit: int, shed_queue_depth: int, isolation: Optional[UserSerialIsolation] = None):
+        self.limit = limit
+        self.shed_queue_depth = shed_queue_depth
+        self.isolation = isolation
+        self._running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wait_totals: Counter = Counter()
+        self._wait_counts: Counter = Counter()
+        self._wait_max: Dict[UpdatePriority, float] = {}
+        self._shed = 0
+        self._metrics_logged_at = time.monotonic()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> Dict[str, Any]:
+        waits = {
+            priority.name.lower(): {
+                "n": self._wait_counts[priority],
+                "avg_ms": round(self._wait_totals[priority] / self._wait_counts[priority] * 1000),
+                "max_ms": round(self._wait_max.get(priority, 0.0) * 1000),
+            }
+            for priority in UpdatePriority
+            if self._wait_counts[priority]
+        }
+        return {
+            "running": self._running,
+            "queued": self.queued,
+            "queued_per_user": self.isolation.queued if self.isolation else 0,
+            "shed": self._shed,
+            "wait": waits,
+        }
+
+    def _log_metrics(self, now: float):
+        if now - self._metrics_logged_at < HANDLER_METRICS_LOG_INTERVAL_SECONDS:
+            return
+        self._metrics_logged_at = now
+        if self._wait_counts or self._shed:
+            logger.info("handler concurrency: %s", self.stats())
+        self._wait_totals.clear()
+        self._wait_counts.clear()
+        self._wait_max.clear()
+        self._shed = 0
+
+    async def _acquire(self, priority: UpdatePriority):
+        if self._running < self.limit and not self.queued:
+            self._running += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        now = time.monotonic()
+        self._log_metrics(now)
+        user = data.get("event_from_user")
+        priority = get_update_priority(event, user.id if user else None)
+        if priority == UpdatePriority.PAGINATION and self.shed_queue_depth > 0 and self.queued >= self.shed_queue_depth:
+            self._shed += 1
+            logger.debug("shedding %s update %s while saturated.", priority.name.lower(), event.update_id)
+            await event.callback_query.answer(ERR_BUSY_CALLBACK)
+            return None
+
+        await self._acquire(priority)
+        waited = time.monotonic() - now
+        self._wait_totals[priority] += waited
+        self._wait_counts[priority] += 1
+        self._wait_max[priority] = max(self._wait_max.get(priority, 0.0), waited)
+        try:
+            return await handler(event, data)
+        finally:
+            self._release()
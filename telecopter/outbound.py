@@ -0,0 +1,267 @@
+import time
+import asyncio
+
+from enum import IntEnum
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Tuple, Union, Optional
+
+from aiogram import Bot
+from aiogram.methods import (
+    Response,
+    SendAudio,
+    SendPhoto,
+    SendVideo,
+    SendVoice,
+    CopyMessage,
+    SendMessage,
+    SendSticker,
+    SendDocument,
+    SendAnimation,
+    SendMediaGroup,
+    TelegramMethod,
+    ForwardMessage,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+
+from telecopter.logger import setup_logger
+from telecopter.rate_limit import TokenBucket
+from telecopter.config import (
+    OUTBOUND_GLOBAL_MESSAGES_PER_SECOND,
+    OUTBOUND_PER_CHAT_MESSAGES_PER_SECOND,
+    OUTBOUND_PER_CHAT_BURST,
+    OUTBOUND_RETRY_AFTER_MAX_RETRIES,
+    OUTBOUND_METRICS_LOG_INTERVAL_SECONDS,
+)
+
+
+logger = setup_logger(__name__)
+
+ChatId = Union[int, str]
+
+MESSAGE_SENDING_METHODS = (
+    SendMessage,
+    SendPhoto,
+    SendMediaGroup,
+    CopyMessage,
+    ForwardMessage,
+    SendDocument,
+    SendVideo,
+    SendAnimation,
+    SendAudio,
+    SendVoice,
+    SendSticker,
+)
+
+
+class OutboundPriority(IntEnum):
+    INTERACTIVE = 0
+    MODERATION = 1
+    NOTIFICATION = 2
+    BROADCAST = 3
+
+
+_current_priority: ContextVar[OutboundPriority] = ContextVar("outbound_priority", default=OutboundPriority.INTERACTIVE)
+
+
+def set_outbound_priority(priority: OutboundPriority):
+    _current_priority.set(priority)
+
+
+class _PendingSend:
+    __slots__ = ("chat_id", "future", "enqueued_at")
+
+    def __init__(self, chat_id: ChatId, future: asyncio.Future):
+        self.chat_id = chat_id
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class _WaitStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, wait_seconds: float):
+        self.count += 1
+        self.total += wait_seconds
+        self.max = max(self.max, wait_seconds)
+
+
+class OutboundScheduler:
+    def __init__(self, global_rate: float, per_chat_rate: float, per_chat_burst: float):
+        self._global_limiter = TokenBucket(rate=global_rate)
+        self._per_chat_rate = per_chat_rate
+        self._per_chat_burst = max(1.0, per_chat_burst)
+        self._chat_budgets: Dict[ChatId, Tuple[float, float]] = {}
+        self._chat_paused_until: Dict[ChatId, float] = {}
+        self._queues: Dict[OutboundPriority, Deque[_PendingSend]] = {priority: deque() for priority in OutboundPriority}
+        self._wait_stats: Dict[OutboundPriority, _WaitStats] = {priority: _WaitStats() for priority in OutboundPriority}
+        self._metrics_logged_at = time.monotonic()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def set_global_rate(self, global_rate: float):
+        self._global_limiter = TokenBucket(rate=global_rate)
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {priority.name.lower(): len(queue) for priority, queue in self._queues.items()}
+
+    def pause_chat(self, chat_id: ChatId, seconds: float):
+        self._chat_paused_until[chat_id] = max(self._chat_paused_until.get(chat_id, 0.0), time.monotonic() + seconds)
+
+    async def acquire(self, chat_id: ChatId, priority: OutboundPriority):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="outbound-scheduler")
+        pending = _PendingSend(chat_id, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(pending)
+        self._wakeup.set()
+        await pending.future
+        self._wait_stats[priority].record(time.monotonic() - pending.enqueued_at)
+
+    def _chat_wait_time(self, chat_id: ChatId, now: float) -> float:
+        paused_for = self._chat_paused_until.get(chat_id, 0.0) - now
+        if paused_for > 0:
+            return paused_for
+        if self._per_chat_rate <= 0:
+            return 0.0
+        tokens, updated_at = self._chat_budgets.get(chat_id, (self._per_chat_burst, now))
+        tokens = min(self._per_chat_burst, tokens + (now - updated_at) * self._per_chat_rate)
+        return max(0.0, (1.0 - tokens) / self._per_chat_rate)
+
+    def _take_chat_token(self, chat_id: ChatId, now: float):
+        self._chat_paused_until.pop(chat_id, None)
+        if self._per_chat_rate <= 0:
+            return
+        tokens, updated_at = self._chat_budgets.get(chat_id, (self._per_chat_burst, now))
+        tokens = min(self._per_chat_burst, tokens + (now - updated_at) * self._per_chat_rate)
+        self._chat_budgets[chat_id] = (tokens - 1.0, now)
+
+    def _prune_chat_budgets(self, now: float):
+        refill_seconds = self._per_chat_burst / self._per_chat_rate if self._per_chat_rate > 0 else 0.0
+        self._chat_budgets = {
+            chat_id: budget for chat_id, budget in self._chat_budgets.items() if now - budget[1] < refill_seconds
+        }
+        self._chat_paused_until = {chat_id: until for chat_id, until in self._chat_paused_until.items() if until > now}
+
+    def _pop_next_ready(self, now: float) -> Tuple[Optional[_PendingSend], Optional[float]]:
+        next_ready_in: Optional[float] = None
+        for priority in OutboundPriority:
+            queue = self._queues[priority]
+            for pending in list(queue):
+                if pending.future.done():
+                    queue.remove(pending)
+                    continue
+                chat_wait = self._chat_wait_time(pending.chat_id, now)
+                if chat_wait <= 0:
+                    queue.remove(pending)
+                    return pending, None
+                next_ready_in = chat_wait if next_ready_in is None else min(next_ready_in, chat_wait)
+        return None, next_ready_in
+
+    def _log_metrics(self, now: float):
+        if OUTBOUND_METRICS_LOG_INTERVAL_SECONDS <= 0:
+            return
+        if now - self._metrics_logged_at < OUTBOUND_METRICS_LOG_INTERVAL_SECONDS:
+            return
+        self._metrics_logged_at = now
+        summaries: List[str] = []
+        for priority, stats in self._wait_stats.items():
+            if stats.count:
+                summaries.append(
+                    f"{priority.name.lower()} n={stats.count} avg={stats.total / stats.count * 1000:.0f}ms"
+                    f" max={stats.max * 1000:.0f}ms"
+                )
+        if summaries:
+            logger.info("outbound queue wait: %s; queued: %s", ", ".join(summaries), self.queue_depths())
+        self._wait_stats = {priority: _WaitStats() for priority in OutboundPriority}
+        self._prune_chat_budgets(now)
+
+    async def _dispatch_loop(self):
+        while True:
+            now = time.monotonic()
+            self._log_metrics(now)
+
+            global_wait = self._global_limiter.wait_time()
+            if global_wait > 0:
+                await asyncio.sleep(global_wait)
+                continue
+
+            pending, next_ready_in = self._pop_next_ready(now)
+            if pending is not None:
+                self._global_limiter.try_acquire()
+                self._take_chat_token(pending.chat_id, now)
+                pending.future.set_result(None)
+                continue
+
+            self._wakeup.clear()
+            timeout = next_ready_in
+            if timeout is None and OUTBOUND_METRICS_LOG_INTERVAL_SECONDS > 0:
+                timeout = OUTBOUND_METRICS_LOG_INTERVAL_SECONDS
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class OutboundSchedulerMiddleware(BaseRequestMiddleware):
+    def __init__(self, scheduler: OutboundScheduler):
+        self.scheduler = scheduler
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Response[Any]:
+        if not isinstance(method, MESSAGE_SENDING_METHODS):
+            return await make_request(bot, method)
+
+        chat_id = method.chat_id
+
+        priority = _current_priority.get()
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self.scheduler.pause_chat(chat_id, e.retry_after)
+                if attempt >= OUTBOUND_RETRY_AFTER_MAX_RETRIES:
+                    raise
+                attempt += 1
+                logger.warning(
+                    "telegram asked to retry %s to chat %s after %ss (%s priority, attempt %s).",
+                    type(method).__name__,
+                    chat_id,
+                    e.retry_after,
+                    priority.name.lower(),
+                    attempt,
+                )
+
+
+outbound_scheduler = OutboundScheduler(
+    global_rate=OUTBOUND_GLOBAL_MESSAGES_PER_SECOND,
+    per_chat_rate=OUTBOUND_PER_CHAT_MESSAGES_PER_SECOND,
+    per_chat_burst=OUTBOUND_PER_CHAT_BURST,
+)
+
+
+def install_outbound_scheduler(bot: Bot, processes: int = 1):
+    if OUTBOUND_GLOBAL_MESSAGES_PER_SECOND <= 0:
+        logger.info("outbound message scheduler disabled.")
+        return
+    global_rate = OUTBOUND_GLOBAL_MESSAGES_PER_SECOND / max(1, processes)
+    outbound_scheduler.set_global_rate(global_rate)
+    bot.session.middleware(OutboundSchedulerMiddleware(outbound_scheduler))
+    logger.info(
+        "outbound message scheduler enabled: %s msg/s global, %s msg/s per chat (burst %s).",
+        global_rate,
+        OUTBOUND_PER_CHAT_MESSAGES_PER_SECOND,
+        OUTBOUND_PER_CHAT_BURST,
+    )
@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+
+from typing import List, Tuple
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+
+import telecopter.database as db
+from telecopter.logger import setup_logger
+from telecopter.broadcast import get_unreachable_reason
+from telecopter.outbound import OutboundPriority, set_outbound_priority
+from telecopter.constants import OutboxStatus
+from telecopter.config import (
+    OUTBOX_POLL_INTERVAL_SECONDS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_BACKOFF_BASE_SECONDS,
+    OUTBOX_BACKOFF_MAX_SECONDS,
+)
+
+
+logger = setup_logger(__name__)
+
+_outbox_wakeup = asyncio.Event()
+
+
+def wake_outbox_worker():
+    _outbox_wakeup.set()
+
+
+def _retry_at(delay_seconds: float) -> str:
+    return (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delay_seconds)).isoformat()
+
+
+def _backoff_seconds(attempts: int) -> float:
+    return min(OUTBOX_BACKOFF_MAX_SECONDS, OUTBOX_BACKOFF_BASE_SECONDS * (2**attempts))
+
+
+async def _deliver(bot: Bot, message: aiosqlite.Row) -> Tuple[bool, float, str, bool]:
+    try:
+        await bot.send_message(message["chat_id"], text=message["message_text"], parse_mode="MarkdownV2")
+        return True, 0.0, "", False
+    except TelegramRetryAfter as e:
+        return False, float(e.retry_after), str(e), False
+    except TelegramAPIError as e:
+        unreachable_reason = get_unreachable_reason(e)
+        if unreachable_reason:
+            await db.mark_chats_unreachable([(message["chat_id"], unreachable_reason)])
+        return False, _backoff_seconds(message["attempts"]), str(e), unreachable_reason is not None
+    except Exception as e:
+        return False, _backoff_seconds(message["attempts"]), str(e), False
+
+
+async def deliver_due_messages(bot: Bot) -> int:
+    messages = await db.get_due_outbox_messages(OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0
+
+    results = await asyncio.gather(*(_deliver(bot, message) for message in messages))
+
+    sent_ids: List[int] = []
+    retries: List[Tuple[int, str, str, str]] = []
+    for message, (delivered, retry_delay, error, permanent) in zip(messages, results):
+        if delivered:
+            sent_ids.append(message["outbox_id"])
+            continue
+        if permanent or message["attempts"] + 1 >= OUTBOX_MAX_ATTEMPTS:
+            logger.error(
+                "giving up on notification %s to chat_id %s after %s attempts: %s",
+                message["outbox_id"],
+                message["chat_id"],
+                message["attempts"] + 1,
+                error,
+            )
+            retries.append((message["outbox_id"], OutboxStatus.FAILED.value, _retry_at(0), error))
+        else:
+            logger.warning(
+                "notification %s to chat_id %s failed, retrying in %.0fs: %s",
+                message["outbox_id"],
+                message["chat_id"],
+                retry_delay,
+                error,
+            )
+            retries.append((message["outbox_id"], OutboxStatus.PENDING.value, _retry_at(retry_delay), error))
+
+    await db.mark_outbox_messages_sent(sent_ids)
+    await db.reschedule_outbox_messages(retries)
+    logger.debug("outbox batch: %s delivered, %s not delivered.", len(sent_ids), len(retries))
+    return len(messages)
+
+
+async def _wait_for_work():
+    timeout = OUTBOX_POLL_INTERVAL_SECONDS
+    next_attempt_at = await db.get_next_outbox_attempt_at()
+    if next_attempt_at:
+        seconds_until_due = (
+            datetime.datetime.fromisoformat(next_attempt_at) - datetime.datetime.now(datetime.timezone.utc)
+        ).total_seconds()
+        timeout = max(0.0, min(timeout, seconds_until_due))
+    try:
+        await asyncio.wait_for(_outbox_wakeup.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    _outbox_wakeup.clear()
+
+
+async def flush_outbox(bot: Bot) -> int:
+    set_outbound_priority(OutboundPriority.MODERATION)
+    attempted_count = 0
+    while True:
+        batch_count = await deliver_due_messages(bot)
+        attempted_count += batch_count
+        if batch_count < OUTBOX_BATCH_SIZE:
+            return attempted_count
+
+
+async def run_outbox_worker(bot: Bot):
+    set_outbound_priority(OutboundPriority.MODERATION)
+    logger.info("notification outbox worker started.")
+    while True:
+        try:
+            delivered_count = await deliver_due_messages(bot)
+        except Exception as e:
+            logger.error("notification outbox delivery failed: %s", e, exc_info=True)
+            delivered_count = 0
+        if delivered_count < OUTBOX_BATCH_SIZE:
+            await _wait_for_work()
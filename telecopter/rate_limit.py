@@ -0,0 +1,90 @@
+import time
+import asyncio
+
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        if self.paused_for > 0:
+            return False
+        if self.unlimited:
+            return True
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        paused_for = self.paused_for
+        if paused_for > 0:
+            return paused_for
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.wait_time(tokens))
+
+
+class KeyedTokenBuckets:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def try_acquire(self, key: Hashable) -> bool:
+        if self.unlimited:
+            return True
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1.0, now)
+        return True
+
+    def prune(self) -> int:
+        if self.unlimited:
+            return 0
+        now = time.monotonic()
+        refill_seconds = self.burst / self.rate
+        before = len(self._buckets)
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < refill_seconds}
+        return before - len(self._buckets)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,187 @@
+import asyncio
+import aiohttp
+import multiprocessing
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import TelegramObject, Update
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from telecopter.logger import setup_logger
+from telecopter.webhook import create_webhook_app
+from telecopter.config import ADMIN_CHAT_ID_SET, BOT_WORKER_HOST, BOT_WORKER_BASE_PORT
+
+
+logger = setup_logger(__name__)
+
+WORKER_UPDATES_PATH = "/updates"
+FORWARD_RETRY_DELAY_SECONDS = 0.5
+FORWARD_MAX_ATTEMPTS = 60
+WORKER_MONITOR_INTERVAL_SECONDS = 5.0
+WORKER_READY_TIMEOUT_SECONDS = 60.0
+WORKER_STOP_TIMEOUT_SECONDS = 15.0
+
+
+def worker_url(index: int, path: str = WORKER_UPDATES_PATH) -> str:
+    return f"http://{BOT_WORKER_HOST}:{BOT_WORKER_BASE_PORT + index}{path}"
+
+
+def worker_for_user(user_id: Optional[int], workers: int) -> int:
+    if user_id is None or user_id in ADMIN_CHAT_ID_SET:
+        return 0
+    return user_id % workers
+
+
+class UpdateForwarder(BaseMiddleware):
+    def __init__(self, workers: int, secret_token: str):
+        self.workers = workers
+        self.secret_token = secret_token
+        self._queues: List[asyncio.Queue] = [asyncio.Queue() for _ in range(workers)]
+        self._senders: List[asyncio.Task] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        user_id = user.id if user else chat.id if chat else None
+        self._queues[worker_for_user(user_id, self.workers)].put_nowait(
+            event.model_dump(mode="json", by_alias=True, exclude_none=True)
+        )
+        return None
+
+    def start(self):
+        self._session = aiohttp.ClientSession(headers={"X-Telegram-Bot-Api-Secret-Token": self.secret_token})
+        self._senders = [
+            asyncio.create_task(self._send_loop(index), name=f"update-forwarder:{index}")
+            for index in range(self.workers)
+        ]
+
+    def queue_depths(self) -> List[int]:
+        return [queue.qsize() for queue in self._queues]
+
+    async def _forward(self, index: int, update: Dict[str, Any]):
+        for attempt in range(1, FORWARD_MAX_ATTEMPTS + 1):
+            try:
+                async with self._session.post(worker_url(index), json=update) as response:
+                    if response.status == 200:
+                        return
+                    logger.warning(
+                        "worker %s rejected update %s with status %s.", index, update.get("update_id"), response.status
+                    )
+            except aiohttp.ClientError as e:
+                logger.debug("worker %s unreachable (attempt %s): %s", index, attempt, e)
+            await asyncio.sleep(FORWARD_RETRY_DELAY_SECONDS)
+        logger.error(
+            "dropping update %s after %s attempts to reach worker %s.", update.get("update_id"), attempt, index
+        )
+
+    async def _send_loop(self, index: int):
+        queue = self._queues[index]
+        while True:
+            update = await queue.get()
+            try:
+                await self._forward(index, update)
+            finally:
+                queue.task_done()
+
+    async def close(self, timeout: float = 10.0):
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("gave up forwarding %s queued updates on shutdown.", sum(self.queue_depths()))
+        for sender in self._senders:
+            sender.cancel()
+        if self._session:
+            await self._session.close()
+
+
+class WorkerPool:
+    def __init__(self, target: Callable[[int, int, str], None], workers: int, secret_token: str):
+        self.target = target
+        self.workers = workers
+        self.secret_token = secret_token
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._monitor: Optional[asyncio.Task] = None
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=self.target, args=(index, self.workers, self.secret_token), name=f"telecopter-worker-{index}"
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info("started worker %s (pid %s) on %s.", index, process.pid, worker_url(index))
+
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(index)
+        self._monitor = asyncio.create_task(self._monitor_loop(), name="worker-monitor")
+
+    async def wait_ready(self, timeout: float = WORKER_READY_TIMEOUT_SECONDS) -> bool:
+        deadline = asyncio.get_running_loop().time() + timeout
+        pending = set(range(self.workers))
+        async with aiohttp.ClientSession() as session:
+            while pending and asyncio.get_running_loop().time() < deadline:
+                for index in list(pending):
+                    try:
+                        async with session.get(worker_url(index, "/healthz")) as response:
+                            if response.status == 200:
+                                pending.discard(index)
+                    except aiohttp.ClientError:
+                        pass
+                if pending:
+                    await asyncio.sleep(FORWARD_RETRY_DELAY_SECONDS)
+        if pending:
+            logger.error("workers %s did not become ready within %ss.", sorted(pending), timeout)
+            return False
+        logger.info("all %s workers are ready.", self.workers)
+        return True
+
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(WORKER_MONITOR_INTERVAL_SECONDS)
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    logger.error("worker %s exited with code %s. restarting.", index, process.exitcode)
+                    self._spawn(index)
+
+    async def stop(self, timeout: float = WORKER_STOP_TIMEOUT_SECONDS) -> Dict[str, int]:
+        if self._monitor:
+            self._monitor.cancel()
+        processes = [process for process in self._processes if process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        killed_count = 0
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, max(0.0, deadline - loop.time()))
+            if process.is_alive():
+                logger.warning("worker %s did not drain within %ss. killing.", index, timeout)
+                process.kill()
+                killed_count += 1
+        logger.info("all workers stopped.")
+        return {"stopped": len(processes) - killed_count, "killed": killed_count}
+
+
+async def serve_worker_updates(dp: Dispatcher, bot: Bot, index: int, secret_token: str, stop_requested: asyncio.Event):
+    runner = web.AppRunner(create_webhook_app(dp, bot, WORKER_UPDATES_PATH, secret_token), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, BOT_WORKER_HOST, BOT_WORKER_BASE_PORT + index)
+    await site.start()
+    logger.info("worker %s accepting updates on %s.", index, worker_url(index))
+    try:
+        await stop_requested.wait()
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,38 @@
+import asyncio
+
+from typing import Coroutine, Dict, Any
+
+from telecopter.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class UserTaskRegistry:
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def start(self, user_id: int, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        self.cancel(user_id)
+        task = asyncio.create_task(coro, name=f"{self.name}:{user_id}")
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda finished_task: self._discard(user_id, finished_task))
+        return task
+
+    def cancel(self, user_id: int) -> bool:
+        task = self._tasks.pop(user_id, None)
+        if task and not task.done():
+            task.cancel()
+            logger.debug("cancelled %s task for user %s.", self.name, user_id)
+            return True
+        return False
+
+    def _discard(self, user_id: int, task: asyncio.Task):
+        if self._tasks.get(user_id) is task:
+            del self._tasks[user_id]
+        if not task.cancelled() and task.exception():
+            logger.error("%s task for user %s failed: %s", self.name, user_id, task.exception())
+
+    def __len__(self) -> int:
+        return len(self._tasks)
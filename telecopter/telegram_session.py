@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.client.session.aiohttp import AiohttpSession
+
+from telecopter.logger import setup_logger
+from telecopter.config import (
+    TELEGRAM_API_BASE_URL,
+    TELEGRAM_CONNECTION_LIMIT,
+    TELEGRAM_CONNECTION_LIMIT_PER_HOST,
+    TELEGRAM_KEEPALIVE_TIMEOUT_SECONDS,
+    TELEGRAM_DNS_CACHE_TTL_SECONDS,
+    TELEGRAM_REQUEST_TIMEOUT_SECONDS,
+    TELEGRAM_METHOD_TIMEOUTS,
+)
+
+
+logger = setup_logger(__name__)
+
+
+def parse_method_timeouts(raw_timeouts: str) -> Dict[str, float]:
+    method_timeouts: Dict[str, float] = {}
+    for entry in raw_timeouts.split(","):
+        if not entry.strip():
+            continue
+        method_name, _, seconds = entry.partition("=")
+        try:
+            method_timeouts[method_name.strip()] = float(seconds)
+        except ValueError:
+            logger.warning("ignoring invalid telegram method timeout '%s'.", entry.strip())
+    return method_timeouts
+
+
+class TunedAiohttpSession(AiohttpSession):
+    def __init__(
+        self,
+        limit: int,
+        limit_per_host: int,
+        keepalive_timeout: float,
+        dns_cache_ttl: int,
+        method_timeouts: Optional[Dict[str, float]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init.update(
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        self.method_timeouts = method_timeouts or {}
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: Optional[int] = None) -> Any:
+        if timeout is None:
+            timeout = self.method_timeouts.get(method.__api_method__)
+        return await super().make_request(bot, method, timeout=timeout)
+
+
+def create_bot_session() -> AiohttpSession:
+    session_kwargs: Dict[str, Any] = {"timeout": TELEGRAM_REQUEST_TIMEOUT_SECONDS}
+    if TELEGRAM_API_BASE_URL:
+        session_kwargs["api"] = TelegramAPIServer.from_base(TELEGRAM_API_BASE_URL)
+
+    method_timeouts = parse_method_timeouts(TELEGRAM_METHOD_TIMEOUTS)
+    logger.info(
+        "telegram session: %s connections (%s/host), keep-alive %ss, dns cache %ss, timeout %ss, method timeouts %s",
+        TELEGRAM_CONNECTION_LIMIT,
+        TELEGRAM_CONNECTION_LIMIT_PER_HOST or "unlimited",
+        TELEGRAM_KEEPALIVE_TIMEOUT_SECONDS,
+        TELEGRAM_DNS_CACHE_TTL_SECONDS,
+        TELEGRAM_REQUEST_TIMEOUT_SECONDS,
+        method_timeouts or "none",
+    )
+    return TunedAiohttpSession(
+        limit=TELEGRAM_CONNECTION_LIMIT,
+        limit_per_host=TELEGRAM_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=TELEGRAM_KEEPALIVE_TIMEOUT_SECONDS,
+        dns_cache_ttl=TELEGRAM_DNS_CACHE_TTL_SECONDS,
+        method_timeouts=method_timeouts,
+        **session_kwargs,
+    )
@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import zlib
+import time
+import datetime
+import aiohttp
+import aiosqlite
+
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from telecopter.logger import setup_logger
+from telecopter.constants import MediaType
+from telecopter.config import TITLE_INDEX_FILE_PATH, TMDB_EXPORTS_BASE_URL
+
+
+logger = setup_logger(__name__)
+
+EXPORT_FILE_PREFIXES = {
+    MediaType.MOVIE.value: "movie_ids",
+    MediaType.TV.value: "tv_series_ids",
+}
+INGEST_BATCH_SIZE = 5000
+MAX_QUERY_TOKENS = 8
+
+
+def is_ready() -> bool:
+    return Path(TITLE_INDEX_FILE_PATH).is_file()
+
+
+def _build_match_query(query: str) -> Optional[str]:
+    tokens = re.findall(r"\w+", query.lower())[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+async def search_titles(query: str, limit: int, offset: int = 0) -> Optional[List[Dict[str, Any]]]:
+    if not is_ready():
+        return None
+
+    match_query = _build_match_query(query)
+    if not match_query:
+        return []
+
+    try:
+        async with aiosqlite.connect(f"file:{TITLE_INDEX_FILE_PATH}?mode=ro", uri=True) as db:
+            async with db.execute(
+                "select tmdb_id, media_type, title from titles where titles match ? order by rowid limit ? offset ?",
+                (match_query, limit, offset),
+            ) as cursor:
+                rows = await cursor.fetchall()
+    except aiosqlite.Error as e:
+        logger.error("local title index search failed for '%s': %s", query, e)
+        return None
+
+    return [
+        {
+            "tmdb_id": int(tmdb_id),
+            "title": title,
+            "year": None,
+            "media_type": media_type,
+            "overview": "no synopsis available.",
+            "poster_url": None,
+        }
+        for tmdb_id, media_type, title in rows
+    ]
+
+
+async def get_title(tmdb_id: int, media_type: str) -> Optional[Dict[str, Any]]:
+    if not is_ready():
+        return None
+    try:
+        async with aiosqlite.connect(f"file:{TITLE_INDEX_FILE_PATH}?mode=ro", uri=True) as db:
+            async with db.execute(
+                "select title from title_lookup where tmdb_id = ? and media_type = ?", (tmdb_id, media_type)
+            ) as cursor:
+                row = await cursor.fetchone()
+    except aiosqlite.Error as e:
+        logger.error("local title index lookup failed for %s id %s: %s", media_type, tmdb_id, e)
+        return None
+    if not row:
+        return None
+    return {
+        "tmdb_id": tmdb_id,
+        "title": row[0],
+        "year": None,
+        "media_type": media_type,
+        "overview": "no synopsis available.",
+        "poster_url": None,
+        "imdb_id": None,
+        "genres": [],
+        "status": None,
+        "tagline": None,
+    }
+
+
+def _parse_export_lines(lines: List[bytes], media_type: str) -> Iterator[Tuple[int, str, str, float]]:
+    title_key = "original_title" if media_type == MediaType.MOVIE.value else "original_name"
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            logger.debug("skipping malformed export line: %s", line[:100])
+            continue
+        if item.get("adult") or item.get("video"):
+            continue
+        title = item.get(title_key)
+        tmdb_id = item.get("id")
+        if not title or not tmdb_id:
+            continue
+        yield tmdb_id, media_type, title, float(item.get("popularity") or 0.0)
+
+
+async def _ingest_export_file(
+    session: aiohttp.ClientSession, db: aiosqlite.Connection, media_type: str, export_date: datetime.date
+) -> int:
+    file_name = f"{EXPORT_FILE_PREFIXES[media_type]}_{export_date.strftime('%m_%d_%Y')}.json.gz"
+    url = f"{TMDB_EXPORTS_BASE_URL}/{file_name}"
+    logger.info("downloading tmdb export %s...", url)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = b""
+    batch: List[Tuple[int, str, str, float]] = []
+    total_rows = 0
+
+    async def _flush():
+        nonlocal total_rows
+        if batch:
+            await db.executemany(
+                "insert into staging (tmdb_id, media_type, title, popularity) values (?, ?, ?, ?)", batch
+            )
+            total_rows += len(batch)
+            batch.clear()
+
+    async with session.get(url) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            pending += decompressor.decompress(chunk)
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+            batch.extend(_parse_export_lines(lines, media_type))
+            if len(batch) >= INGEST_BATCH_SIZE:
+                await _flush()
+        pending += decompressor.flush()
+        batch.extend(_parse_export_lines(pending.split(b"\n"), media_type))
+        await _flush()
+
+    logger.info("ingested %s %s titles from %s.", total_rows, media_type, file_name)
+    return total_rows
+
+
+async def ingest_exports(export_date: Optional[datetime.date] = None):
+    if export_date is None:
+        export_date = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=1)
+
+    index_path = Path(TITLE_INDEX_FILE_PATH)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    started_at = time.monotonic()
+    async with aiosqlite.connect(tmp_path) as db:
+        await db.execute("pragma journal_mode = off")
+        await db.execute("pragma synchronous = off")
+        await db.execute("create table staging (tmdb_id integer, media_type text, title text, popularity real)")
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            counts = {
+                media_type: await _ingest_export_file(session, db, media_type, export_date)
+                for media_type in EXPORT_FILE_PREFIXES
+            }
+
+        logger.info("building full-text title index...")
+        await db.execute("""
+            create virtual table titles using fts5(
+                title,
+                tmdb_id unindexed,
+                media_type unindexed,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        await db.execute("""
+            insert into titles (title, tmdb_id, media_type)
+            select title, tmdb_id, media_type from staging order by popularity desc
+        """)
+        await db.execute("""
+            create table title_lookup (
+                tmdb_id integer not null,
+                media_type text not null,
+                title text not null,
+                primary key (tmdb_id, media_type)
+            ) without rowid
+        """)
+        await db.execute("""
+            insert or ignore into title_lookup (tmdb_id, media_type, title)
+            select tmdb_id, media_type, title from staging
+        """)
+        await db.execute("drop table staging")
+        await db.execute("insert into titles (titles) values ('optimize')")
+        await db.execute("create table index_meta (key text primary key, value text not null)")
+        await db.executemany(
+            "insert into index_meta (key, value) values (?, ?)",
+            [
+                ("export_date", export_date.isoformat()),
+                ("ingested_at", datetime.datetime.now(datetime.timezone.utc).isoformat()),
+                *((f"{media_type}_count", str(count)) for media_type, count in counts.items()),
+            ],
+        )
+        await db.commit()
+        await db.execute("vacuum")
+
+    os.replace(tmp_path, index_path)
+    logger.info(
+        "title index written to %s with %s titles in %.1fs.",
+        index_path,
+        sum(counts.values()),
+        time.monotonic() - started_at,
+    )
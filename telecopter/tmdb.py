@@ -1,19 +1,58 @@
 import asyncio
+import datetime
 import aiohttp
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Set, AsyncIterator
 
 from telecopter.config import (
     TMDB_API_KEY,
     TMDB_BASE_URL,
     TMDB_IMAGE_BASE_URL,
     TMDB_REQUEST_DISAMBIGUATION_LIMIT,
+    TMDB_REQUEST_TIMEOUT_SECONDS,
+    TMDB_CIRCUIT_FAILURE_THRESHOLD,
+    TMDB_CIRCUIT_RECOVERY_SECONDS,
+    TMDB_CIRCUIT_HALF_OPEN_MAX_CALLS,
+    TMDB_DETAILS_CACHE_TTL_SECONDS,
+    TMDB_DETAILS_CACHE_MAX_ENTRIES,
+    TMDB_PREFETCH_CONCURRENCY,
+    TMDB_SEARCH_MODE,
+    TMDB_SEARCH_MAX_PAGES,
+    TMDB_LOCAL_SEARCH_PAGE_SIZE,
+    TMDB_CONNECTION_POOL_SIZE,
+    TMDB_KEEPALIVE_TIMEOUT_SECONDS,
+    TMDB_COALESCE_REQUESTS,
 )
+import telecopter.title_index as title_index
+from telecopter.cache import TTLCache
 from telecopter.logger import setup_logger
+from telecopter.circuit_breaker import CircuitBreaker
 
 
 logger = setup_logger(__name__)
 
+tmdb_circuit = CircuitBreaker(
+    name="tmdb",
+    failure_threshold=TMDB_CIRCUIT_FAILURE_THRESHOLD,
+    recovery_timeout=TMDB_CIRCUIT_RECOVERY_SECONDS,
+    half_open_max_calls=TMDB_CIRCUIT_HALF_OPEN_MAX_CALLS,
+)
+
+_details_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=TMDB_DETAILS_CACHE_MAX_ENTRIES, ttl=TMDB_DETAILS_CACHE_TTL_SECONDS
+)
+_details_inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+_prefetch_semaphore = asyncio.Semaphore(max(1, TMDB_PREFETCH_CONCURRENCY))
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def is_available() -> bool:
+    return bool(TMDB_API_KEY) and tmdb_circuit.is_available()
+
+
+def is_search_available() -> bool:
+    return is_available() or title_index.is_ready()
+
 
 async def _make_tmdb_request(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
     if not TMDB_API_KEY:
@@ -24,26 +63,73 @@ async def _make_tmdb_request(endpoint: str, params: Optional[Dict[str, Any]] = N
     if params:
         base_params.update(params)
 
+    if not tmdb_circuit.allow_request():
+        logger.debug("tmdb circuit is open. skipping request to endpoint: %s", endpoint)
+        return None
+
     url = f"{TMDB_BASE_URL}{endpoint}"
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=base_params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(
-                        "tmdb api request failed for endpoint %s with status %s: %s",
-                        endpoint,
-                        response.status,
-                        await response.text(),
-                    )
-                    return None
+        if TMDB_CONNECTION_POOL_SIZE > 0:
+            return await _request_json(_get_session(), endpoint, url, base_params)
+        timeout = aiohttp.ClientTimeout(total=TMDB_REQUEST_TIMEOUT_SECONDS)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await _request_json(session, endpoint, url, base_params)
     except aiohttp.ClientError as e:
+        tmdb_circuit.record_failure()
         logger.error("aiohttp client error during tmdb api request to %s: %s", endpoint, e)
         return None
     except asyncio.TimeoutError:
+        tmdb_circuit.record_failure()
         logger.error("timeout during tmdb api request to %s", endpoint)
         return None
+    except asyncio.CancelledError:
+        tmdb_circuit.release_trial()
+        raise
+    except Exception as e:
+        tmdb_circuit.record_failure()
+        logger.error("unexpected error during tmdb api request to %s: %s", endpoint, e, exc_info=True)
+        return None
+
+
+async def _request_json(
+    session: aiohttp.ClientSession, endpoint: str, url: str, params: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    async with session.get(url, params=params) as response:
+        if response.status == 200:
+            data = await response.json()
+            tmdb_circuit.record_success()
+            return data
+        if response.status == 429 or response.status >= 500:
+            tmdb_circuit.record_failure()
+        else:
+            tmdb_circuit.record_success()
+        logger.error(
+            "tmdb api request failed for endpoint %s with status %s: %s",
+            endpoint,
+            response.status,
+            await response.text(),
+        )
+        return None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=TMDB_CONNECTION_POOL_SIZE, ttl_dns_cache=300, keepalive_timeout=TMDB_KEEPALIVE_TIMEOUT_SECONDS
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=TMDB_REQUEST_TIMEOUT_SECONDS)
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("tmdb http session closed.")
+    _session = None
 
 
 def _extract_year(date_string: Optional[str]) -> Optional[int]:
@@ -88,38 +174,118 @@ def _format_search_result(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
-async def search_media(query: str) -> List[Dict[str, Any]]:
-    if not TMDB_API_KEY:
-        logger.warning("tmdb search cannot be performed without an api key.")
-        return []
+class LazySearchResults:
+    def __init__(self, query: str, results_iterator: AsyncIterator[Dict[str, Any]]):
+        self.query = query
+        self._results_iterator = results_iterator
+        self._results: List[Dict[str, Any]] = []
+        self._exhausted = False
+        self._fill_lock = asyncio.Lock()
 
-    endpoint = "/search/multi"
-    params = {"query": query, "page": 1, "include_adult": "false"}
-    data = await _make_tmdb_request(endpoint, params)
+    async def _fill(self, count: int):
+        if len(self._results) >= count or self._exhausted:
+            return
+        async with self._fill_lock:
+            while len(self._results) < count and not self._exhausted:
+                try:
+                    self._results.append(await anext(self._results_iterator))
+                except StopAsyncIteration:
+                    self._exhausted = True
+
+    async def get_page(self, page: int, page_size: int) -> List[Dict[str, Any]]:
+        start = page * page_size
+        await self._fill(start + page_size + 1)
+        return self._results[start : start + page_size]
 
-    if data and "results" in data:
-        formatted_results = []
+    def has_more(self, page: int, page_size: int) -> bool:
+        return len(self._results) > (page + 1) * page_size
+
+
+async def _iter_local_search_results(query: str) -> AsyncIterator[Dict[str, Any]]:
+    offset = 0
+    while True:
+        local_results = await title_index.search_titles(query, limit=TMDB_LOCAL_SEARCH_PAGE_SIZE, offset=offset)
+        if not local_results:
+            return
+        for item in local_results:
+            yield item
+        if len(local_results) < TMDB_LOCAL_SEARCH_PAGE_SIZE:
+            return
+        offset += len(local_results)
+
+
+async def _iter_api_search_results(query: str) -> AsyncIterator[Dict[str, Any]]:
+    endpoint = "/search/multi"
+    page = 1
+    while page <= TMDB_SEARCH_MAX_PAGES:
+        params = {"query": query, "page": page, "include_adult": "false"}
+        data = await _make_tmdb_request(endpoint, params)
+        if not data or "results" not in data:
+            logger.debug("tmdb search for '%s' page %s found no results or failed.", query, page)
+            return
         for item in data["results"]:
             formatted_item = _format_search_result(item)
             if formatted_item:
-                formatted_results.append(formatted_item)
-            if len(formatted_results) >= TMDB_REQUEST_DISAMBIGUATION_LIMIT:
-                break
-        logger.debug("tmdb search for '%s' found %s results.", query, len(formatted_results))
-        return formatted_results
-    logger.debug("tmdb search for '%s' found no results or failed.", query)
-    return []
+                yield formatted_item
+        if page >= data.get("total_pages", 1):
+            return
+        page += 1
+
 
+async def _iter_search_results(query: str) -> AsyncIterator[Dict[str, Any]]:
+    if (TMDB_SEARCH_MODE == "local" or not is_available()) and title_index.is_ready():
+        async for item in _iter_local_search_results(query):
+            yield item
+        return
 
-async def get_media_details(tmdb_id: int, media_type: str) -> Optional[Dict[str, Any]]:
     if not TMDB_API_KEY:
-        logger.warning("tmdb details cannot be fetched without an api key.")
-        return None
+        logger.warning("tmdb search cannot be performed without an api key.")
+        return
+
+    async for item in _iter_api_search_results(query):
+        yield item
+
+
+def search_media_lazy(query: str) -> LazySearchResults:
+    return LazySearchResults(query, _iter_search_results(query))
+
+
+async def search_media(query: str) -> List[Dict[str, Any]]:
+    formatted_results = await search_media_lazy(query).get_page(0, TMDB_REQUEST_DISAMBIGUATION_LIMIT)
+    logger.debug("search for '%s' found %s results.", query, len(formatted_results))
+    return formatted_results
 
+
+async def get_media_details(tmdb_id: int, media_type: str, fallback: bool = True) -> Optional[Dict[str, Any]]:
     if media_type not in ["movie", "tv"]:
         logger.error("invalid media_type '%s' for get_media_details.", media_type)
         return None
 
+    if not TMDB_API_KEY:
+        logger.warning("tmdb details cannot be fetched without an api key.")
+        return await title_index.get_title(tmdb_id, media_type) if fallback else None
+
+    cache_key = (media_type, tmdb_id)
+    cached_details = _details_cache.get(cache_key)
+    if cached_details is not None:
+        logger.debug("tmdb details cache hit for %s id %s.", media_type, tmdb_id)
+        return dict(cached_details)
+
+    if TMDB_COALESCE_REQUESTS:
+        fetch_task = _details_inflight.get(cache_key)
+        if fetch_task is None:
+            fetch_task = asyncio.create_task(_fetch_media_details(tmdb_id, media_type))
+            _details_inflight[cache_key] = fetch_task
+            fetch_task.add_done_callback(lambda _: _details_inflight.pop(cache_key, None))
+        details = await asyncio.shield(fetch_task)
+    else:
+        details = await _fetch_media_details(tmdb_id, media_type)
+    if details:
+        return dict(details)
+    return await title_index.get_title(tmdb_id, media_type) if fallback else None
+
+
+async def _fetch_media_details(tmdb_id: int, media_type: str) -> Optional[Dict[str, Any]]:
     endpoint = f"/{media_type}/{tmdb_id}"
     params_with_extras = {"append_to_response": "external_ids"}
     data = await _make_tmdb_request(endpoint, params_with_extras)
@@ -152,7 +318,7 @@ async def get_media_details(tmdb_id: int, media_type: str) -> Optional[Dict[str,
         logger.warning("no title found for %s id %s after fetching details.", media_type, tmdb_id)
         return None
 
-    return {
+    details = {
         "tmdb_id": tmdb_id,
         "title": title,
         "year": year,
@@ -164,3 +330,46 @@ async def get_media_details(tmdb_id: int, media_type: str) -> Optional[Dict[str,
         "status": data.get("status"),
         "tagline": data.get("tagline"),
     }
+    _details_cache.set((media_type, tmdb_id), details)
+    return details
+
+
+async def prefetch_media_details(search_results: List[Dict[str, Any]]):
+    if TMDB_PREFETCH_CONCURRENCY <= 0 or not search_results:
+        return
+
+    async def _prefetch_one(item: Dict[str, Any]):
+        async with _prefetch_semaphore:
+            await get_media_details(item["tmdb_id"], item["media_type"])
+
+    await asyncio.gather(*(_prefetch_one(item) for item in search_results))
+    logger.debug("prefetched details for %s search results.", len(search_results))
+
+
+async def refresh_media_details(tmdb_id: int, media_type: str) -> Optional[Dict[str, Any]]:
+    _details_cache.pop((media_type, tmdb_id))
+    return await _fetch_media_details(tmdb_id, media_type)
+
+
+async def get_changed_ids(media_type: str, start_date: datetime.date, end_date: datetime.date) -> Optional[Set[int]]:
+    if media_type not in ["movie", "tv"]:
+        logger.error("invalid media_type '%s' for get_changed_ids.", media_type)
+        return None
+
+    changed_ids: Set[int] = set()
+    page = 1
+    while True:
+        params = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "page": page}
+        data = await _make_tmdb_request(f"/{media_type}/changes", params)
+        if not data:
+            logger.warning("failed to fetch %s changes page %s.", media_type, page)
+            return None
+        changed_ids.update(item["id"] for item in data.get("results", []) if item.get("id"))
+        if page >= data.get("total_pages", 1):
+            break
+        page += 1
+
+    logger.debug(
+        "tmdb reported %s changed %s ids between %s and %s.", len(changed_ids), media_type, start_date, end_date
+    )
+    return changed_ids
@@ -0,0 +1,87 @@
+import asyncio
+import datetime
+
+from typing import Dict
+
+import telecopter.tmdb as tmdb_api
+import telecopter.database as db
+from telecopter.logger import setup_logger
+from telecopter.constants import MediaType
+from telecopter.config import TMDB_SYNC_INTERVAL_SECONDS, TMDB_SYNC_CONCURRENCY
+
+
+logger = setup_logger(__name__)
+
+SYNC_STATE_KEY = "tmdb_changes_synced_at"
+MAX_CHANGES_WINDOW = datetime.timedelta(days=14)
+
+
+async def _refresh_title(tmdb_id: int, media_type: str, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        media_details = await tmdb_api.refresh_media_details(tmdb_id, media_type)
+    if not media_details:
+        return False
+    await db.apply_tmdb_metadata(media_details)
+    return True
+
+
+async def sync_tracked_titles() -> Dict[str, int]:
+    sync_started_at = datetime.datetime.now(datetime.timezone.utc)
+    last_synced_raw = await db.get_sync_state(SYNC_STATE_KEY)
+    last_synced_at = (
+        datetime.datetime.fromisoformat(last_synced_raw)
+        if last_synced_raw
+        else sync_started_at - datetime.timedelta(days=1)
+    )
+    start_date = max(last_synced_at, sync_started_at - MAX_CHANGES_WINDOW).date()
+    end_date = sync_started_at.date()
+
+    semaphore = asyncio.Semaphore(max(1, TMDB_SYNC_CONCURRENCY))
+    stats = {"tracked": 0, "changed": 0, "refreshed": 0, "failed": 0}
+    complete = True
+
+    for media_type in (MediaType.MOVIE.value, MediaType.TV.value):
+        tracked_ids = await db.get_tracked_tmdb_ids(media_type)
+        if not tracked_ids:
+            continue
+        stats["tracked"] += len(tracked_ids)
+
+        changed_ids = await tmdb_api.get_changed_ids(media_type, start_date, end_date)
+        if changed_ids is None:
+            complete = False
+            continue
+
+        ids_to_refresh = tracked_ids & changed_ids
+        stats["changed"] += len(ids_to_refresh)
+        results = await asyncio.gather(*(_refresh_title(tmdb_id, media_type, semaphore) for tmdb_id in ids_to_refresh))
+        stats["refreshed"] += sum(results)
+        stats["failed"] += len(results) - sum(results)
+
+    if complete and stats["failed"] == 0:
+        await db.set_sync_state(SYNC_STATE_KEY, sync_started_at.isoformat())
+    else:
+        logger.warning("tmdb change sync incomplete, keeping high-water mark at %s.", last_synced_at.isoformat())
+
+    logger.info(
+        "tmdb change sync from %s to %s: %s tracked, %s changed, %s refreshed, %s failed.",
+        start_date,
+        end_date,
+        stats["tracked"],
+        stats["changed"],
+        stats["refreshed"],
+        stats["failed"],
+    )
+    return stats
+
+
+async def run_sync_loop():
+    if TMDB_SYNC_INTERVAL_SECONDS <= 0:
+        logger.info("tmdb change sync disabled.")
+        return
+
+    while True:
+        try:
+            await sync_tracked_titles()
+        except Exception as e:
+            logger.error("tmdb change sync failed: %s", e, exc_info=True)
+        await asyncio.sleep(TMDB_SYNC_INTERVAL_SECONDS)
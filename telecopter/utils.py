@@ -8,6 +8,7 @@ from telecopter.constants import (
     Icon,
     MediaType,
     RequestType,
+    MSG_ADMIN_DIGEST_REQUEST_ITEM,
 )
 
 
@@ -165,6 +166,28 @@ def format_request_for_admin(request_data: Dict, user_info: Optional[Dict] = Non
     return as_list(*message_items, sep="\n")
 
 
+def format_request_digest_line(request_data: Dict, user_info: Optional[Dict] = None) -> Text:
+    request_type_icons = {
+        MediaType.MOVIE.value: Icon.MOVIE.value,
+        MediaType.TV.value: Icon.TV_SHOW.value,
+        MediaType.MANUAL.value: Icon.MANUAL_REQUEST.value,
+        RequestType.PROBLEM.value: Icon.PROBLEM_REPORT.value,
+    }
+    user_name = "unknown user"
+    if user_info and user_info.get("username"):
+        user_name = f"@{user_info['username']}"
+    elif user_info:
+        user_name = user_info.get("first_name") or str(user_info["user_id"])
+    return Text(
+        MSG_ADMIN_DIGEST_REQUEST_ITEM.format(
+            icon=request_type_icons.get(request_data["request_type"], Icon.GENERIC_REQUEST.value),
+            request_id=request_data["request_id"],
+            title=truncate_text(request_data["title"], 40),
+            user_name=user_name,
+        )
+    )
+
+
 def format_request_item_display_parts(
     request_data: Dict[str, Any], view_context: str, submitter_name_override: Optional[str] = None
 ) -> List[Union[Text, Bold, Italic, Code]]:
@@ -0,0 +1,57 @@
+import asyncio
+
+from aiohttp import web
+from typing import List
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from telecopter.logger import setup_logger
+from telecopter.config import (
+    WEBHOOK_BASE_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_MAX_CONNECTIONS,
+)
+
+
+logger = setup_logger(__name__)
+
+
+async def _health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, path: str, secret_token: str) -> web.Application:
+    app = web.Application()
+    handler = SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret_token)
+    app.router.add_post(path, handler.handle)
+    app.router.add_get("/healthz", _health)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, allowed_updates: List[str], stop_requested: asyncio.Event):
+    if not WEBHOOK_BASE_URL or not WEBHOOK_SECRET_TOKEN:
+        logger.critical("webhook_base_url and webhook_secret_token must be set for webhook mode.")
+        return
+
+    runner = web.AppRunner(create_webhook_app(dp, bot, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN))
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    logger.info("webhook server listening on http://%s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+
+    webhook_url = f"{WEBHOOK_BASE_URL}{WEBHOOK_PATH}"
+    try:
+        await bot.set_webhook(
+            url=webhook_url,
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=allowed_updates,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info("webhook registered at %s.", webhook_url)
+        await stop_requested.wait()
+    finally:
+        await runner.cleanup()
+        logger.info("webhook server stopped.")
@@ -0,0 +1,76 @@
+import datetime
+
+from typing import Any, AsyncGenerator, List, Optional
+
+import pytest
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+from aiogram.client.session.base import BaseSession
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+
+class RecordingSession(BaseSession):
+    def __init__(self):
+        super().__init__()
+        self.requests: List[TelegramMethod] = []
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.requests.append(method)
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class UpdateFactory:
+    def __init__(self):
+        self._update_id = 0
+
+    def _next_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    def message(self, user_id: int, text: str = "hello") -> Update:
+        update_id = self._next_id()
+        return Update(
+            update_id=update_id,
+            message=Message(
+                message_id=update_id,
+                date=datetime.datetime.now(datetime.timezone.utc),
+                chat=Chat(id=user_id, type="private"),
+                from_user=User(id=user_id, is_bot=False, first_name="user"),
+                text=text,
+            ),
+        )
+
+    def callback(self, user_id: int, data: str) -> Update:
+        update_id = self._next_id()
+        return Update(
+            update_id=update_id,
+            callback_query=CallbackQuery(
+                id=str(update_id),
+                chat_instance="test",
+                from_user=User(id=user_id, is_bot=False, first_name="user"),
+                message=Message(
+                    message_id=update_id,
+                    date=datetime.datetime.now(datetime.timezone.utc),
+                    chat=Chat(id=user_id, type="private"),
+                    text="menu",
+                ),
+                data=data,
+            ),
+        )
+
+
+@pytest.fixture
+def bot() -> Bot:
+    return Bot("42:test-token", session=RecordingSession())
+
+
+@pytest.fixture
+def updates() -> UpdateFactory:
+    return UpdateFactory()
@@ -0,0 +1,107 @@
+import asyncio
+
+import telecopter.tmdb as tmdb_api
+from telecopter.circuit_breaker import CircuitBreaker, CircuitState
+
+
+def open_breaker(half_open_max_calls: int = 1) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0, half_open_max_calls=half_open_max_calls)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_half_opens_after_timeout():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    breaker.recovery_timeout = 0
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_half_open_limits_trial_requests():
+    breaker = open_breaker(half_open_max_calls=1)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert not breaker.is_available()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.is_available()
+
+
+def test_failed_trial_reopens():
+    breaker = open_breaker()
+    breaker.recovery_timeout = 60
+    breaker._state = CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_released_trial_frees_the_slot():
+    breaker = open_breaker()
+    assert breaker.allow_request()
+    breaker.release_trial()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.is_available()
+    assert breaker.allow_request()
+
+
+def test_cancelled_half_open_request_keeps_tmdb_available(monkeypatch):
+    breaker = open_breaker()
+    started = asyncio.Event()
+
+    async def hang(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(tmdb_api, "tmdb_circuit", breaker)
+    monkeypatch.setattr(tmdb_api, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(tmdb_api, "TMDB_CONNECTION_POOL_SIZE", 20)
+    monkeypatch.setattr(tmdb_api, "_get_session", lambda: None)
+    monkeypatch.setattr(tmdb_api, "_request_json", hang)
+
+    async def run():
+        request = asyncio.create_task(tmdb_api._make_tmdb_request("/search/multi", {"query": "x"}))
+        await started.wait()
+        assert not tmdb_api.is_available()
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+
+    asyncio.run(run())
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker._half_open_calls == 0
+    assert tmdb_api.is_available()
+
+
+def test_malformed_half_open_response_reopens_and_recovers(monkeypatch):
+    breaker = open_breaker()
+
+    async def malformed(*args, **kwargs):
+        raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+    monkeypatch.setattr(tmdb_api, "tmdb_circuit", breaker)
+    monkeypatch.setattr(tmdb_api, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(tmdb_api, "TMDB_CONNECTION_POOL_SIZE", 20)
+    monkeypatch.setattr(tmdb_api, "_get_session", lambda: None)
+    monkeypatch.setattr(tmdb_api, "_request_json", malformed)
+
+    assert asyncio.run(tmdb_api._make_tmdb_request("/search/multi", {"query": "x"})) is None
+    assert breaker._state == CircuitState.OPEN
+    assert breaker._half_open_calls == 0
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert tmdb_api.is_available()
+
+
+def test_failed_trial_counts_as_a_single_failure():
+    breaker = open_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker._failure_count == 1
@@ -0,0 +1,46 @@
+import asyncio
+
+from typing import Any, AsyncIterator, Dict, List
+
+from telecopter.tmdb import LazySearchResults
+
+
+async def slow_results(count: int, pulls: List[int]) -> AsyncIterator[Dict[str, Any]]:
+    for index in range(count):
+        await asyncio.sleep(0.001)
+        pulls.append(index)
+        yield {"tmdb_id": index}
+
+
+def test_pages_are_fetched_lazily():
+    pulls: List[int] = []
+
+    async def run():
+        results = LazySearchResults("query", slow_results(12, pulls))
+        first_page = await results.get_page(0, 5)
+        assert [item["tmdb_id"] for item in first_page] == [0, 1, 2, 3, 4]
+        assert len(pulls) == 6
+        assert results.has_more(0, 5)
+
+        last_page = await results.get_page(2, 5)
+        assert [item["tmdb_id"] for item in last_page] == [10, 11]
+        assert not results.has_more(2, 5)
+
+    asyncio.run(run())
+
+
+def test_concurrent_pages_share_one_iterator():
+    pulls: List[int] = []
+
+    async def run():
+        results = LazySearchResults("query", slow_results(30, pulls))
+        pages = await asyncio.gather(*(results.get_page(page, 5) for page in (1, 0, 2, 0)))
+        assert [[item["tmdb_id"] for item in page] for page in pages] == [
+            [5, 6, 7, 8, 9],
+            [0, 1, 2, 3, 4],
+            [10, 11, 12, 13, 14],
+            [0, 1, 2, 3, 4],
+        ]
+        assert pulls == list(range(16))
+
+    asyncio.run(run())
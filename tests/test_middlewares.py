@@ -0,0 +1,159 @@
+import time
+import asyncio
+
+from typing import Tuple
+
+from aiogram import Dispatcher
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+
+from telecopter.bot import create_dispatcher
+from telecopter.lifecycle import Lifecycle
+from telecopter.rate_limit import KeyedTokenBuckets
+from telecopter.handlers.handler_states import RequestMediaStates
+from telecopter.middlewares import ConcurrencyLimitMiddleware, ThrottlingMiddleware, UserSerialIsolation
+
+
+def build_throttled_dispatcher(handled: list, max_queued: list) -> Dispatcher:
+    isolation = UserSerialIsolation()
+    dp = Dispatcher(storage=MemoryStorage(), events_isolation=isolation)
+    throttling = ThrottlingMiddleware(dp.fsm)
+    throttling.buckets["message"] = KeyedTokenBuckets(rate=1, burst=5)
+    throttling.buckets["callback"] = KeyedTokenBuckets(rate=1, burst=5)
+    throttling.buckets["search"] = KeyedTokenBuckets(rate=1, burst=3)
+    dp.update.outer_middleware.unregister(dp.fsm)
+    dp.update.outer_middleware(throttling)
+    dp.update.outer_middleware(dp.fsm)
+
+    @dp.message()
+    @dp.callback_query()
+    async def handle(event):
+        handled.append(event.from_user.id)
+        max_queued[0] = max(max_queued[0], isolation.queued)
+        await asyncio.sleep(0.01)
+
+    return dp
+
+
+def test_create_dispatcher_throttles_before_and_limits_after_fsm_isolation():
+    dp = create_dispatcher(MemoryStorage(), Lifecycle(1))
+    middlewares = list(dp.update.outer_middleware)
+    user_context_index = next(i for i, m in enumerate(middlewares) if isinstance(m, UserContextMiddleware))
+    throttling_index = next(i for i, m in enumerate(middlewares) if isinstance(m, ThrottlingMiddleware))
+    limiter_index = next(i for i, m in enumerate(middlewares) if isinstance(m, ConcurrencyLimitMiddleware))
+    assert user_context_index < throttling_index < middlewares.index(dp.fsm) < limiter_index
+
+
+def test_flood_is_dropped_before_queueing_on_the_user_lock(bot, updates):
+    handled: list = []
+    max_queued = [0]
+    dp = build_throttled_dispatcher(handled, max_queued)
+
+    async def run():
+        flood = [updates.message(1) for _ in range(20)]
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in flood))
+
+    asyncio.run(run())
+    assert handled == [1] * 5
+    assert max_queued[0] <= 4
+    notices = [request for request in bot.session.requests if isinstance(request, SendMessage)]
+    assert len(notices) == 1
+
+
+def test_throttled_callbacks_get_a_toast(bot, updates):
+    handled: list = []
+    dp = build_throttled_dispatcher(handled, [0])
+
+    async def run():
+        for _ in range(7):
+            await dp.feed_update(bot, updates.callback(2, "main_menu"))
+
+    asyncio.run(run())
+    assert len(handled) == 5
+    assert sum(isinstance(request, AnswerCallbackQuery) for request in bot.session.requests) == 2
+
+
+def test_search_limit_applies_to_text_typed_while_searching(bot, updates):
+    handled: list = []
+    dp = build_throttled_dispatcher(handled, [0])
+
+    async def run():
+        key = StorageKey(bot_id=bot.id, chat_id=3, user_id=3)
+        await dp.storage.set_state(key, RequestMediaStates.typing_media_name)
+        for _ in range(5):
+            await dp.feed_update(bot, updates.message(3, "dune"))
+
+    asyncio.run(run())
+    assert len(handled) == 3
+
+
+def build_limited_dispatcher(
+    limit: int, shed_queue_depth: int, started: list, delay: float
+) -> Tuple[Dispatcher, ConcurrencyLimitMiddleware]:
+    isolation = UserSerialIsolation()
+    dp = Dispatcher(storage=MemoryStorage(), events_isolation=isolation)
+    limiter = ConcurrencyLimitMiddleware(limit, shed_queue_depth, isolation)
+    dp.update.outer_middleware(limiter)
+
+    @dp.message()
+    @dp.callback_query()
+    async def handle(event):
+        started.append((event.from_user.id, round(time.monotonic(), 3)))
+        assert limiter.stats()["running"] <= limit
+        await asyncio.sleep(delay)
+
+    return dp, limiter
+
+
+def test_queued_updates_of_one_user_do_not_hold_global_slots(bot, updates):
+    started: list = []
+    dp, _ = build_limited_dispatcher(limit=2, shed_queue_depth=0, started=started, delay=0.2)
+
+    async def run() -> float:
+        began_at = time.monotonic()
+        burst = [updates.message(1) for _ in range(3)] + [updates.message(2)]
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in burst))
+        return began_at
+
+    began_at = asyncio.run(run())
+    user_two_started_at = next(started_at for user_id, started_at in started if user_id == 2)
+    assert user_two_started_at - began_at < 0.1
+    assert [user_id for user_id, _ in started if user_id == 1] == [1, 1, 1]
+
+
+def test_limit_is_enforced_and_waiters_are_served_by_priority(bot, updates):
+    started: list = []
+    dp, _ = build_limited_dispatcher(limit=1, shed_queue_depth=0, started=started, delay=0.05)
+
+    async def run():
+        first = asyncio.create_task(dp.feed_update(bot, updates.message(1)))
+        await asyncio.sleep(0.01)
+        waiting = [
+            dp.feed_update(bot, updates.callback(2, "tmdb_page:1")),
+            dp.feed_update(bot, updates.callback(3, "main_menu")),
+            dp.feed_update(bot, updates.message(4)),
+        ]
+        await asyncio.gather(first, *waiting)
+
+    asyncio.run(run())
+    assert [user_id for user_id, _ in started] == [1, 4, 3, 2]
+
+
+def test_pagination_is_shed_when_saturated(bot, updates):
+    started: list = []
+    dp, limiter = build_limited_dispatcher(limit=1, shed_queue_depth=1, started=started, delay=0.05)
+
+    async def run():
+        first = asyncio.create_task(dp.feed_update(bot, updates.message(1)))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(dp.feed_update(bot, updates.message(2)))
+        await asyncio.sleep(0.01)
+        await dp.feed_update(bot, updates.callback(3, "tmdb_page:2"))
+        await asyncio.gather(first, queued)
+
+    asyncio.run(run())
+    assert [user_id for user_id, _ in started] == [1, 2]
+    assert limiter.stats()["shed"] == 1
+    assert any(isinstance(request, AnswerCallbackQuery) for request in bot.session.requests)
@@ -0,0 +1,28 @@
+import time
+import asyncio
+
+from aiogram.methods import DeleteMessage, EditMessageText, SendMessage
+
+from telecopter.outbound import OutboundScheduler, OutboundSchedulerMiddleware
+
+
+def test_only_new_messages_are_charged_to_the_chat_budget(bot):
+    scheduler = OutboundScheduler(global_rate=100, per_chat_rate=1, per_chat_burst=1)
+    bot.session.middleware(OutboundSchedulerMiddleware(scheduler))
+
+    async def run() -> float:
+        await bot.send_message(chat_id=1, text="searching")
+        started_at = time.monotonic()
+        await bot.edit_message_text(chat_id=1, message_id=1, text="page 2")
+        await bot.edit_message_text(chat_id=1, message_id=1, text="page 3")
+        await bot.delete_message(chat_id=1, message_id=1)
+        return time.monotonic() - started_at
+
+    assert asyncio.run(run()) < 0.1
+    assert [type(request) for request in bot.session.requests] == [
+        SendMessage,
+        EditMessageText,
+        EditMessageText,
+        DeleteMessage,
+    ]
+    assert sum(stats.count for stats in scheduler._wait_stats.values()) == 1
@@ -0,0 +1,73 @@
+import time
+import asyncio
+
+from telecopter.rate_limit import KeyedTokenBuckets, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == 0.5
+
+    now[0] += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_pause_blocks_until_expired(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=10)
+    bucket.pause(2)
+
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == 2
+
+    now[0] += 2
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_spaces_concurrent_acquires():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    async def run() -> float:
+        started_at = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return time.monotonic() - started_at
+
+    assert asyncio.run(run()) >= 0.045
+
+
+def test_keyed_buckets_are_independent_per_key(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    buckets = KeyedTokenBuckets(rate=1, burst=2)
+
+    assert [buckets.try_acquire("a") for _ in range(3)] == [True, True, False]
+    assert buckets.try_acquire("b")
+
+    now[0] += 1
+    assert buckets.try_acquire("a")
+    assert not buckets.try_acquire("a")
+
+
+def test_keyed_buckets_prune_only_full_buckets(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    buckets = KeyedTokenBuckets(rate=1, burst=2)
+    buckets.try_acquire("idle")
+    now[0] += 1.5
+    buckets.try_acquire("recent")
+
+    now[0] += 0.6
+    assert buckets.prune() == 1
+    assert len(buckets) == 1
+
+
+def test_unlimited_keyed_buckets_never_throttle():
+    buckets = KeyedTokenBuckets(rate=0, burst=1)
+    assert all(buckets.try_acquire("a") for _ in range(100))
+    assert len(buckets) == 0